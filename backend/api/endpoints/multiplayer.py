@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 
 from backend import schemas
 from backend.game.multiplayer_game import (
@@ -23,7 +23,7 @@ async def create_multiplayer_lobby():
 @router.get("/settings", response_model=schemas.ConnectionSettingsOptionsResponse)
 async def get_multiplayer_settings():
     options = await multiplayer_game_service.get_settings_options()
-    return {"options": options}
+    return Response(content=options.response_json, media_type="application/json")
 
 
 @router.get("/lobbies/{code}", response_model=schemas.MultiplayerStateResponse)
@@ -2,7 +2,7 @@ import logging
 import time
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from backend import schemas
 from backend.game.connection_settings import serialize_resolved_connection_settings
@@ -15,7 +15,7 @@ logger = logging.getLogger("uvicorn.error")
 @router.get("/settings", response_model=schemas.ConnectionSettingsOptionsResponse)
 async def get_path_game_settings():
     options = await path_game_service.get_settings_options()
-    return {"options": options}
+    return Response(content=options.response_json, media_type="application/json")
 
 
 @router.post("/start", response_model=schemas.PathGameStartResponse)
@@ -24,7 +24,11 @@ async def start_path_game(payload: Optional[schemas.PathGameStartRequest] = None
     logger.info("POST /game/path/start received")
     try:
         requested_settings = payload.settings.model_dump() if payload and payload.settings else None
-        session = await path_game_service.start_game(requested_settings=requested_settings)
+        target_hops = payload.target_hops if payload else None
+        session = await path_game_service.start_game(
+            requested_settings=requested_settings,
+            target_hops=target_hops,
+        )
     except ValueError as exc:
         logger.exception("POST /game/path/start failed: %s", str(exc))
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -1,5 +1,7 @@
 import asyncio
+import json
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from backend.db import getters
 from backend.db.session import get_graph_db, GraphDB
@@ -58,11 +60,26 @@ async def _resolve_db_game_types(game_types: Optional[List[str]]) -> Optional[Li
 
     return available_types
 
+MAX_PLAYER_IDS_PER_REQUEST = 500
+
+@router.get("", response_model=List[schemas.Player], include_in_schema=False)
 @router.get("/", response_model=List[schemas.Player])
-async def get_all_players(db: GraphDB = Depends(get_graph_db)):
+async def get_all_players(
+    ids: Optional[List[int]] = Query(None, description="Only return these players, in the given order (unknown IDs are skipped)."),
+    db: GraphDB = Depends(get_graph_db),
+):
     """
-    Returns a list of all players in the database.
+    Returns a list of all players in the database, or the players listed in `ids`.
     """
+    if ids:
+        if len(ids) > MAX_PLAYER_IDS_PER_REQUEST:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_PLAYER_IDS_PER_REQUEST} player ids can be requested at once.",
+            )
+        names = await getters.get_names_for_playerids(ids)
+        return [{"id": player_id, "full_name": names[player_id]} for player_id in dict.fromkeys(ids) if player_id in names]
+
     players = await getters.get_all_players()
     # The getter returns keys 'playerid' and 'name', which we map to the schema's 'id' and 'full_name'.
     return [{"id": p["playerid"], "full_name": p["name"]} for p in players]
@@ -99,6 +116,17 @@ async def get_random_player(
 
     return schemas.Player(id=player_node["id"], full_name=player_node["fullName"])
 
+@router.get("/suggest", response_model=List[schemas.Player])
+async def suggest_players(
+    q: str = Query(..., min_length=1, description="Prefix of a player's first, last or full name."),
+    limit: int = Query(10, ge=1, le=25, description="Maximum number of suggestions."),
+):
+    """
+    Typeahead suggestions: players whose first, last or full name starts with
+    `q`, best-connected first. Use /search/{player_name} for misspelled names.
+    """
+    return await getters.suggest_players_by_prefix(q, limit=limit)
+
 @router.get("/{player_id}", response_model=schemas.Player)
 async def get_player_by_id(player_id: int, db: GraphDB = Depends(get_graph_db)):
     """
@@ -138,6 +166,18 @@ async def get_player_teammates(
     )
     return teammates
 
+@router.get("/{player_id}/connectivity", response_model=schemas.PlayerConnectivity)
+async def get_player_connectivity(player_id: int):
+    """
+    Returns the player's teammate degree (overall, per relationship type and
+    per decade) and approximate closeness/betweenness, as precomputed by the
+    data pipeline.
+    """
+    connectivity = await getters.get_player_connectivity(player_id)
+    if connectivity is None:
+        raise HTTPException(status_code=404, detail="No connectivity data for this player")
+    return connectivity
+
 @router.get("/search/{player_name}", response_model=List[schemas.Player])
 async def search_players_by_name(player_name: str, db: GraphDB = Depends(get_graph_db)):
     """
@@ -210,7 +250,7 @@ async def get_shortest_path(
     start_year: Optional[int] = Query(None, description="The starting season year to filter by (e.g., 2016 for the 2016-17 season)."),
     end_year: Optional[int] = Query(None, description="The ending season year to filter by (e.g., 2018 for the 2018-19 season)."),
     game_types: Optional[List[str]] = Query(None, description=f"List of game types to include. Valid options: {list(GAME_TYPE_TO_REL_MAP.keys())}"),
-    include_players: Optional[List[int]] = Query(None, description="List of player IDs that MUST be in the path."),
+    include_players: Optional[List[int]] = Query(None, description="List of player IDs that MUST be in the path (visited in the shortest order, at most 8)."),
     exclude_players: Optional[List[int]] = Query(None, description="List of player IDs that MUST NOT be in the path."),
     db: GraphDB = Depends(get_graph_db)
 ):
@@ -227,15 +267,41 @@ async def get_shortest_path(
 
     db_game_types = await _resolve_db_game_types(game_types)
 
-    path = await getters.find_shortest_path_between_players(
-        player1_id=player1_id,
-        player2_id=player2_id,
-        start_year=start_year,
-        end_year=end_year,
-        game_types=db_game_types,
-        include_players=include_players,
-        exclude_players=exclude_players,
-    )
+    try:
+        path = await getters.find_shortest_path_between_players(
+            player1_id=player1_id,
+            player2_id=player2_id,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=db_game_types,
+            include_players=include_players,
+            exclude_players=exclude_players,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     if not path:
         raise HTTPException(status_code=404, detail="No connection path found between the players with the given filters.")
-    return path
\ No newline at end of file
+    return path
+
+@router.post("/paths")
+async def get_shortest_paths_batch(payload: schemas.PlayerPathBatchRequest):
+    """
+    Finds shortest paths for many player pairs at once. Pairs are grouped by
+    source so each distinct source is searched once, and results stream back as
+    newline-delimited JSON (one `PlayerPathResult` per line) as each group finishes.
+    """
+    db_game_types = await _resolve_db_game_types(payload.game_types)
+    pairs = [(pair.player1_id, pair.player2_id) for pair in payload.pairs]
+
+    async def stream_results():
+        async for results in getters.iter_shortest_paths_by_source(
+            pairs,
+            start_year=payload.start_year,
+            end_year=payload.end_year,
+            game_types=db_game_types,
+            max_hops=payload.max_hops,
+        ):
+            for result in results:
+                yield json.dumps(schemas.PlayerPathResult(**result).model_dump()) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
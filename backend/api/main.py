@@ -1,17 +1,75 @@
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from backend.db import session
+from backend.core.config import settings
+from backend.db import cache, centrality, getters, schema_catalog, session, teammate_graph
 from backend.api.endpoints import battle, multiplayer, path_game, players, team
+from backend.game.path_game import path_game_service
 
 # run using `uvicorn backend.api.main:app --reload`
 
+logger = logging.getLogger("uvicorn.error")
+
+async def _load_player_centrality():
+    try:
+        await centrality.load_player_centrality(
+            teammate_graph.get_teammate_graph(),
+            samples=settings.CENTRALITY_SAMPLES,
+        )
+    except Exception:
+        logger.exception("Failed loading player centrality table")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # The graph_db driver is initialized on import and is meant to be long-lived.
     # This context manager ensures its `close()` method is called gracefully on shutdown.
+    graph_watcher = None
+    if settings.TEAMMATE_GRAPH_ENABLED:
+        try:
+            # Maps the pipeline's on-disk snapshot when present, so workers share one copy.
+            await teammate_graph.load_teammate_graph()
+        except Exception:
+            # Path searches fall back to querying Neo4j directly when the graph is unavailable.
+            logger.exception("Failed loading in-memory teammate graph; using Neo4j traversal")
+        else:
+            if settings.GRAPH_VERSION_POLL_SECONDS > 0:
+                # Picks up games added by the pipeline without restarting the API.
+                graph_watcher = asyncio.create_task(
+                    teammate_graph.watch_graph_version(settings.GRAPH_VERSION_POLL_SECONDS)
+                )
+    try:
+        # Relationship types, teams and season bounds are served from this catalog.
+        await schema_catalog.load_schema_catalog()
+    except Exception:
+        logger.exception("Failed loading schema catalog; it is retried in the background")
+    catalog_watcher = None
+    if settings.GRAPH_VERSION_POLL_SECONDS > 0:
+        catalog_watcher = asyncio.create_task(
+            schema_catalog.watch_schema_catalog(settings.GRAPH_VERSION_POLL_SECONDS)
+        )
+    try:
+        # Without the graph's name table, player names are served from a process cache.
+        await getters.warm_player_name_cache()
+    except Exception:
+        logger.exception("Failed warming player name cache")
+    # Reads the pipeline's stored centrality table, or computes it from the graph
+    # when none is stored; off the startup path because computing takes a while.
+    centrality_loader = asyncio.create_task(_load_player_centrality())
+    puzzle_pool = None
+    if settings.PATH_GAME_POOL_SIZE > 0:
+        # Keeps ready path game puzzles so /game/path/start rarely searches in-request.
+        puzzle_pool = asyncio.create_task(path_game_service.run_puzzle_pool(settings.PATH_GAME_POOL_SIZE))
     yield
     # Clean up the resources
+    if graph_watcher is not None:
+        graph_watcher.cancel()
+    if catalog_watcher is not None:
+        catalog_watcher.cancel()
+    if puzzle_pool is not None:
+        puzzle_pool.cancel()
+    centrality_loader.cancel()
     session.get_graph_db().close()
 
 app = FastAPI(title="NHL Player-to-Player API", lifespan=lifespan)
@@ -30,6 +88,11 @@ app.add_middleware(
 async def read_root():
     return {"message": "Welcome to the NHL Player-to-Player API"}
 
+@app.get("/cache/stats")
+async def read_cache_stats():
+    """Hit/miss/coalesce/eviction counters of the memoized database getters."""
+    return cache.cache_stats()
+
 # Include routers from other files
 app.include_router(players.router, prefix="/players", tags=["players"])
 app.include_router(battle.router, tags=["battle"])
@@ -20,6 +20,47 @@ class Settings(BaseSettings):
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "default_pw"
 
+    # Graph layout the getters query: "teammate" for player-to-player teammate
+    # edges, or "bipartite" for (Player)-[:PLAYED_IN]->(TeamSeason).
+    GRAPH_MODEL: str = "teammate"
+
+    # Load the teammate adjacency into memory at API startup so path searches
+    # run without a Neo4j round trip per visited player.
+    TEAMMATE_GRAPH_ENABLED: bool = True
+    # Directory of the mmap-able graph snapshot written by the data pipeline.
+    # When present, workers map it at startup instead of reading Neo4j; an
+    # empty value always loads from Neo4j.
+    GRAPH_SNAPSHOT_PATH: str = str(Path(__file__).parent.parent.parent / "data" / "graph_snapshot")
+    # Games the pipeline added since the last snapshot, one JSON line per game.
+    # The API applies them in place whenever the graph version in Neo4j moves,
+    # polling every GRAPH_VERSION_POLL_SECONDS (0 disables polling).
+    GRAPH_DELTA_LOG_PATH: str = str(Path(__file__).parent.parent.parent / "data" / "graph_deltas.jsonl")
+    GRAPH_VERSION_POLL_SECONDS: int = 60
+    # Hub players used as landmarks for path-length lower/upper bounds (0 disables).
+    LANDMARK_COUNT: int = 24
+    # Pivot players sampled for the approximate closeness/betweenness in the
+    # player centrality table (0 keeps degrees only).
+    CENTRALITY_SAMPLES: int = 64
+
+    # Frontier-batched Cypher BFS (used when the in-memory graph is unavailable).
+    # At most this many frontier players are sent per UNWIND query, and a query
+    # returning more than the row limit aborts the search rather than letting a
+    # dense level exhaust the Neo4j heap.
+    PATH_FRONTIER_BATCH_SIZE: int = 500
+    PATH_FRONTIER_ROW_LIMIT: int = 200000
+
+    # Memoized getter results are keyed by the graph version, so they are
+    # dropped as soon as the pipeline writes; the TTL bounds how long a result
+    # can outlive a write the API has not noticed yet (0 disables the caches).
+    GETTER_CACHE_TTL_SECONDS: float = 300.0
+
+    # Ready-made path game puzzles kept per setting combination, so starting a
+    # game pops one instead of searching inside the request (0 disables the
+    # pool). The default settings plus the most recently requested
+    # PATH_GAME_POOL_SETTINGS combinations are kept filled.
+    PATH_GAME_POOL_SIZE: int = 8
+    PATH_GAME_POOL_SETTINGS: int = 4
+
     # Secret key for things like signing JWTs (JSON Web Tokens) in the future.
     SECRET_KEY: str = "super-secret-key"
 
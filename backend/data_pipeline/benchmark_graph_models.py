@@ -0,0 +1,125 @@
+import asyncio
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from backend.core.config import settings
+from backend.db import getters, session
+
+# --- Setup Logging ---
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stdout,
+)
+logger = logging.getLogger(__name__)
+
+GRAPH_MODELS = ["teammate", getters.GRAPH_MODEL_BIPARTITE]
+
+# Load both layouts over the same seasons before benchmarking, e.g.:
+#   python3 backend/data_pipeline/run_pipeline.py --start-season 2023 --end-season 2023
+#   python3 backend/data_pipeline/run_pipeline.py --start-season 2023 --end-season 2023 --graph-model bipartite
+# Processed games are tracked per graph model, so the second run loads the same
+# games again into the bipartite layout next to the teammate edges.
+# The pipeline logs the load time of each run; this script reports store size and query latency.
+# Memoized getters are called through `.uncached` (and common team-seasons with
+# use_cache=False) so every sample reaches Neo4j.
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the teammate-edge and bipartite graph layouts.")
+    parser.add_argument("--samples", type=int, default=50, help="Number of random players/pairs to query per getter.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for choosing sample players.")
+    return parser.parse_args()
+
+
+async def count_store_size(db: session.GraphDB) -> Dict[str, int]:
+    """Counts the nodes and relationships that make up each layout."""
+    queries = {
+        "players": "MATCH (p:Player) RETURN count(p) AS total",
+        "teammate_edges": "MATCH ()-[r]->() WHERE type(r) STARTS WITH 'TEAMMATE_IN_' RETURN count(r) AS total",
+        "team_season_nodes": "MATCH (ts:TeamSeason) RETURN count(ts) AS total",
+        "played_in_edges": "MATCH ()-[r:PLAYED_IN]->() RETURN count(r) AS total",
+    }
+    counts = {}
+    for name, query in queries.items():
+        result = await db.run_query(query)
+        counts[name] = int(result[0]["total"]) if result else 0
+    return counts
+
+
+async def time_calls(calls: List[Callable[[], Awaitable]]) -> Dict[str, float]:
+    """Runs the calls sequentially and returns latency statistics in milliseconds."""
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+async def main(args: argparse.Namespace):
+    db = session.get_graph_db()
+    counts = await count_store_size(db)
+    for name, total in counts.items():
+        logger.info("%-18s %s", name, total)
+
+    rng = random.Random(args.seed)
+    player_ids = await getters.get_playerids_sample(limit=max(args.samples * 4, 100))
+    if len(player_ids) < 2:
+        logger.warning("Not enough players in the database to benchmark.")
+        return
+    players = [rng.choice(player_ids) for _ in range(args.samples)]
+    pairs = [tuple(rng.sample(player_ids, 2)) for _ in range(args.samples)]
+    game_types = ["TEAMMATE_IN_REGULAR_SEASON"]
+
+    benchmarks = {
+        "teammates_with_options": [
+            (lambda pid=pid: getters.get_teammates_of_player_with_options.uncached(pid, game_types=game_types))
+            for pid in players
+        ],
+        "teams_from_playerid": [
+            (lambda pid=pid: getters.get_teams_from_playerid.uncached(pid, game_types=game_types))
+            for pid in players
+        ],
+        "common_team_seasons": [
+            (lambda p1=p1, p2=p2: getters.get_common_team_seasons(p1, p2, game_types=game_types, use_cache=False))
+            for p1, p2 in pairs
+        ],
+    }
+
+    original_model = settings.GRAPH_MODEL
+    try:
+        for graph_model in GRAPH_MODELS:
+            settings.GRAPH_MODEL = graph_model
+            for name, calls in benchmarks.items():
+                stats = await time_calls(calls)
+                logger.info(
+                    "%-9s %-24s mean=%.1fms p50=%.1fms p95=%.1fms",
+                    graph_model,
+                    name,
+                    stats["mean_ms"],
+                    stats["p50_ms"],
+                    stats["p95_ms"],
+                )
+    finally:
+        settings.GRAPH_MODEL = original_model
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except Exception:
+        logger.critical("Benchmark failed with an unhandled exception.", exc_info=True)
+        sys.exit(1)
+    finally:
+        session.get_graph_db().close()
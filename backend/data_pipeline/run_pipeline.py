@@ -1,11 +1,18 @@
 import asyncio
 import argparse
 import httpx
+import os
 import sys
+import time
 from collections import Counter
 import logging
-from typing import Dict, Any, List
-from backend.db import session
+from typing import Dict, Any, List, Optional
+from backend.core.config import settings
+from backend.db import session, teammate_graph
+from backend.db.centrality import PlayerCentrality, compute_player_centrality, write_player_centrality
+from backend.db.graph_catalog import ensure_graph_catalog, rebuild_graph_catalog, scan_per_game_relationships, update_graph_catalog
+from backend.db.graph_deltas import append_graph_delta, build_game_delta, bump_graph_version, compact_graph_deltas, get_graph_version
+from backend.db.landmarks import build_landmark_index
 from backend.data_pipeline import sources
 
 # --- Setup Logging ---
@@ -16,6 +23,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Graph layouts the pipeline can write. "aggregated" keeps one teammate relationship
+# per (pair, team, season, game type) carrying a games-together count; "per-game"
+# is the original layout with one relationship per pair per game.
+GRAPH_MODEL_AGGREGATED = "aggregated"
+GRAPH_MODEL_PER_GAME = "per-game"
+# "bipartite" writes (Player)-[:PLAYED_IN {games, types}]->(TeamSeason {tricode, season})
+# instead of teammate pairs, so a game costs O(roster) writes rather than O(roster^2).
+GRAPH_MODEL_BIPARTITE = "bipartite"
+GRAPH_MODELS = [GRAPH_MODEL_AGGREGATED, GRAPH_MODEL_PER_GAME, GRAPH_MODEL_BIPARTITE]
+# Graph models that have written a :Game node. Nodes from before models were
+# tracked were all written as teammate edges, which the aggregated layout covers.
+_GAME_GRAPH_MODELS = f"coalesce(g.graphModels, ['{GRAPH_MODEL_AGGREGATED}'])"
+
 def _extract_player_ids_from_roster(roster: Dict[str, Any]) -> List[int]:
     """Extracts all player IDs from a team's roster in the boxscore."""
     player_ids = []
@@ -72,6 +92,26 @@ async def create_indexes():
         )
         raise
 
+    # Processed games are tracked as :Game nodes so the pipeline no longer has to
+    # scan every relationship for gameId values.
+    await db.run_query(
+        "CREATE CONSTRAINT game_id_unique IF NOT EXISTS FOR (g:Game) REQUIRE g.id IS UNIQUE"
+    )
+    # The graph version and the catalog of teams/seasons/latest game live on one
+    # Meta node that every published batch and catalog read looks up by key.
+    await db.run_query(
+        "CREATE CONSTRAINT meta_key_unique IF NOT EXISTS FOR (m:Meta) REQUIRE m.key IS UNIQUE"
+    )
+
+    # Bipartite layout: team-season nodes are looked up by (tricode, season) when
+    # writing and by season range when filtering.
+    await db.run_query(
+        "CREATE CONSTRAINT team_season_unique IF NOT EXISTS FOR (ts:TeamSeason) REQUIRE (ts.tricode, ts.season) IS UNIQUE"
+    )
+    await db.run_query(
+        "CREATE RANGE INDEX team_season_season_idx IF NOT EXISTS FOR (ts:TeamSeason) ON (ts.season)"
+    )
+
     # To get all possible relationship types, we can inspect the mapping
     # dictionary in the `_get_relationship_type_from_game_id` function.
     all_rel_types = set(_get_relationship_type_from_game_id(g) for g in range(1, 20))
@@ -152,22 +192,236 @@ async def clear_database():
         total_relationships_deleted,
         total_nodes_deleted,
     )
+    # Versions restart from zero with the Meta node gone, so old deltas no longer apply.
+    if settings.GRAPH_DELTA_LOG_PATH and os.path.exists(settings.GRAPH_DELTA_LOG_PATH):
+        os.remove(settings.GRAPH_DELTA_LOG_PATH)
     logger.info("Database cleared successfully.")
 
-async def get_existing_game_ids(db: session.GraphDB) -> set[int]:
-    """Queries the database to find which games have already been processed."""
-    query = """
-    MATCH ()-[r]->()
-    WHERE r.gameId IS NOT NULL
-    RETURN DISTINCT r.gameId AS gameId
+async def get_existing_game_ids(db: session.GraphDB, graph_model: str = GRAPH_MODEL_AGGREGATED) -> set[int]:
+    """
+    Queries the database to find which games have already been processed
+    into the given graph model. Games are recorded as indexed :Game nodes
+    listing the models that wrote them, so the same seasons can be loaded
+    once per layout (e.g. for benchmark_graph_models.py). Databases that
+    predate them get the graph catalog backfilled first, which records their
+    per-game games too.
     """
-    result = await db.run_query(query)
+    await ensure_graph_catalog(db)
+    result = await db.run_query(
+        f"""
+        MATCH (g:Game)
+        WHERE $graph_model IN {_GAME_GRAPH_MODELS}
+        RETURN g.id AS gameId
+        """,
+        parameters={"graph_model": graph_model},
+    )
     return {record["gameId"] for record in result if record["gameId"] is not None}
 
+async def has_per_game_relationships(db: session.GraphDB) -> bool:
+    """
+    Returns True if any relationship still uses the per-game (gameId) layout.
+    Read from the graph catalog; only catalogs that predate the flag fall
+    back to scanning the relationships, once, recording the answer.
+    """
+    catalog = await ensure_graph_catalog(db)
+    if catalog.per_game_relationships is not None:
+        return catalog.per_game_relationships
+    return await scan_per_game_relationships(db)
+
+def _collapse_per_game_relationships_unit_of_work(tx, player_ids, rel_type):
+    """
+    Replaces the per-game relationships of one type leaving a batch of players
+    with aggregated relationships, and records the games they came from as
+    :Game nodes. Runs as a single transaction so a batch is never half-migrated.
+    """
+    records = tx.run(
+        f"""
+        UNWIND $player_ids AS pid
+        MATCH (p1:Player {{id: pid}})-[old:{rel_type}]-(p2:Player)
+        WHERE old.gameId IS NOT NULL AND p1.id < p2.id
+        WITH p1.id AS p1_id, p2.id AS p2_id, old.team AS team, old.season AS season,
+             collect(DISTINCT old.gameId) AS game_ids, collect(old) AS legacy
+        FOREACH (r IN legacy | DELETE r)
+        RETURN p1_id, p2_id, team, season, game_ids
+        """,
+        player_ids=player_ids,
+    ).data()
+
+    if not records:
+        return 0
+
+    edges = [
+        {
+            "p1_id": record["p1_id"],
+            "p2_id": record["p2_id"],
+            "team": record["team"],
+            "season": record["season"],
+            "games": len(record["game_ids"]),
+            "first_game_id": min(record["game_ids"]),
+            "last_game_id": max(record["game_ids"]),
+        }
+        for record in records
+    ]
+    tx.run(
+        f"""
+        UNWIND $edges AS edge
+        MATCH (p1:Player {{id: edge.p1_id}}), (p2:Player {{id: edge.p2_id}})
+        MERGE (p1)-[r:{rel_type} {{season: edge.season, team: edge.team}}]->(p2)
+        ON CREATE SET r.games = 0, r.firstGameId = edge.first_game_id, r.lastGameId = edge.last_game_id
+        SET r.games = r.games + edge.games,
+            r.firstGameId = CASE WHEN edge.first_game_id < r.firstGameId THEN edge.first_game_id ELSE r.firstGameId END,
+            r.lastGameId = CASE WHEN edge.last_game_id > r.lastGameId THEN edge.last_game_id ELSE r.lastGameId END
+        """,
+        edges=edges,
+    )
+
+    games = {
+        game_id: {"id": game_id, "season": record["season"]}
+        for record in records
+        for game_id in record["game_ids"]
+    }
+    tx.run(
+        """
+        UNWIND $games AS game
+        MERGE (g:Game {id: game.id})
+        SET g.season = game.season, g.type = $rel_type,
+            g.graphModels = [model IN coalesce(g.graphModels, []) WHERE NOT model IN [$per_game, $aggregated]] + $aggregated
+        """,
+        games=list(games.values()),
+        rel_type=rel_type,
+        per_game=GRAPH_MODEL_PER_GAME,
+        aggregated=GRAPH_MODEL_AGGREGATED,
+    )
+    return len(edges)
+
+async def aggregate_per_game_relationships(batch_size: int = 50):
+    """
+    One-off migration from the per-game layout to aggregated teammate edges.
+    Safe to rerun: batches that were already migrated have nothing left to collapse.
+    """
+    logger.info("--- Collapsing per-game teammate relationships into aggregated edges ---")
+    db = session.get_graph_db()
+    result = await db.run_query("MATCH (p:Player) WHERE p.id IS NOT NULL RETURN p.id AS playerid ORDER BY playerid")
+    player_ids = [record["playerid"] for record in result]
+    all_rel_types = sorted(set(_get_relationship_type_from_game_id(g) for g in range(1, 20)) | {"TEAMMATE_IN_OTHER"})
+
+    total_edges = 0
+    for start in range(0, len(player_ids), batch_size):
+        batch = player_ids[start:start + batch_size]
+        for rel_type in all_rel_types:
+            total_edges += await db.run_unit_of_work(
+                _collapse_per_game_relationships_unit_of_work,
+                player_ids=batch,
+                rel_type=rel_type,
+            )
+        logger.info(
+            "Migrated players %s/%s (%s aggregated edges written so far)",
+            min(start + batch_size, len(player_ids)),
+            len(player_ids),
+            total_edges,
+        )
+    # Recheck rather than assume, in case a per-game load ran alongside.
+    remaining = await scan_per_game_relationships(db)
+    logger.info(
+        "Aggregation finished: %s aggregated edges written%s.",
+        total_edges,
+        ", per-game relationships remain" if remaining else "",
+    )
+
+def _api_graph_model(graph_model: str) -> str:
+    # The API names layouts by how they are queried: bipartite, or teammate edges.
+    return "bipartite" if graph_model == GRAPH_MODEL_BIPARTITE else "teammate"
+
+async def store_player_centrality(graph_model: str = GRAPH_MODEL_AGGREGATED, graph=None) -> PlayerCentrality:
+    """
+    Computes every player's teammate degree (overall, per game type, per
+    decade) and approximate closeness/betweenness, and stores them as Player
+    properties the API reads at startup.
+    """
+    started = time.perf_counter()
+    if graph is None:
+        graph = await teammate_graph.build_teammate_graph_from_db(graph_model=_api_graph_model(graph_model))
+    centrality = compute_player_centrality(graph, samples=settings.CENTRALITY_SAMPLES)
+    await write_player_centrality(centrality)
+    logger.info(
+        "Stored centrality for %s players in %.1fs.",
+        centrality.player_count,
+        time.perf_counter() - started,
+    )
+    return centrality
+
+async def write_graph_snapshot(
+    graph_model: str = GRAPH_MODEL_AGGREGATED,
+    snapshot_path: str = "",
+    graph=None,
+    landmark_ranking=None,
+):
+    """
+    Reads the loaded teammate graph back from Neo4j (unless `graph` is given)
+    and writes the mmap-able snapshot the API maps at startup, landmark
+    distances included so workers do not have to rebuild them. Landmarks are
+    picked by `landmark_ranking` when given, by degree otherwise.
+    """
+    snapshot_path = snapshot_path or settings.GRAPH_SNAPSHOT_PATH
+    if not snapshot_path:
+        logger.info("GRAPH_SNAPSHOT_PATH is empty; skipping graph snapshot.")
+        return
+
+    started = time.perf_counter()
+    api_graph_model = _api_graph_model(graph_model)
+    if graph is None:
+        graph = await teammate_graph.build_teammate_graph_from_db(graph_model=api_graph_model)
+    if settings.LANDMARK_COUNT > 0:
+        offsets, neighbors = graph.unfiltered_adjacency()
+        graph.landmarks = build_landmark_index(offsets, neighbors, settings.LANDMARK_COUNT, landmark_ranking)
+    teammate_graph.save_teammate_graph_snapshot(
+        graph,
+        snapshot_path,
+        graph_model=api_graph_model,
+    )
+    # Deltas up to the snapshot's version are now part of it.
+    if settings.GRAPH_DELTA_LOG_PATH:
+        compact_graph_deltas(settings.GRAPH_DELTA_LOG_PATH, graph.version)
+    logger.info("Wrote graph snapshot to %s in %.1fs.", snapshot_path, time.perf_counter() - started)
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Populate NHL teammate graph data into Neo4j.")
     parser.add_argument("--clear", action="store_true", help="Delete all nodes and relationships from Neo4j.")
     parser.add_argument("--create-indexes", action="store_true", help="Create Neo4j indexes for faster querying.")
+    parser.add_argument(
+        "--aggregate-edges",
+        action="store_true",
+        help="Migrate existing per-game teammate relationships to the aggregated layout.",
+    )
+    parser.add_argument(
+        "--write-snapshot",
+        action="store_true",
+        help="Only write the mmap-able graph snapshot for the API from the current database.",
+    )
+    parser.add_argument(
+        "--compute-centrality",
+        action="store_true",
+        help="Only recompute the per-player degree/centrality table and store it as Player properties.",
+    )
+    parser.add_argument(
+        "--rebuild-catalog",
+        action="store_true",
+        help="Only rebuild the catalog of processed games, teams, season bounds and latest game.",
+    )
+    parser.add_argument(
+        "--snapshot-path",
+        default="",
+        help="Directory for the graph snapshot. Default: GRAPH_SNAPSHOT_PATH from settings.",
+    )
+    parser.add_argument(
+        "--graph-model",
+        choices=GRAPH_MODELS,
+        default=GRAPH_MODEL_AGGREGATED,
+        help=(
+            "Graph layout to write. 'aggregated' (default): one teammate edge per pair, team, season and game type. "
+            "'per-game': one teammate edge per pair per game. 'bipartite': Player-[:PLAYED_IN]->TeamSeason."
+        ),
+    )
     parser.add_argument(
         "--start-season",
         type=int,
@@ -193,6 +447,10 @@ def parse_args() -> argparse.Namespace:
     )
     return parser.parse_args()
 
+# Games written between two graph version bumps. Larger batches touch the Meta
+# node less often; smaller ones let the API see new games sooner.
+_PUBLISH_BATCH_SIZE = 250
+
 async def main(args: argparse.Namespace):
     """
     Main function to run the data pipeline. It fetches all possible game IDs,
@@ -204,12 +462,20 @@ async def main(args: argparse.Namespace):
     async with httpx.AsyncClient() as client:
         # 1. Get all game IDs that are already in the database.
         logger.info("Checking for games already in the database...")
-        existing_game_ids = await get_existing_game_ids(db)
-        logger.info(f"Found {len(existing_game_ids)} games already processed.")
+        existing_game_ids = await get_existing_game_ids(db, args.graph_model)
+        logger.info(f"Found {len(existing_game_ids)} games already processed with graph model '{args.graph_model}'.")
 
         if args.start_season > args.end_season:
             raise ValueError("--start-season cannot be greater than --end-season")
 
+        # Aggregated edges are MERGEd on (type, team, season), which would also match
+        # per-game relationships, so mixed layouts must be migrated first.
+        if args.graph_model == GRAPH_MODEL_AGGREGATED and await has_per_game_relationships(db):
+            raise ValueError(
+                "Database still contains per-game teammate relationships. "
+                "Run with --aggregate-edges first, or pass --graph-model per-game."
+            )
+
         # 2. Fetch all game IDs for the requested seasons from the NHL API.
         all_possible_seasons = range(args.start_season, args.end_season + 1)
         logger.info(f"Fetching all game IDs for seasons {all_possible_seasons.start} to {all_possible_seasons.stop - 1}...")
@@ -237,13 +503,51 @@ async def main(args: argparse.Namespace):
 
         logger.info(f"Found {len(game_ids_to_process)} new games to process.")
         logger.info(f"Sample of games to process: {game_ids_to_process[:20]}")
+        version_before_load = await get_graph_version(db)
 
-        # 4. Process all missing games concurrently.
+        # 4. Process all missing games concurrently, publishing the graph version
+        # and catalog once per batch so the games never contend on the Meta node.
+        load_started = time.perf_counter()
         semaphore = asyncio.Semaphore(25)
-        game_tasks = [process_game(client, db, game_id, semaphore) for game_id in game_ids_to_process]
-        await asyncio.gather(*game_tasks)
+        for start in range(0, len(game_ids_to_process), _PUBLISH_BATCH_SIZE):
+            game_tasks = [
+                process_game(client, db, game_id, semaphore, graph_model=args.graph_model)
+                for game_id in game_ids_to_process[start:start + _PUBLISH_BATCH_SIZE]
+            ]
+            results = await asyncio.gather(*game_tasks, return_exceptions=True)
+            written = [result for result in results if isinstance(result, dict)]
+            if written:
+                await publish_games(db, written, graph_model=args.graph_model)
+            # Games that did commit are published above before a failure stops the run.
+            failure = next((result for result in results if isinstance(result, BaseException)), None)
+            if failure is not None:
+                raise failure
+        logger.info(
+            "Loaded %s games with graph model '%s' in %.1fs.",
+            len(game_ids_to_process),
+            args.graph_model,
+            time.perf_counter() - load_started,
+        )
 
-def _update_graph_for_game_unit_of_work(tx, all_player_ids, players_to_update, game_data, home_player_ids, away_player_ids, game_id, rel_type):
+    # Every published batch bumps the graph version, so an unchanged version means
+    # nothing was written (e.g. every game failed or had no roster) and the
+    # stored centrality and snapshot are still current.
+    if await get_graph_version(db) == version_before_load:
+        logger.info("Graph version unchanged; skipping centrality and snapshot refresh.")
+        return
+
+    # 5. Refresh the centrality table and the snapshot API workers map at startup.
+    # Betweenness makes better landmarks than raw degree: hubs that bridge eras and leagues.
+    graph = await teammate_graph.build_teammate_graph_from_db(graph_model=_api_graph_model(args.graph_model))
+    centrality = await store_player_centrality(args.graph_model, graph=graph)
+    await write_graph_snapshot(
+        args.graph_model,
+        args.snapshot_path,
+        graph=graph,
+        landmark_ranking=centrality.betweenness if settings.CENTRALITY_SAMPLES > 0 else None,
+    )
+
+def _update_graph_for_game_unit_of_work(tx, all_player_ids, players_to_update, game_data, home_player_ids, away_player_ids, game_id, rel_type, graph_model=GRAPH_MODEL_AGGREGATED):
     """
     A single, atomic unit of work to update the graph for one game.
     This function is executed within a managed, auto-retrying transaction.
@@ -283,43 +587,115 @@ def _update_graph_for_game_unit_of_work(tx, all_player_ids, players_to_update, g
 
     # 3. Create teammate relationships
     # The relationship type (e.g., TEAMMATE_IN_REGULAR_SEASON) is now dynamic.
-    teammate_query = f"""
-        UNWIND $player_ids as p1_id
-        UNWIND $player_ids as p2_id
-        WITH p1_id, p2_id WHERE p1_id < p2_id
-        MATCH (p1:Player {{id: p1_id}}), (p2:Player {{id: p2_id}})
-        MERGE (p1)-[:{rel_type} {{gameId: $game_id, season: $season, team: $tricode}}]-(p2)
-    """
+    if graph_model == GRAPH_MODEL_BIPARTITE:
+        _update_team_seasons_for_game(tx, game_data, home_player_ids, away_player_ids, rel_type)
+        teammate_query = None
+    elif graph_model == GRAPH_MODEL_PER_GAME:
+        teammate_query = f"""
+            UNWIND $player_ids as p1_id
+            UNWIND $player_ids as p2_id
+            WITH p1_id, p2_id WHERE p1_id < p2_id
+            MATCH (p1:Player {{id: p1_id}}), (p2:Player {{id: p2_id}})
+            MERGE (p1)-[:{rel_type} {{gameId: $game_id, season: $season, team: $tricode}}]-(p2)
+        """
+    else:
+        # One edge per (pair, team, season, type), always stored from the lower
+        # to the higher player ID, accumulating the games played together.
+        teammate_query = f"""
+            UNWIND $player_ids as p1_id
+            UNWIND $player_ids as p2_id
+            WITH p1_id, p2_id WHERE p1_id < p2_id
+            MATCH (p1:Player {{id: p1_id}}), (p2:Player {{id: p2_id}})
+            MERGE (p1)-[r:{rel_type} {{season: $season, team: $tricode}}]->(p2)
+            ON CREATE SET r.games = 0, r.firstGameId = $game_id, r.lastGameId = $game_id
+            SET r.games = r.games + 1,
+                r.firstGameId = CASE WHEN $game_id < r.firstGameId THEN $game_id ELSE r.firstGameId END,
+                r.lastGameId = CASE WHEN $game_id > r.lastGameId THEN $game_id ELSE r.lastGameId END
+        """
 
     home_player_ids.sort()
     away_player_ids.sort()
 
-    tx.run(teammate_query,
-           player_ids=home_player_ids,
-           game_id=game_id,
-           season=game_data['season'],
-           tricode=game_data['homeTeam']['abbrev'])
+    if teammate_query is not None:
+        tx.run(teammate_query,
+               player_ids=home_player_ids,
+               game_id=game_id,
+               season=game_data['season'],
+               tricode=game_data['homeTeam']['abbrev'])
+
+        tx.run(teammate_query,
+               player_ids=away_player_ids,
+               game_id=game_id,
+               season=game_data['season'],
+               tricode=game_data['awayTeam']['abbrev'])
+
+    # 4. Record the game as processed. Aggregated edges keep no per-game IDs, so
+    # this node is what makes reruns skip the game instead of double counting it.
+    tx.run(
+        f"""
+        MERGE (g:Game {{id: $game_id}})
+        ON CREATE SET g.graphModels = []
+        SET g.season = $season, g.type = $rel_type,
+            g.graphModels = CASE
+                WHEN $graph_model IN {_GAME_GRAPH_MODELS} THEN {_GAME_GRAPH_MODELS}
+                ELSE {_GAME_GRAPH_MODELS} + $graph_model
+            END
+        """,
+        game_id=game_id,
+        season=game_data['season'],
+        rel_type=rel_type,
+        graph_model=graph_model,
+    )
 
-    tx.run(teammate_query,
-           player_ids=away_player_ids,
-           game_id=game_id,
-           season=game_data['season'],
-           tricode=game_data['awayTeam']['abbrev'])
+    # The graph version and catalog live on the single Meta node, which every
+    # game would contend on; publish_games updates them once per batch instead.
 
-async def process_game(client: httpx.AsyncClient, db: session.GraphDB, game_id: int, semaphore: asyncio.Semaphore):
+def _update_team_seasons_for_game(tx, game_data, home_player_ids, away_player_ids, rel_type):
     """
-    Process a single game, fetching data and updating the graph.
+    Bipartite layout: links each player in the game to their TeamSeason node,
+    counting games and recording which game types they appeared in.
+    """
+    rosters = [
+        (game_data['homeTeam']['abbrev'], sorted(home_player_ids)),
+        (game_data['awayTeam']['abbrev'], sorted(away_player_ids)),
+    ]
+    # Lock TeamSeason nodes in a canonical order, mirroring the player locking above,
+    # so two games between the same teams cannot deadlock on them.
+    rosters.sort(key=lambda roster: roster[0])
+    for tricode, player_ids in rosters:
+        tx.run(
+            """
+            MERGE (ts:TeamSeason {tricode: $tricode, season: $season})
+            WITH ts
+            UNWIND $player_ids AS p_id
+            MATCH (p:Player {id: p_id})
+            MERGE (p)-[r:PLAYED_IN]->(ts)
+            ON CREATE SET r.games = 0, r.types = []
+            SET r.games = r.games + 1,
+                r.types = CASE WHEN $rel_type IN r.types THEN r.types ELSE r.types + $rel_type END
+            """,
+            tricode=tricode,
+            season=game_data['season'],
+            player_ids=player_ids,
+            rel_type=rel_type,
+        )
+
+async def process_game(client: httpx.AsyncClient, db: session.GraphDB, game_id: int, semaphore: asyncio.Semaphore, graph_model: str = GRAPH_MODEL_AGGREGATED) -> Optional[Dict[str, Any]]:
+    """
+    Process a single game, fetching data and updating the graph. Returns the
+    game's delta fields (see build_game_delta, minus the version) for
+    publish_games, or None when nothing was written.
     """
     async with semaphore:
         game_data = await sources.fetch_game_boxscore(client, game_id)
 
         if not game_data:
-            return
+            return None
 
         # FIX: Check for the existence of player stats to prevent KeyErrors.
         if 'playerByGameStats' not in game_data or not game_data.get('playerByGameStats'):
             logger.warning(f"Skipping game {game_id}: Missing or empty 'playerByGameStats' data.")
-            return
+            return None
 
         # 1. Extract all unique player IDs from the game.
         home_player_ids = _extract_player_ids_from_roster(game_data['playerByGameStats']['homeTeam'])
@@ -327,7 +703,7 @@ async def process_game(client: httpx.AsyncClient, db: session.GraphDB, game_id:
         all_player_ids_in_game = list(set(home_player_ids + away_player_ids))
 
         if not all_player_ids_in_game:
-            return
+            return None
 
         # 2. Check which players already have a full name in the graph.
         records = await db.run_query(
@@ -368,10 +744,50 @@ async def process_game(client: httpx.AsyncClient, db: session.GraphDB, game_id:
             home_player_ids=home_player_ids,
             away_player_ids=away_player_ids,
             game_id=game_id,
-            rel_type=rel_type
+            rel_type=rel_type,
+            graph_model=graph_model,
         )
-
         logger.info(f"Processed game {game_id} for graph.")
+        return {
+            "game_id": game_id,
+            "season": game_data['season'],
+            "rel_type": rel_type,
+            "rosters": {
+                game_data['homeTeam']['abbrev']: home_player_ids,
+                game_data['awayTeam']['abbrev']: away_player_ids,
+            },
+            "names": {player['id']: player['fullName'] for player in players_to_update},
+        }
+
+def _publish_games_unit_of_work(tx, games, graph_model=GRAPH_MODEL_AGGREGATED) -> int:
+    version = bump_graph_version(tx, count=len(games))
+    update_graph_catalog(
+        tx,
+        game_ids=[game["game_id"] for game in games],
+        seasons=[game["season"] for game in games],
+        teams=[team for game in games for team in game["rosters"]],
+        per_game=graph_model == GRAPH_MODEL_PER_GAME,
+    )
+    return version
+
+async def publish_games(db: session.GraphDB, games: List[Dict[str, Any]], graph_model: str = GRAPH_MODEL_AGGREGATED) -> None:
+    """
+    Makes a batch of committed games visible to the API: one transaction on the
+    Meta node advances the graph version by the batch size and folds the games
+    into the catalog, then each game is appended to the delta log under its
+    own version from that range.
+    """
+    games = sorted(games, key=lambda game: game["game_id"])
+    version = await db.run_unit_of_work(_publish_games_unit_of_work, games=games, graph_model=graph_model)
+    if not settings.GRAPH_DELTA_LOG_PATH:
+        return
+    first_version = version - len(games) + 1
+    for offset, game in enumerate(games):
+        try:
+            append_graph_delta(settings.GRAPH_DELTA_LOG_PATH, build_game_delta(version=first_version + offset, **game))
+        except OSError:
+            # The API notices the missing version and falls back to a full reload.
+            logger.warning(f"Could not append game {game['game_id']} to the graph delta log.", exc_info=True)
 
 if __name__ == "__main__":
     try:
@@ -381,6 +797,14 @@ if __name__ == "__main__":
             asyncio.run(clear_database())
         elif args.create_indexes:
             asyncio.run(create_indexes())
+        elif args.aggregate_edges:
+            asyncio.run(aggregate_per_game_relationships())
+        elif args.rebuild_catalog:
+            asyncio.run(rebuild_graph_catalog(session.get_graph_db()))
+        elif args.compute_centrality:
+            asyncio.run(store_player_centrality(args.graph_model))
+        elif args.write_snapshot:
+            asyncio.run(write_graph_snapshot(args.graph_model, args.snapshot_path))
         else:
             asyncio.run(main(args))
         logger.info("Pipeline finished successfully.")
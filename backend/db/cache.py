@@ -0,0 +1,270 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from backend.db.schema_catalog import get_schema_catalog
+from backend.db.teammate_graph import get_teammate_graph
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # Callers that arrived while an identical call was in flight and shared its result.
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+def current_graph_version() -> Optional[int]:
+    """
+    The newest graph version this process knows about without a round trip:
+    the in-memory teammate graph's, else the schema catalog's, else None.
+    """
+    graph = get_teammate_graph()
+    if graph is not None:
+        return graph.version
+    catalog = get_schema_catalog()
+    if catalog is not None:
+        return catalog.graph_version
+    return None
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turns list/set/dict arguments into hashable equivalents for the cache key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def _read_only(value: Any) -> Any:
+    """
+    Deep read-only form of a cached result: lists become tuples and dicts
+    mapping proxies, so a caller cannot change what every other caller gets.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_read_only(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    return value
+
+
+_caches: Dict[str, "AsyncCache"] = {}
+
+
+class AsyncCache:
+    """
+    LRU + TTL memo table for one coroutine function. Keys combine the call
+    arguments with `scope()` (by default the graph version), so results
+    from before a pipeline write are never served after the process has
+    seen the new version. Identical calls made while one is in flight await
+    that call instead of issuing their own query; failures are not cached.
+    Results are shared, so they are handed out read-only (see _read_only).
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        maxsize: int,
+        ttl_seconds: float,
+        scope: Callable[[], Hashable],
+    ):
+        self.func = func
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.scope = scope
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+
+    async def _load(self, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        return _read_only(await self.func(*args, **kwargs))
+
+    async def _load_batch(self, items: List[Hashable], args: Tuple, kwargs: Dict[str, Any]) -> Dict[Hashable, Any]:
+        values = await self.func(items, *args, **kwargs)
+        return {item: _read_only(value) for item, value in values.items()}
+
+    def _key(self, args: Tuple, kwargs: Dict[str, Any]) -> Tuple:
+        return (self.scope(), _freeze(args), _freeze(kwargs))
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def call(self, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return await self.func(*args, **kwargs)
+
+        key = self._key(args, kwargs)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.stats.expirations += 1
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.stats.coalesced += 1
+            # Shielded so one waiter being cancelled does not cancel the query for the others.
+            return await asyncio.shield(pending)
+
+        self.stats.misses += 1
+        task = asyncio.ensure_future(self._load(args, kwargs))
+        self._in_flight[key] = task
+        task.add_done_callback(functools.partial(self._finish, key))
+        return await asyncio.shield(task)
+
+    async def call_batch(self, items: Iterable[Hashable], args: Tuple, kwargs: Dict[str, Any]) -> Dict[Hashable, Any]:
+        """
+        Per-item form of `call` for batch getters: `func(items, *args, **kwargs)`
+        returns a dict with one value per item, and each item is cached on its
+        own. Items neither cached nor in flight are loaded in a single call.
+        """
+        items = list(dict.fromkeys(items))
+        if self.maxsize <= 0 or self.ttl_seconds <= 0:
+            return await self.func(items, *args, **kwargs)
+
+        base = self._key(args, kwargs)
+        now = time.monotonic()
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        missing: List[Hashable] = []
+        for item in items:
+            key = (*base, item)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    results[item] = entry[1]
+                    continue
+                del self._entries[key]
+                self.stats.expirations += 1
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.stats.coalesced += 1
+                waiting[item] = pending
+            else:
+                self.stats.misses += 1
+                missing.append(item)
+
+        if missing:
+            task = asyncio.ensure_future(self._load_batch(missing, args, kwargs))
+            for item in missing:
+                self._in_flight[(*base, item)] = task
+                waiting[item] = task
+            task.add_done_callback(functools.partial(self._finish_batch, base, missing))
+
+        for item, pending in waiting.items():
+            results[item] = (await asyncio.shield(pending)).get(item)
+        return results
+
+    def _finish(self, key: Tuple, task: asyncio.Future) -> None:
+        # Runs even if every caller was cancelled, so a finished query is still
+        # cached and its exception is always retrieved.
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def _finish_batch(self, base: Tuple, items: List[Hashable], task: asyncio.Future) -> None:
+        for item in items:
+            key = (*base, item)
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            values = task.result()
+            for item in items:
+                self._store((*base, item), values.get(item))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.stats),
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "in_flight": len(self._in_flight),
+        }
+
+
+def async_cached(
+    maxsize: int = 1024,
+    ttl_seconds: float = 300.0,
+    scope: Callable[[], Hashable] = current_graph_version,
+):
+    """
+    Memoizes an async getter whose result depends only on its arguments and
+    the graph. Results are shared between callers, so lists come back as
+    tuples and dicts as read-only mappings. The undecorated function stays
+    available as `.uncached`.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        cache = AsyncCache(func, maxsize, ttl_seconds, scope)
+        _caches[func.__qualname__] = cache
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await cache.call(args, kwargs)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def async_batch_cached(
+    maxsize: int = 1024,
+    ttl_seconds: float = 300.0,
+    scope: Callable[[], Hashable] = current_graph_version,
+):
+    """
+    Like `async_cached`, for a getter called as `func(items, *args, **kwargs)`
+    that returns a dict keyed by item: every item is cached separately, so a
+    batch only loads the items no earlier call has answered.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Dict[Hashable, Any]]]):
+        cache = AsyncCache(func, maxsize, ttl_seconds, scope)
+        _caches[func.__qualname__] = cache
+
+        @functools.wraps(func)
+        async def wrapper(items: Iterable[Hashable], *args: Any, **kwargs: Any) -> Dict[Hashable, Any]:
+            return await cache.call_batch(items, args, kwargs)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss/coalesce/eviction counters and sizes of every memoized getter."""
+    return {name: cache.info() for name, cache in _caches.items()}
+
+
+def clear_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
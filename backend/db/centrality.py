@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import random
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.db.session import get_graph_db
+
+logger = logging.getLogger("uvicorn.error")
+
+# Players written per UNWIND when storing centrality as Player properties.
+_WRITE_BATCH_SIZE = 1000
+
+
+class PlayerCentrality:
+    """
+    Per-player connectivity table, one slot per player in `player_ids`:
+
+    - `degree`: distinct teammates over every team, season and game type
+    - `degree_by_type[rel_type]` / `degree_by_decade[decade]`: distinct
+      teammates through edges of that relationship type / decade (1990, 2000, ...)
+    - `closeness`: inverse of the mean hop distance from a sample of pivot
+      players (0 when no pivot reaches the player)
+    - `betweenness`: Brandes betweenness estimated from the same pivots and
+      scaled to the whole graph
+    """
+
+    def __init__(
+        self,
+        player_ids: Sequence[int],
+        degree: Sequence[int],
+        closeness: Sequence[float],
+        betweenness: Sequence[float],
+        degree_by_type: Dict[str, Sequence[int]],
+        degree_by_decade: Dict[int, Sequence[int]],
+    ):
+        self.player_ids = player_ids
+        self.degree = degree
+        self.closeness = closeness
+        self.betweenness = betweenness
+        self.degree_by_type = degree_by_type
+        self.degree_by_decade = degree_by_decade
+        self._index_by_id = {int(player_id): idx for idx, player_id in enumerate(player_ids)}
+
+    @property
+    def player_count(self) -> int:
+        return len(self.player_ids)
+
+    def index_of(self, player_id: int) -> Optional[int]:
+        return self._index_by_id.get(int(player_id))
+
+    def stats_for(self, player_id: int) -> Optional[Dict[str, Any]]:
+        idx = self.index_of(player_id)
+        if idx is None:
+            return None
+        return {
+            "degree": int(self.degree[idx]),
+            "degree_by_type": {
+                rel_type: int(counts[idx]) for rel_type, counts in sorted(self.degree_by_type.items()) if counts[idx]
+            },
+            "degree_by_decade": {
+                decade: int(counts[idx]) for decade, counts in sorted(self.degree_by_decade.items()) if counts[idx]
+            },
+            "closeness": float(self.closeness[idx]),
+            "betweenness": float(self.betweenness[idx]),
+        }
+
+
+def _sampled_brandes(
+    offsets: Sequence[int],
+    neighbors: Sequence[int],
+    pivots: Sequence[int],
+) -> tuple[array, array]:
+    """
+    Runs one BFS per pivot over an unweighted, undirected CSR and accumulates
+    Brandes dependencies (betweenness) and hop distances (closeness).
+    """
+    player_count = len(offsets) - 1
+    betweenness = array("d", [0.0]) * player_count
+    distance_sum = array("q", [0]) * player_count
+    reached_by = array("i", [0]) * player_count
+
+    for source in pivots:
+        distance = {source: 0}
+        sigma = {source: 1}
+        order: List[int] = []
+        frontier = [source]
+        while frontier:
+            next_frontier: List[int] = []
+            for node in frontier:
+                order.append(node)
+                node_depth = distance[node] + 1
+                for pos in range(offsets[node], offsets[node + 1]):
+                    neighbor = neighbors[pos]
+                    neighbor_depth = distance.get(neighbor)
+                    if neighbor_depth is None:
+                        distance[neighbor] = node_depth
+                        sigma[neighbor] = 0
+                        next_frontier.append(neighbor)
+                        neighbor_depth = node_depth
+                    if neighbor_depth == node_depth:
+                        sigma[neighbor] += sigma[node]
+            frontier = next_frontier
+
+        dependency: Dict[int, float] = {}
+        for node in reversed(order):
+            node_depth = distance[node]
+            node_dependency = dependency.get(node, 0.0)
+            coefficient = (1.0 + node_dependency) / sigma[node]
+            for pos in range(offsets[node], offsets[node + 1]):
+                predecessor = neighbors[pos]
+                if distance.get(predecessor) == node_depth - 1:
+                    dependency[predecessor] = dependency.get(predecessor, 0.0) + sigma[predecessor] * coefficient
+            if node != source:
+                betweenness[node] += node_dependency
+                distance_sum[node] += node_depth
+                reached_by[node] += 1
+
+    return betweenness, array("d", (
+        reached / total if total else 0.0 for reached, total in zip(reached_by, distance_sum)
+    ))
+
+
+def compute_player_centrality(graph: Any, samples: int = 64, seed: int = 0) -> PlayerCentrality:
+    """
+    Computes the connectivity table for every player of a TeammateGraph: exact
+    degrees per relationship type and decade from the edge arrays, and
+    closeness/betweenness estimated from `samples` random pivot BFS runs.
+    """
+    started = time.perf_counter()
+    player_count = graph.player_count
+    degree = array("i", [0]) * player_count
+    degree_by_type = {rel_type: array("i", [0]) * player_count for rel_type in graph.type_codes}
+    degree_by_decade: Dict[int, array] = {}
+
+    unfiltered_offsets, unfiltered_neighbors = graph.unfiltered_adjacency()
+    for idx in range(player_count):
+        degree[idx] = unfiltered_offsets[idx + 1] - unfiltered_offsets[idx]
+        by_type: Dict[int, set] = {}
+        by_decade: Dict[int, set] = {}
+        for neighbor, _, season_year, type_code in graph.iter_edges(idx):
+            by_type.setdefault(type_code, set()).add(neighbor)
+            by_decade.setdefault(season_year // 10 * 10, set()).add(neighbor)
+        for type_code, teammates in by_type.items():
+            degree_by_type[graph.type_codes[type_code]][idx] = len(teammates)
+        for decade, teammates in by_decade.items():
+            if decade not in degree_by_decade:
+                degree_by_decade[decade] = array("i", [0]) * player_count
+            degree_by_decade[decade][idx] = len(teammates)
+
+    pivots = random.Random(seed).sample(range(player_count), min(max(0, samples), player_count))
+    betweenness, closeness = _sampled_brandes(unfiltered_offsets, unfiltered_neighbors, pivots)
+    if pivots:
+        # Each undirected pair is counted from both ends; scale the sample up to all sources.
+        scale = player_count / len(pivots) / 2.0
+        for idx in range(player_count):
+            betweenness[idx] *= scale
+
+    player_ids = array("q", (graph.player_id_at(idx) for idx in range(player_count)))
+    logger.info(
+        "Computed player centrality players=%s pivots=%s elapsed=%.3fs",
+        player_count,
+        len(pivots),
+        time.perf_counter() - started,
+    )
+    return PlayerCentrality(player_ids, degree, closeness, betweenness, degree_by_type, degree_by_decade)
+
+
+async def write_player_centrality(centrality: PlayerCentrality) -> None:
+    """Stores the table as Player properties (parallel key/count lists for the per-type and per-decade degrees)."""
+    db = get_graph_db()
+    query = """
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.id})
+        SET p.teammateDegree = row.degree,
+            p.degreeTypes = row.degree_types,
+            p.degreeTypeCounts = row.degree_type_counts,
+            p.degreeDecades = row.degree_decades,
+            p.degreeDecadeCounts = row.degree_decade_counts,
+            p.closeness = row.closeness,
+            p.betweenness = row.betweenness
+    """
+    rows: List[Dict[str, Any]] = []
+    for player_id in centrality.player_ids:
+        stats = centrality.stats_for(player_id)
+        rows.append(
+            {
+                "id": int(player_id),
+                "degree": stats["degree"],
+                "degree_types": list(stats["degree_by_type"]),
+                "degree_type_counts": list(stats["degree_by_type"].values()),
+                "degree_decades": list(stats["degree_by_decade"]),
+                "degree_decade_counts": list(stats["degree_by_decade"].values()),
+                "closeness": stats["closeness"],
+                "betweenness": stats["betweenness"],
+            }
+        )
+        if len(rows) >= _WRITE_BATCH_SIZE:
+            await db.run_query(query, {"rows": rows})
+            rows = []
+    if rows:
+        await db.run_query(query, {"rows": rows})
+
+
+async def read_player_centrality() -> Optional[PlayerCentrality]:
+    """Reads the table back from Player properties, or None when it has never been computed."""
+    db = get_graph_db()
+    result = await db.run_query(
+        """
+        MATCH (p:Player)
+        WHERE p.teammateDegree IS NOT NULL
+        RETURN p.id AS id, p.teammateDegree AS degree,
+               p.degreeTypes AS degree_types, p.degreeTypeCounts AS degree_type_counts,
+               p.degreeDecades AS degree_decades, p.degreeDecadeCounts AS degree_decade_counts,
+               p.closeness AS closeness, p.betweenness AS betweenness
+        ORDER BY id
+        """
+    )
+    if not result:
+        return None
+
+    player_count = len(result)
+    player_ids = array("q", (int(record["id"]) for record in result))
+    degree = array("i", (int(record["degree"]) for record in result))
+    closeness = array("d", (float(record["closeness"] or 0.0) for record in result))
+    betweenness = array("d", (float(record["betweenness"] or 0.0) for record in result))
+    degree_by_type: Dict[str, array] = {}
+    degree_by_decade: Dict[int, array] = {}
+    for idx, record in enumerate(result):
+        for rel_type, count in zip(record["degree_types"] or [], record["degree_type_counts"] or []):
+            degree_by_type.setdefault(rel_type, array("i", [0]) * player_count)[idx] = int(count)
+        for decade, count in zip(record["degree_decades"] or [], record["degree_decade_counts"] or []):
+            degree_by_decade.setdefault(int(decade), array("i", [0]) * player_count)[idx] = int(count)
+    return PlayerCentrality(player_ids, degree, closeness, betweenness, degree_by_type, degree_by_decade)
+
+
+_player_centrality: Optional[PlayerCentrality] = None
+
+
+def get_player_centrality() -> Optional[PlayerCentrality]:
+    """Returns the in-memory centrality table, or None if it has not been loaded."""
+    return _player_centrality
+
+
+async def load_player_centrality(graph: Any = None, samples: int = 64) -> Optional[PlayerCentrality]:
+    """
+    Loads the stored table at API warmup. When the pipeline has not stored one
+    yet but the in-memory graph is available, computes it off the event loop.
+    """
+    global _player_centrality
+    centrality = await read_player_centrality()
+    if centrality is None and graph is not None:
+        loop = asyncio.get_running_loop()
+        centrality = await loop.run_in_executor(None, compute_player_centrality, graph, samples)
+    _player_centrality = centrality
+    return centrality
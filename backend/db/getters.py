@@ -1,16 +1,50 @@
+import functools
 import logging
 import time
 import asyncio
 import random
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from backend.core.config import settings
+from backend.db.cache import async_batch_cached, async_cached, current_graph_version
+from backend.db.centrality import get_player_centrality
+from backend.db.graph_catalog import read_graph_catalog
+from backend.db.graph_deltas import get_graph_version
+from backend.db.landmarks import INFINITE_DISTANCE
+from backend.db.name_index import NameIndex, PrefixIndex, fold_name
+from backend.db.path_search import (
+    BidirectionalSearch,
+    BreadthFirstTree,
+    ShortestPathCounter,
+    WaypointPathBuilder,
+    order_waypoints,
+    run_bidirectional_search_async,
+    run_breadth_first_tree,
+    run_breadth_first_tree_async,
+    run_path_counter_async,
+)
+from backend.db.schema_catalog import (
+    fetch_season_year_bounds,
+    fetch_teams,
+    get_schema_catalog,
+    request_schema_catalog_load,
+)
 from backend.db.session import get_graph_db
+from backend.db.teammate_graph import get_teammate_graph
 
 # NOTE: This adds a dependency on `thefuzz` library for fuzzy string matching.
 # You may need to install it: pip install "thefuzz[speedup]"
 from thefuzz import process
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict
 
 _DEFAULT_PATH_REL_TYPES = ["TEAMMATE_IN_REGULAR_SEASON", "TEAMMATE_IN_PLAYOFFS"]
+GRAPH_MODEL_BIPARTITE = "bipartite"
+# Waypoint orders are searched exhaustively (2^n subsets), so cap include_players.
+MAX_PATH_WAYPOINTS = 8
+# Hop limit and visited-player budget for path searches that were not given a
+# max_hops, so one request cannot turn into an unbounded whole-graph traversal.
+_UNBOUNDED_PATH_HOPS = 20
+_PATH_MAX_VISITED_NODES = 40000
 logger = logging.getLogger("uvicorn.error")
 
 def _year_to_season(year: int) -> int:
@@ -24,7 +58,21 @@ def _season_to_label(season: int) -> str:
     end_year = season % 10000
     return f"{start_year}-{str(end_year)[-2:]}"
 
-async def get_all_players() -> List[Dict[str, Any]]:
+def _uses_bipartite_model() -> bool:
+    return settings.GRAPH_MODEL == GRAPH_MODEL_BIPARTITE
+
+def _cache_scope() -> Tuple[str, Optional[int]]:
+    # The benchmark switches GRAPH_MODEL in-process, so it is part of the key too.
+    return settings.GRAPH_MODEL, current_graph_version()
+
+def _memoized(maxsize: int):
+    return async_cached(maxsize=maxsize, ttl_seconds=settings.GETTER_CACHE_TTL_SECONDS, scope=_cache_scope)
+
+def _memoized_batch(maxsize: int):
+    return async_batch_cached(maxsize=maxsize, ttl_seconds=settings.GETTER_CACHE_TTL_SECONDS, scope=_cache_scope)
+
+@_memoized(1)
+async def get_all_players() -> Sequence[Mapping[str, Any]]:
     db = get_graph_db()
     query = """
     MATCH (p:Player)
@@ -44,6 +92,12 @@ async def get_all_playerids() -> List[int]:
 
 async def get_playerids_sample(limit: int = 2000) -> List[int]:
     """Returns a bounded sample of player IDs for fast in-memory random selection."""
+    graph = get_teammate_graph()
+    if graph is not None:
+        candidates = await _indexed_candidates(graph)
+        picked = random.sample(range(len(candidates)), min(int(limit), len(candidates)))
+        return [graph.player_id_at(candidates[pos]) for pos in picked]
+
     db = get_graph_db()
     query = """
         MATCH (p:Player)
@@ -54,63 +108,62 @@ async def get_playerids_sample(limit: int = 2000) -> List[int]:
     result = await db.run_query(query, {"limit": int(limit)})
     return [record["playerid"] for record in result]
 
-async def get_all_teams() -> List[str]:
-    db = get_graph_db()
-    query = "MATCH ()-[r]->() WHERE r.team IS NOT NULL RETURN DISTINCT r.team AS teamid ORDER BY teamid"
-    result = await db.run_query(query)
-    return [record["teamid"] for record in result]
+@_memoized(1)
+async def get_all_teams() -> Sequence[str]:
+    catalog = get_schema_catalog()
+    if catalog is not None:
+        return list(catalog.teams)
+    return await fetch_teams(get_graph_db())
 
 async def get_all_games() -> List[int]:
+    """
+    Returns every processed game ID. Games are tracked as :Game nodes; until
+    the graph catalog has been built, the gameId scan also covers
+    relationships written with the legacy per-game layout.
+    """
     db = get_graph_db()
-    query = "MATCH ()-[r]->() WHERE r.gameId IS NOT NULL RETURN DISTINCT r.gameId AS gameid"
+    if await read_graph_catalog(db) is not None:
+        result = await db.run_query("MATCH (g:Game) RETURN g.id AS gameid")
+        return [record["gameid"] for record in result]
+
+    query = """
+        MATCH (g:Game) RETURN g.id AS gameid
+        UNION
+        MATCH ()-[r]->() WHERE r.gameId IS NOT NULL RETURN DISTINCT r.gameId AS gameid
+    """
     result = await db.run_query(query)
     return [record["gameid"] for record in result]
 
 
-async def get_season_year_bounds() -> Optional[Dict[str, int]]:
+@_memoized(1)
+async def get_season_year_bounds() -> Optional[Mapping[str, int]]:
     """
     Returns the min/max available season start years from relationship data.
     Example: season 20232024 returns year 2023.
     """
-    db = get_graph_db()
-    query = """
-        MATCH ()-[r]-()
-        WHERE r.season IS NOT NULL
-        RETURN min(r.season) AS min_season, max(r.season) AS max_season
-    """
-    result = await db.run_query(query)
-    if not result:
-        return None
-
-    min_season = result[0].get("min_season")
-    max_season = result[0].get("max_season")
-    if min_season is None or max_season is None:
-        return None
-
-    return {
-        "min_year": int(min_season) // 10000,
-        "max_year": int(max_season) // 10000,
-    }
+    catalog = get_schema_catalog()
+    if catalog is not None:
+        return dict(catalog.season_bounds) if catalog.season_bounds else None
+    return await fetch_season_year_bounds(get_graph_db())
 
 
 async def get_existing_relationship_types(candidate_types: Optional[List[str]] = None) -> List[str]:
     """
     Returns relationship types currently present in the database.
     If candidate_types is provided, only matching types are returned.
+    Read from the schema catalog, so requests never wait on schema
+    introspection; until it has loaded, the in-memory graph's types are used,
+    or the candidates are trusted as-is.
     """
-    db = get_graph_db()
-    query = "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType"
-    try:
-        # Schema introspection can occasionally stall; fail fast and fall back.
-        result = await asyncio.wait_for(db.run_query(query), timeout=2.0)
-    except asyncio.TimeoutError:
-        logger.error("Timed out fetching relationship types from Neo4j schema")
-        return candidate_types or []
-    except Exception:
-        logger.exception("Failed fetching relationship types from Neo4j schema")
-        return candidate_types or []
-
-    existing = [record["relationshipType"] for record in result]
+    catalog = get_schema_catalog()
+    if catalog is not None:
+        existing = list(catalog.relationship_types)
+    else:
+        request_schema_catalog_load()
+        graph = get_teammate_graph()
+        if graph is None:
+            return list(candidate_types or [])
+        existing = list(graph.type_codes)
 
     if candidate_types is None:
         return existing
@@ -118,16 +171,59 @@ async def get_existing_relationship_types(candidate_types: Optional[List[str]] =
     candidate_set = set(candidate_types)
     return [rel_type for rel_type in existing if rel_type in candidate_set]
 
+@_memoized(1)
 async def get_year_of_most_recent_game_played() -> Optional[str]:
     db = get_graph_db()
-    query = "MATCH ()-[r]->() WHERE r.gameId IS NOT NULL RETURN r.gameId AS gameId ORDER BY gameId DESC LIMIT 1"
+    catalog = await read_graph_catalog(db)
+    if catalog is not None:
+        return str(catalog.latest_game_id)[:4] if catalog.latest_game_id is not None else None
+
+    query = """
+        CALL {
+            MATCH (g:Game) RETURN g.id AS gameId
+            UNION
+            MATCH ()-[r]->() WHERE r.lastGameId IS NOT NULL RETURN r.lastGameId AS gameId
+            UNION
+            MATCH ()-[r]->() WHERE r.gameId IS NOT NULL RETURN r.gameId AS gameId
+        }
+        RETURN gameId ORDER BY gameId DESC LIMIT 1
+    """
     result = await db.run_query(query)
     if not result:
         return None
     game_id = result[0]["gameId"]
     return str(game_id)[:4]
 
+async def _indexed_candidates(
+    graph,
+    teams: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+) -> Sequence[int]:
+    """Returns the in-memory graph's cached pool of player indexes with an edge matching the filters."""
+    edge_filter = graph.compile_filter(
+        teams=teams,
+        start_year=start_year,
+        end_year=end_year,
+        game_types=game_types,
+    )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, graph.candidate_players, edge_filter)
+
+
+async def _pick_indexed_playerid(graph, **filters: Any) -> Optional[int]:
+    candidates = await _indexed_candidates(graph, **filters)
+    if not candidates:
+        return None
+    return graph.player_id_at(random.choice(candidates))
+
+
 async def get_random_playerid() -> Optional[int]:
+    graph = get_teammate_graph()
+    if graph is not None:
+        return await _pick_indexed_playerid(graph)
+
     db = get_graph_db()
     bounds_query = """
         MATCH (p:Player)
@@ -167,6 +263,10 @@ async def get_random_playerid() -> Optional[int]:
     return wrap_result[0]["playerid"] if wrap_result else None
 
 async def get_random_playerid_from_team_and_years(tricode: str, loweryear: int, upperyear: int) -> Optional[int]:
+    graph = get_teammate_graph()
+    if graph is not None:
+        return await _pick_indexed_playerid(graph, teams=[tricode], start_year=loweryear, end_year=upperyear)
+
     db = get_graph_db()
     query = """
         MATCH (p:Player)-[r]-()
@@ -185,6 +285,10 @@ async def get_random_playerid_from_team_and_years(tricode: str, loweryear: int,
     return result[0]["playerid"] if result else None
 
 async def get_random_playerid_from_team(tricode: str) -> Optional[int]:
+    graph = get_teammate_graph()
+    if graph is not None:
+        return await _pick_indexed_playerid(graph, teams=[tricode])
+
     db = get_graph_db()
     query = """
         MATCH (p:Player)-[r]-()
@@ -198,6 +302,10 @@ async def get_random_playerid_from_team(tricode: str) -> Optional[int]:
     return result[0]["playerid"] if result else None
 
 async def get_random_playerid_from_years(loweryear: int, upperyear: int) -> Optional[int]:
+    graph = get_teammate_graph()
+    if graph is not None:
+        return await _pick_indexed_playerid(graph, start_year=loweryear, end_year=upperyear)
+
     db = get_graph_db()
     query = """
         MATCH (p:Player)-[r]-()
@@ -221,7 +329,28 @@ async def get_random_player_with_filters(
 ) -> Optional[Dict[str, Any]]:
     """
     Gets a random player (ID and name) based on a combination of optional filters.
+    With the in-memory graph loaded this is a random pick from the cached
+    candidate pool for the filters instead of a scan over every relationship.
     """
+    graph = get_teammate_graph()
+    if graph is not None:
+        player_id = await _pick_indexed_playerid(
+            graph,
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        full_name = None
+        if player_id is not None:
+            full_name = graph.name_of(player_id) or await get_name_from_playerid(player_id)
+        if not full_name:
+            return {"random_player": None}
+        return {"random_player": {"id": player_id, "fullName": full_name}}
+
+    if _uses_bipartite_model():
+        return await _get_random_player_with_filters_bipartite(teams, start_year, end_year, game_types)
+
     db = get_graph_db()
     params: Dict[str, Any] = {}
 
@@ -259,7 +388,45 @@ async def get_random_player_with_filters(
         return {"random_player": None}
     return {"random_player": result[0]["random_player"]}
 
-async def get_all_teammates_of_player(playerid: int) -> List[Dict[str, Any]]:
+
+async def get_random_player_in_component(
+    teams: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+    min_component_size: int = 2,
+) -> Optional[Dict[str, Any]]:
+    """
+    Like `get_random_player_with_filters`, but only returns players whose
+    connected component under the filters has at least `min_component_size`
+    players, so a start player always has someone to connect to. Uses the
+    cached component labelling of the in-memory teammate graph; falls back to
+    `get_random_player_with_filters` when the graph is not loaded.
+    """
+    graph = get_teammate_graph()
+    if graph is None:
+        return await get_random_player_with_filters(teams, start_year, end_year, game_types)
+
+    edge_filter = graph.compile_filter(
+        teams=teams,
+        start_year=start_year,
+        end_year=end_year,
+        game_types=game_types,
+    )
+    loop = asyncio.get_running_loop()
+    components = await loop.run_in_executor(None, graph.components, edge_filter)
+    idx = components.sample(min_component_size)
+    if idx is None:
+        return {"random_player": None}
+
+    player_id = graph.player_id_at(idx)
+    full_name = graph.name_of(player_id) or await get_name_from_playerid(player_id)
+    if not full_name:
+        return {"random_player": None}
+    return {"random_player": {"id": player_id, "fullName": full_name}}
+
+@_memoized(1024)
+async def get_all_teammates_of_player(playerid: int) -> Sequence[Mapping[str, Any]]:
     db = get_graph_db()
     query = """
         MATCH (p1:Player {id: $playerid})-[]-(p2:Player)
@@ -269,16 +436,20 @@ async def get_all_teammates_of_player(playerid: int) -> List[Dict[str, Any]]:
     result = await db.run_query(query, {"playerid": playerid})
     return [{"id": record["id"], "full_name": record["full_name"]} for record in result]
 
+@_memoized(2048)
 async def get_teammates_of_player_with_options(
     playerid: int,
     teams: Optional[List[str]] = None,
     start_year: Optional[int] = None,
     end_year: Optional[int] = None,
     game_types: Optional[List[str]] = None,
-) -> List[Dict[str, Any]]:
+) -> Sequence[Mapping[str, Any]]:
     """
     Finds all teammates of a player, with optional filters for teams, years, and game types.
     """
+    if _uses_bipartite_model():
+        return await _get_teammates_of_player_bipartite(playerid, teams, start_year, end_year, game_types)
+
     db = get_graph_db()
     params: Dict[str, Any] = {"playerid": playerid}
 
@@ -309,14 +480,91 @@ async def get_teammates_of_player_with_options(
     result = await db.run_query(query, params)
     return [{"id": record["id"], "full_name": record["full_name"]} for record in result]
 
+async def get_teammates_for_frontier(
+    frontier: List[int],
+    teams: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+    batch_size: Optional[int] = None,
+    row_limit: Optional[int] = None,
+) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+    """
+    Expands a whole BFS level in as few round trips as possible: the frontier is
+    sent to Neo4j with UNWIND (in chunks of `batch_size`) and the distinct
+    (source, teammate) pairs matching the same filters as
+    get_teammates_of_player_with_options are returned, grouped by source ID.
+
+    Returns None when any chunk would produce more than `row_limit` rows, so
+    callers can abort instead of pulling an unbounded level into memory.
+    """
+    if not frontier:
+        return {}
+
+    if _uses_bipartite_model():
+        return await _get_teammates_for_frontier_bipartite(
+            frontier, teams, start_year, end_year, game_types, batch_size, row_limit
+        )
+
+    batch_size = max(1, int(batch_size or settings.PATH_FRONTIER_BATCH_SIZE))
+    row_limit = max(1, int(row_limit or settings.PATH_FRONTIER_ROW_LIMIT))
+
+    db = get_graph_db()
+    params: Dict[str, Any] = {"row_limit": row_limit + 1}
+
+    rel_type_str = ""
+    if game_types:
+        rel_type_str = f":{'|'.join(game_types)}"
+
+    where_clauses = ["p2.fullName IS NOT NULL"]
+    if teams:
+        where_clauses.append("r.team IN $teams")
+        params["teams"] = [t.upper() for t in teams]
+    if start_year is not None:
+        where_clauses.append("r.season >= $start_year")
+        params["start_year"] = _year_to_season(start_year)
+    if end_year is not None:
+        where_clauses.append("r.season <= $end_year")
+        params["end_year"] = _year_to_season(end_year)
+
+    query = f"""
+        UNWIND $frontier AS source_id
+        MATCH (p1:Player {{id: source_id}})-[r{rel_type_str}]-(p2:Player)
+        WHERE {" AND ".join(where_clauses)}
+        WITH DISTINCT source_id, p2
+        RETURN source_id, p2.id AS id, p2.fullName AS full_name
+        LIMIT $row_limit
+    """
+
+    expansion: Dict[int, List[Dict[str, Any]]] = {int(source_id): [] for source_id in frontier}
+    for start in range(0, len(frontier), batch_size):
+        chunk = [int(source_id) for source_id in frontier[start:start + batch_size]]
+        result = await db.run_query(query, {**params, "frontier": chunk})
+        if len(result) > row_limit:
+            logger.warning(
+                "Frontier expansion exceeded row limit frontier_size=%s chunk_size=%s row_limit=%s",
+                len(frontier),
+                len(chunk),
+                row_limit,
+            )
+            return None
+        for record in result:
+            expansion[int(record["source_id"])].append({"id": record["id"], "full_name": record["full_name"]})
+    return expansion
+
+
+@_memoized(4096)
 async def get_common_teams(
     player1_id: int,
     player2_id: int,
     start_year: Optional[int] = None,
     end_year: Optional[int] = None,
     game_types: Optional[List[str]] = None,
-) -> List[str]:
+) -> Sequence[str]:
     """Finds all teams where two players were teammates, with optional filters."""
+    if _uses_bipartite_model():
+        return await _get_common_teams_bipartite(player1_id, player2_id, start_year, end_year, game_types)
+
     db = get_graph_db()
     params: Dict[str, Any] = {"p1_id": player1_id, "p2_id": player2_id}
 
@@ -346,6 +594,26 @@ async def get_common_teams(
     return [record["teamid"] for record in result]
 
 
+def _filter_fingerprint(
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> Tuple:
+    """Hashable, order-insensitive key for a teams/years/game-types filter combination."""
+    return (
+        tuple(sorted({team.upper() for team in teams})) if teams else None,
+        start_year,
+        end_year,
+        tuple(sorted(set(game_types))) if game_types else None,
+    )
+
+
+def _format_team_season_links(links: Iterable[Tuple[str, int]]) -> List[str]:
+    ordered = sorted(set(links), key=lambda link: (-link[1], link[0]))
+    return [f"{team} {_season_to_label(season)}" for team, season in ordered]
+
+
 async def get_common_team_seasons(
     player1_id: int,
     player2_id: int,
@@ -353,10 +621,83 @@ async def get_common_team_seasons(
     start_year: Optional[int] = None,
     end_year: Optional[int] = None,
     game_types: Optional[List[str]] = None,
+    use_cache: bool = True,
 ) -> List[str]:
     """Returns distinct common teammate links as 'TEAM YYYY-YY' labels."""
+    step_links = await get_common_team_seasons_for_steps(
+        [(player1_id, player2_id)],
+        teams=teams,
+        start_year=start_year,
+        end_year=end_year,
+        game_types=game_types,
+        use_cache=use_cache,
+    )
+    return step_links[0]
+
+
+async def get_common_team_seasons_for_steps(
+    steps: List[Tuple[int, int]],
+    teams: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+    use_cache: bool = True,
+) -> List[List[str]]:
+    """
+    Batch form of `get_common_team_seasons`: returns the labels of every
+    `(player1_id, player2_id)` step, in order. Answered from the in-memory
+    teammate graph when loaded (no query at all), otherwise from a per-pair
+    cache with the misses read in a single UNWIND query. `use_cache=False`
+    skips the cache entirely (the graph-model benchmark times real queries).
+    """
+    graph = get_teammate_graph()
+    if graph is not None:
+        edge_filter = graph.compile_filter(
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        step_links: List[List[str]] = []
+        for player1_id, player2_id in steps:
+            idx1 = graph.index_of(player1_id)
+            idx2 = graph.index_of(player2_id)
+            links = graph.team_seasons_between(idx1, idx2, edge_filter) if idx1 is not None and idx2 is not None else []
+            step_links.append(_format_team_season_links((team, _year_to_season(year)) for team, year in links))
+        return step_links
+
+    fingerprint = _filter_fingerprint(teams, start_year, end_year, game_types)
+    pairs = [(min(int(a), int(b)), max(int(a), int(b))) for a, b in steps]
+    load = _load_common_team_seasons if use_cache else _load_common_team_seasons.uncached
+    labels_by_pair = await load(sorted(set(pairs)), fingerprint)
+    return [list(labels_by_pair[pair]) for pair in pairs]
+
+
+@_memoized_batch(4096)
+async def _load_common_team_seasons(
+    pairs: List[Tuple[int, int]],
+    fingerprint: Tuple,
+) -> Dict[Tuple[int, int], Sequence[str]]:
+    """Common team-season labels per unordered player pair under a filter fingerprint, in one query."""
+    teams, start_year, end_year, game_types = fingerprint
+    teams = list(teams) if teams else None
+    game_types = list(game_types) if game_types else None
+    if _uses_bipartite_model():
+        links_by_pair = await _get_common_team_seasons_bipartite(pairs, teams, start_year, end_year, game_types)
+    else:
+        links_by_pair = await _get_common_team_seasons_for_pairs(pairs, teams, start_year, end_year, game_types)
+    return {pair: _format_team_season_links(links_by_pair.get(pair, ())) for pair in pairs}
+
+
+async def _get_common_team_seasons_for_pairs(
+    pairs: List[Tuple[int, int]],
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> Dict[Tuple[int, int], List[Tuple[str, int]]]:
     db = get_graph_db()
-    params: Dict[str, Any] = {"p1_id": player1_id, "p2_id": player2_id}
+    params: Dict[str, Any] = {"pairs": [list(pair) for pair in pairs]}
 
     rel_type_str = ""
     if game_types:
@@ -374,15 +715,203 @@ async def get_common_team_seasons(
         params["end_year"] = _year_to_season(end_year)
 
     query = f"""
-        MATCH (p1:Player {{id: $p1_id}})-[r{rel_type_str}]-(p2:Player {{id: $p2_id}})
+        UNWIND $pairs AS pair
+        MATCH (p1:Player {{id: pair[0]}})-[r{rel_type_str}]-(p2:Player {{id: pair[1]}})
+        WHERE {" AND ".join(where_clauses)}
+        RETURN pair[0] AS p1_id, pair[1] AS p2_id, collect(DISTINCT [r.team, r.season]) AS links
+    """
+    result = await db.run_query(query, params)
+    return {
+        (int(record["p1_id"]), int(record["p2_id"])): [(team, int(season)) for team, season in record["links"]]
+        for record in result
+    }
+
+# --- Bipartite (Player)-[:PLAYED_IN]->(TeamSeason) layout ---
+#
+# Same contracts as the teammate-edge getters above, answered against the
+# bipartite layout written by `run_pipeline.py --graph-model bipartite`.
+# A teammate is a two-hop traversal through a shared TeamSeason node. For
+# game-type filters, two players count as teammates in a type when both of
+# their PLAYED_IN relationships to that TeamSeason list it.
+
+def _bipartite_where_clauses(
+    params: Dict[str, Any],
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+    membership_vars: List[str],
+) -> List[str]:
+    where_clauses: List[str] = []
+    if teams:
+        where_clauses.append("ts.tricode IN $teams")
+        params["teams"] = [team.upper() for team in teams]
+    if start_year is not None:
+        where_clauses.append("ts.season >= $start_year")
+        params["start_year"] = _year_to_season(start_year)
+    if end_year is not None:
+        where_clauses.append("ts.season <= $end_year")
+        params["end_year"] = _year_to_season(end_year)
+    if game_types:
+        params["game_types"] = list(game_types)
+        shared_type = " AND ".join(f"game_type IN {var}.types" for var in membership_vars)
+        where_clauses.append(f"any(game_type IN $game_types WHERE {shared_type})")
+    return where_clauses
+
+
+async def _get_teammates_of_player_bipartite(
+    playerid: int,
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> List[Dict[str, Any]]:
+    db = get_graph_db()
+    params: Dict[str, Any] = {"playerid": playerid}
+    where_clauses = ["p2 <> p1", "p2.fullName IS NOT NULL"]
+    where_clauses += _bipartite_where_clauses(params, teams, start_year, end_year, game_types, ["r1", "r2"])
+    query = f"""
+        MATCH (p1:Player {{id: $playerid}})-[r1:PLAYED_IN]->(ts:TeamSeason)<-[r2:PLAYED_IN]-(p2:Player)
         WHERE {" AND ".join(where_clauses)}
-        RETURN DISTINCT r.team AS teamid, r.season AS season
-        ORDER BY season DESC, teamid ASC
+        RETURN DISTINCT p2.id AS id, p2.fullName AS full_name
+    """
+    result = await db.run_query(query, params)
+    return [{"id": record["id"], "full_name": record["full_name"]} for record in result]
+
+
+async def _get_teammates_for_frontier_bipartite(
+    frontier: List[int],
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+    batch_size: Optional[int],
+    row_limit: Optional[int],
+) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+    batch_size = max(1, int(batch_size or settings.PATH_FRONTIER_BATCH_SIZE))
+    row_limit = max(1, int(row_limit or settings.PATH_FRONTIER_ROW_LIMIT))
+
+    db = get_graph_db()
+    params: Dict[str, Any] = {"row_limit": row_limit + 1}
+    where_clauses = ["p2 <> p1", "p2.fullName IS NOT NULL"]
+    where_clauses += _bipartite_where_clauses(params, teams, start_year, end_year, game_types, ["r1", "r2"])
+    query = f"""
+        UNWIND $frontier AS source_id
+        MATCH (p1:Player {{id: source_id}})-[r1:PLAYED_IN]->(ts:TeamSeason)<-[r2:PLAYED_IN]-(p2:Player)
+        WHERE {" AND ".join(where_clauses)}
+        WITH DISTINCT source_id, p2
+        RETURN source_id, p2.id AS id, p2.fullName AS full_name
+        LIMIT $row_limit
+    """
+
+    expansion: Dict[int, List[Dict[str, Any]]] = {int(source_id): [] for source_id in frontier}
+    for start in range(0, len(frontier), batch_size):
+        chunk = [int(source_id) for source_id in frontier[start:start + batch_size]]
+        result = await db.run_query(query, {**params, "frontier": chunk})
+        if len(result) > row_limit:
+            logger.warning(
+                "Frontier expansion exceeded row limit frontier_size=%s chunk_size=%s row_limit=%s",
+                len(frontier),
+                len(chunk),
+                row_limit,
+            )
+            return None
+        for record in result:
+            expansion[int(record["source_id"])].append({"id": record["id"], "full_name": record["full_name"]})
+    return expansion
+
+
+async def _get_common_teams_bipartite(
+    player1_id: int,
+    player2_id: int,
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> List[str]:
+    db = get_graph_db()
+    params: Dict[str, Any] = {"p1_id": player1_id, "p2_id": player2_id}
+    where_clauses = _bipartite_where_clauses(params, None, start_year, end_year, game_types, ["r1", "r2"])
+    where_str = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    query = f"""
+        MATCH (p1:Player {{id: $p1_id}})-[r1:PLAYED_IN]->(ts:TeamSeason)<-[r2:PLAYED_IN]-(p2:Player {{id: $p2_id}})
+        {where_str}
+        RETURN DISTINCT ts.tricode AS teamid
+        ORDER BY teamid
+    """
+    result = await db.run_query(query, params)
+    return [record["teamid"] for record in result]
+
+
+async def _get_common_team_seasons_bipartite(
+    pairs: List[Tuple[int, int]],
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> Dict[Tuple[int, int], List[Tuple[str, int]]]:
+    db = get_graph_db()
+    params: Dict[str, Any] = {"pairs": [list(pair) for pair in pairs]}
+    where_clauses = _bipartite_where_clauses(params, teams, start_year, end_year, game_types, ["r1", "r2"])
+    where_str = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    query = f"""
+        UNWIND $pairs AS pair
+        MATCH (p1:Player {{id: pair[0]}})-[r1:PLAYED_IN]->(ts:TeamSeason)<-[r2:PLAYED_IN]-(p2:Player {{id: pair[1]}})
+        {where_str}
+        RETURN pair[0] AS p1_id, pair[1] AS p2_id, collect(DISTINCT [ts.tricode, ts.season]) AS links
     """
     result = await db.run_query(query, params)
-    return [f"{record['teamid']} {_season_to_label(int(record['season']))}" for record in result]
+    return {
+        (int(record["p1_id"]), int(record["p2_id"])): [(team, int(season)) for team, season in record["links"]]
+        for record in result
+    }
 
-async def get_reg_and_playoff_teammates_of_player(playerid: int) -> List[int]:
+
+async def _get_teams_from_playerid_bipartite(
+    playerid: int,
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> List[str]:
+    db = get_graph_db()
+    params: Dict[str, Any] = {"playerid": playerid}
+    where_clauses = _bipartite_where_clauses(params, None, start_year, end_year, game_types, ["r"])
+    where_str = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    query = f"""
+        MATCH (p:Player {{id: $playerid}})-[r:PLAYED_IN]->(ts:TeamSeason)
+        {where_str}
+        RETURN DISTINCT ts.tricode AS teamid
+        ORDER BY teamid
+    """
+    result = await db.run_query(query, params)
+    return [record["teamid"] for record in result]
+
+
+async def _get_random_player_with_filters_bipartite(
+    teams: Optional[List[str]],
+    start_year: Optional[int],
+    end_year: Optional[int],
+    game_types: Optional[List[str]],
+) -> Optional[Dict[str, Any]]:
+    db = get_graph_db()
+    params: Dict[str, Any] = {}
+    where_clauses = _bipartite_where_clauses(params, teams, start_year, end_year, game_types, ["r"])
+    where_str = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    query = f"""
+        MATCH (p:Player)-[r:PLAYED_IN]->(ts:TeamSeason)
+        {where_str}
+        WITH DISTINCT p, rand() AS random_value
+        ORDER BY random_value
+        LIMIT 1
+        RETURN p AS random_player
+    """
+    result = await db.run_query(query, params)
+    if not result:
+        return {"random_player": None}
+    return {"random_player": result[0]["random_player"]}
+
+
+@_memoized(1024)
+async def get_reg_and_playoff_teammates_of_player(playerid: int) -> Sequence[int]:
     """Finds all teammates of a player from regular season and playoff games only."""
     db = get_graph_db()
     rel_types = await get_existing_relationship_types(_DEFAULT_PATH_REL_TYPES)
@@ -397,7 +926,8 @@ async def get_reg_and_playoff_teammates_of_player(playerid: int) -> List[int]:
     result = await db.run_query(query, {"playerid": playerid})
     return [record["playerid"] for record in result]
 
-async def get_reg_and_playoff_common_teams(player1_id: int, player2_id: int) -> List[str]:
+@_memoized(4096)
+async def get_reg_and_playoff_common_teams(player1_id: int, player2_id: int) -> Sequence[str]:
     """Finds common teams for two players, but only from regular season and playoff games."""
     db = get_graph_db()
     rel_types = await get_existing_relationship_types(_DEFAULT_PATH_REL_TYPES)
@@ -413,52 +943,182 @@ async def get_reg_and_playoff_common_teams(player1_id: int, player2_id: int) ->
     result = await db.run_query(query, params)
     return [record["teamid"] for record in result]
 
-async def get_players_by_name(name: str) -> List[Dict[str, Any]]:
+_NAME_INDEX_CANDIDATES = 300
+_name_indexes: Optional[Tuple[NameIndex, PrefixIndex]] = None
+_name_indexes_key: Optional[Tuple[int, int]] = None
+_name_indexes_lock = asyncio.Lock()
+
+
+def _build_name_indexes(players: List[Tuple[int, str]], graph) -> Tuple[NameIndex, PrefixIndex]:
+    # Typeahead ranks by teammate degree: the centrality table when loaded, else the graph's adjacency.
+    score: Dict[int, float] = {}
+    centrality = get_player_centrality()
+    if centrality is not None:
+        score = {int(player_id): centrality.degree[idx] for idx, player_id in enumerate(centrality.player_ids)}
+    elif graph is not None:
+        offsets, _ = graph.unfiltered_adjacency()
+        score = {graph.player_id_at(idx): offsets[idx + 1] - offsets[idx] for idx in range(graph.player_count)}
+    return NameIndex(players), PrefixIndex(players, score)
+
+
+async def _get_name_indexes() -> Tuple[NameIndex, PrefixIndex]:
     """
-    Finds players matching a given name using fuzzy search.
+    Returns the trigram (fuzzy search) and prefix (typeahead) name indexes,
+    rebuilding them when the graph version moves or the centrality table
+    arrives. Names come from the in-memory teammate graph when it is loaded.
+    The version is the one this process already knows; Neo4j is only asked
+    when it knows none and no indexes have been built yet.
+    """
+    global _name_indexes, _name_indexes_key
+    graph = get_teammate_graph()
+    version = current_graph_version()
+    if version is None:
+        version = _name_indexes_key[0] if _name_indexes_key is not None else await get_graph_version(get_graph_db())
+    key = (version, id(get_player_centrality()))
+    if _name_indexes is not None and _name_indexes_key == key:
+        return _name_indexes
+
+    async with _name_indexes_lock:
+        if _name_indexes is not None and _name_indexes_key == key:
+            return _name_indexes
+        started = time.perf_counter()
+        if graph is not None and graph.names is not None:
+            players = [
+                (graph.player_id_at(idx), graph.name_of(graph.player_id_at(idx)))
+                for idx in range(graph.player_count)
+            ]
+        else:
+            players = [(p["playerid"], p["name"]) for p in await get_all_players()]
+        loop = asyncio.get_running_loop()
+        _name_indexes = await loop.run_in_executor(None, _build_name_indexes, players, graph)
+        _name_indexes_key = key
+        logger.info(
+            "Built player name indexes names=%s version=%s elapsed=%.3fs",
+            len(_name_indexes[0]),
+            version,
+            time.perf_counter() - started,
+        )
+        return _name_indexes
+
 
-    NOTE: This implementation fetches all players into memory to perform the
-    fuzzy search. For a very large player database, this could be slow.
-    An alternative would be to use a database extension like Neo4j's APOC
-    for in-database fuzzy matching if available.
+async def suggest_players_by_prefix(prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
-    # 1. Get all players from the database. We can reuse the existing getter.
-    all_players = await get_all_players()  # This returns [{"playerid": ..., "name": ...}]
+    Typeahead: players whose first, last or full name starts with `prefix`
+    (case and diacritics ignored), best-connected first. Misspellings need
+    `get_players_by_name`.
+    """
+    _, prefix_index = await _get_name_indexes()
+    return [{"id": player_id, "full_name": name} for player_id, name in prefix_index.search(prefix, limit)]
 
-    # 2. Create a mapping from a player name to a list of players with that name.
-    # This handles cases where multiple players have the same name.
-    player_map = defaultdict(list)
-    for p in all_players:
-        player_map[p["name"]].append(p)
 
-    # 3. Use thefuzz to find the best matching names, limited to 25 results.
-    best_matches = process.extract(name, player_map.keys(), limit=25)
+async def get_players_by_name(name: str) -> List[Dict[str, Any]]:
+    """
+    Finds players matching a given name using fuzzy search. Candidates come
+    from a trigram index over diacritic-folded names, and only those are
+    scored, so "lindstrom" finds "Lindström" without scanning every player.
+    """
+    folded_query = fold_name(name)
+    if not folded_query:
+        return []
+    index, _ = await _get_name_indexes()
+    slots = index.candidates(folded_query, _NAME_INDEX_CANDIDATES)
 
-    # 4. Filter matches by a score threshold and format the final result list.
+    # Limited to 25 names; a score of 75 is a reasonable threshold to avoid very poor matches.
+    best_matches = process.extract(folded_query, {slot: index.folded[slot] for slot in slots}, limit=25)
     results = []
-    for match_name, score in best_matches:
-        # A score of 75 is a reasonable threshold to avoid very poor matches.
+    for _, score, slot in best_matches:
         if score >= 75:
-            # Since multiple players can have the same name, extend the results list.
-            players_with_match_name = player_map[match_name]
-            for player_data in players_with_match_name:
-                results.append({"id": player_data["playerid"], "full_name": player_data["name"]})
+            # Since multiple players can have the same name, every one of them is returned.
+            for player_id in index.players_by_slot[slot]:
+                results.append({"id": player_id, "full_name": index.names[slot]})
     return results
 
+# Names read from Neo4j (or warmed at startup) for players the in-memory graph
+# cannot name, least recently used evicted first. Dropped whenever the graph
+# version this process knows about moves (see cache.current_graph_version),
+# so names written by the pipeline since show up. The bound comfortably holds
+# every player, so warming at startup fits.
+_PLAYER_NAME_CACHE_SIZE = 50000
+_player_name_cache: "OrderedDict[int, str]" = OrderedDict()
+_player_name_cache_version: Optional[int] = None
+
+
+def _remember_player_names(names: Iterable[Tuple[int, str]]) -> None:
+    for playerid, name in names:
+        _player_name_cache[playerid] = name
+        _player_name_cache.move_to_end(playerid)
+    while len(_player_name_cache) > _PLAYER_NAME_CACHE_SIZE:
+        _player_name_cache.popitem(last=False)
+
+
+async def warm_player_name_cache() -> None:
+    """Loads every player's name at startup when the in-memory graph does not carry a name table."""
+    global _player_name_cache_version
+    graph = get_teammate_graph()
+    if graph is not None and graph.names is not None:
+        return
+    players = await get_all_players()
+    _remember_player_names((int(p["playerid"]), p["name"]) for p in players)
+    _player_name_cache_version = current_graph_version()
+
+
+async def get_names_for_playerids(playerids: List[int]) -> Dict[int, str]:
+    """
+    Resolves many player IDs to full names at once. Names come from the
+    in-memory teammate graph and the process name cache; IDs neither knows are
+    fetched in a single UNWIND query. Unknown players are left out.
+    """
+    global _player_name_cache_version
+    graph = get_teammate_graph()
+    version = current_graph_version()
+    if version is not None and version != _player_name_cache_version:
+        _player_name_cache.clear()
+        _player_name_cache_version = version
+
+    names: Dict[int, str] = {}
+    missing: List[int] = []
+    for playerid in dict.fromkeys(int(playerid) for playerid in playerids):
+        name = _player_name_cache.get(playerid)
+        if name is not None:
+            _player_name_cache.move_to_end(playerid)
+        elif graph is not None:
+            name = graph.name_of(playerid)
+        if name:
+            names[playerid] = name
+        else:
+            missing.append(playerid)
+
+    if missing:
+        db = get_graph_db()
+        query = """
+            UNWIND $playerids AS playerid
+            MATCH (p:Player {id: playerid})
+            WHERE p.fullName IS NOT NULL
+            RETURN p.id AS playerid, p.fullName AS name
+        """
+        result = await db.run_query(query, {"playerids": missing})
+        fetched = [(int(record["playerid"]), record["name"]) for record in result]
+        names.update(fetched)
+        _remember_player_names(fetched)
+    return names
+
+
 async def get_name_from_playerid(playerid: int) -> Optional[str]:
-    """Gets a player's full name from their ID."""
-    db = get_graph_db()
-    query = "MATCH (p:Player {id: $playerid}) RETURN p.fullName AS name"
-    result = await db.run_query(query, {"playerid": playerid})
-    return result[0]["name"] if result else None
+    """Gets a player's full name from their ID, through the process name cache."""
+    names = await get_names_for_playerids([playerid])
+    return names.get(int(playerid))
 
+@_memoized(4096)
 async def get_teams_from_playerid(
     playerid: int,
     start_year: Optional[int] = None,
     end_year: Optional[int] = None,
     game_types: Optional[List[str]] = None,
-) -> List[str]:
+) -> Sequence[str]:
     """Gets all unique team tricodes a player has played for, with optional filters."""
+    if _uses_bipartite_model():
+        return await _get_teams_from_playerid_bipartite(playerid, start_year, end_year, game_types)
+
     db = get_graph_db()
     params: Dict[str, Any] = {"playerid": playerid}
 
@@ -498,74 +1158,265 @@ async def find_shortest_path_between_players(
     max_hops: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Finds the shortest path between two players using APOC expandConfig,
-    optimized by pushing year filters into relationshipFilter, reducing maxLevel,
-    and minimizing post-filtering in Cypher for better performance.
+    Finds the shortest path between two players. Every player in
+    `include_players` must appear on the path (visited in the order that keeps
+    it shortest), no player in `exclude_players` may, and no player appears
+    twice. Runs against the in-memory teammate graph when it is loaded,
+    otherwise against Neo4j one frontier query per BFS level. Raises
+    ValueError for too many waypoints.
     """
-    db = get_graph_db()
-
-    if game_types:
-        rel_types = await get_existing_relationship_types(game_types)
-    else:
-        rel_types = await get_existing_relationship_types(_DEFAULT_PATH_REL_TYPES)
-
-    if not rel_types:
+    include_ids = [
+        pid for pid in dict.fromkeys(int(pid) for pid in include_players or [])
+        if pid not in (int(player1_id), int(player2_id))
+    ]
+    exclude_ids = {int(pid) for pid in exclude_players or []}
+    if len(include_ids) > MAX_PATH_WAYPOINTS:
+        raise ValueError(f"At most {MAX_PATH_WAYPOINTS} include_players are supported.")
+    if exclude_ids & set(include_ids):
         return []
 
-    rel_filter = "|".join(rel_types) + ">"
-
-    year_filters = []
-    params: Dict[str, Any] = {
-        "p1_id": player1_id,
-        "p2_id": player2_id,
-        "exclude_players": exclude_players or [],
-        "include_players": include_players or [],
-    }
+    graph = get_teammate_graph()
+    if graph is not None:
+        edge_filter = graph.compile_filter(
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types or _DEFAULT_PATH_REL_TYPES,
+        )
+        hop_limit = int(max_hops) if max_hops is not None else _UNBOUNDED_PATH_HOPS
+        if include_ids:
+            search = functools.partial(
+                graph.waypoint_path,
+                int(player1_id),
+                int(player2_id),
+                include_ids,
+                edge_filter=edge_filter,
+                max_hops=hop_limit,
+                blocked_ids=exclude_ids,
+                max_visited_nodes=_PATH_MAX_VISITED_NODES,
+            )
+        else:
+            search = functools.partial(
+                graph.shortest_path,
+                player1_id=int(player1_id),
+                player2_id=int(player2_id),
+                edge_filter=edge_filter,
+                max_hops=hop_limit,
+                blocked_ids=exclude_ids,
+                max_visited_nodes=_PATH_MAX_VISITED_NODES,
+            )
+        # One BFS tree per waypoint can take a while; keep the event loop free.
+        path_ids = await asyncio.get_running_loop().run_in_executor(None, search)
+        return await _resolve_path_nodes(path_ids)
+
+    path_game_types = game_types or _DEFAULT_PATH_REL_TYPES
+    hop_limit = int(max_hops) if max_hops is not None else _UNBOUNDED_PATH_HOPS
+    name_by_node: Dict[int, str] = {}
+    blocked = exclude_ids - {int(player1_id), int(player2_id)}
+
+    def expand_with(search: Any) -> Callable[[List[int]], Awaitable[Dict[int, List[int]]]]:
+        async def expand(frontier: List[int]) -> Dict[int, List[int]]:
+            level = await get_teammates_for_frontier(
+                frontier,
+                start_year=start_year,
+                end_year=end_year,
+                game_types=path_game_types,
+            )
+            if level is None:
+                search.abort("frontier expansion exceeded row limit")
+                return {}
+            expansion: Dict[int, List[int]] = {}
+            for current_id, neighbors in level.items():
+                expansion[current_id] = [int(neighbor["id"]) for neighbor in neighbors]
+                for neighbor in neighbors:
+                    if neighbor.get("full_name"):
+                        name_by_node[int(neighbor["id"])] = neighbor["full_name"]
+            return expansion
+        return expand
+
+    if not include_ids:
+        search = BidirectionalSearch(
+            int(player1_id),
+            int(player2_id),
+            max_hops=hop_limit,
+            max_visited_nodes=_PATH_MAX_VISITED_NODES,
+            blocked=blocked,
+        )
+        path_ids = await run_bidirectional_search_async(search, expand_with(search))
+        return await _resolve_path_nodes(path_ids, known_names=name_by_node)
+
+    stops = [int(player1_id), *include_ids, int(player2_id)]
+    trees: Dict[int, BreadthFirstTree] = {}
+    for stop in stops[:-1]:
+        tree = BreadthFirstTree(
+            stop,
+            [other for other in stops if other != stop],
+            max_depth=hop_limit,
+            blocked=blocked,
+            max_visited_nodes=_PATH_MAX_VISITED_NODES,
+        )
+        trees[stop] = await run_breadth_first_tree_async(tree, expand_with(tree))
 
-    if start_year is not None:
-        params["start_year"] = _year_to_season(start_year)
-        year_filters.append("r.season >= $start_year")
-    if end_year is not None:
-        params["end_year"] = _year_to_season(end_year)
-        year_filters.append("r.season <= $end_year")
+    ordered = order_waypoints(
+        stops[0],
+        stops[-1],
+        include_ids,
+        lambda a, b: trees[a].distance(b),
+    )
+    if ordered is None or ordered[0] > hop_limit:
+        return []
+    builder = WaypointPathBuilder(
+        [stops[0], *ordered[1], stops[-1]],
+        trees,
+        max_hops=hop_limit,
+        blocked=blocked,
+        max_visited_nodes=_PATH_MAX_VISITED_NODES,
+    )
+    while (search := builder.next_search()) is not None:
+        await run_bidirectional_search_async(search, expand_with(search))
+        builder.absorb(search)
+    return await _resolve_path_nodes(builder.path, known_names=name_by_node)
 
-    if year_filters:
-        rel_filter += " AND " + " AND ".join(year_filters)
 
-    max_level_line = f"maxLevel: {int(max_hops)}," if max_hops is not None else ""
-    query = f"""
-    MATCH (start:Player {{id: $p1_id}}), (end:Player {{id: $p2_id}})
-    CALL apoc.path.expandConfig(start, {{
-      relationshipFilter: "{rel_filter}",
-      minLevel: 1,
-      {max_level_line}
-      terminatorNodes: [end],
-      whitelistNodes: $include_players,
-      blacklistNodes: $exclude_players,
-      bfs: true,
-      filterStartNode: true
-    }})
-    YIELD path
-    RETURN [n IN nodes(path) | {{id: n.id, full_name: n.fullName}}] AS path_nodes
-    ORDER BY length(path)
-    LIMIT 1
-    """
-
-    logger.debug("Running shortest-path query p1=%s p2=%s rel_types=%s max_hops=%s", player1_id, player2_id, rel_types, max_hops)
+def _group_pairs_by_source(pairs: List[Tuple[int, int]]) -> Dict[int, List[Tuple[int, int, bool]]]:
+    """
+    Groups pairs by the endpoint searched from. Paths are undirected, so each
+    pair is searched from whichever endpoint appears in more pairs, which keeps
+    the number of BFS trees low. Entries are `(source, target, flipped)`.
+    """
+    appearances: Dict[int, int] = defaultdict(int)
+    for player1_id, player2_id in pairs:
+        appearances[player1_id] += 1
+        appearances[player2_id] += 1
 
-    result = await db.run_query(query, params)
-    if not result:
-        return []
+    groups: Dict[int, List[Tuple[int, int, bool]]] = defaultdict(list)
+    for player1_id, player2_id in pairs:
+        flipped = appearances[player2_id] > appearances[player1_id]
+        source, target = (player2_id, player1_id) if flipped else (player1_id, player2_id)
+        groups[source].append((source, target, flipped))
+    return groups
 
-    path_nodes = result[0]["path_nodes"]
 
-    # Post-filter for include_players: ensure all included players appear on path
-    if params["include_players"]:
-        path_node_ids = {node["id"] for node in path_nodes}
-        if not all(pid in path_node_ids for pid in params["include_players"]):
-            return []  # No path includes all required players
+async def iter_shortest_paths_by_source(
+    pairs: List[Tuple[int, int]],
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+    max_hops: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Answers many shortest-path queries with one BFS tree per distinct source,
+    yielding the results of each source group as soon as its tree is grown.
+    Each result is `{"player1_id", "player2_id", "distance", "path"}`, with
+    `distance` None and `path` empty when the players are not connected, or
+    not within the hop and visited-player budgets the single-pair searches use.
+    """
+    path_game_types = game_types or _DEFAULT_PATH_REL_TYPES
+    groups = _group_pairs_by_source([(int(p1), int(p2)) for p1, p2 in pairs])
+    graph = get_teammate_graph()
+    loop = asyncio.get_running_loop()
+
+    for source, members in groups.items():
+        targets = {target for _, target, _ in members}
+        name_by_node: Dict[int, str] = {}
+        if graph is not None:
+            edge_filter = graph.compile_filter(start_year=start_year, end_year=end_year, game_types=path_game_types)
+            source_idx = graph.index_of(source)
+            index_by_target = {target: graph.index_of(target) for target in targets}
+            tree = None
+            if source_idx is not None:
+                tree = BreadthFirstTree(
+                    source_idx,
+                    [idx for idx in index_by_target.values() if idx is not None],
+                    max_depth=int(max_hops) if max_hops is not None else _UNBOUNDED_PATH_HOPS,
+                    max_visited_nodes=_PATH_MAX_VISITED_NODES,
+                )
+                # Trees over dense filters can take a while; keep the event loop free.
+                await loop.run_in_executor(
+                    None,
+                    run_breadth_first_tree,
+                    tree,
+                    graph.frontier_expander(edge_filter),
+                )
 
-    return path_nodes
+            def tree_path(target: int) -> List[int]:
+                idx = index_by_target[target]
+                if tree is None or idx is None:
+                    return []
+                return [graph.player_id_at(node) for node in tree.path_to(idx)]
+        else:
+            tree = BreadthFirstTree(
+                source,
+                targets,
+                max_depth=int(max_hops) if max_hops is not None else _UNBOUNDED_PATH_HOPS,
+                max_visited_nodes=_PATH_MAX_VISITED_NODES,
+            )
+
+            async def expand(frontier: List[int]) -> Dict[int, List[int]]:
+                level = await get_teammates_for_frontier(
+                    frontier,
+                    start_year=start_year,
+                    end_year=end_year,
+                    game_types=path_game_types,
+                )
+                if level is None:
+                    tree.abort("frontier expansion exceeded row limit")
+                    return {}
+                expansion: Dict[int, List[int]] = {}
+                for current_id, neighbors in level.items():
+                    expansion[current_id] = [int(neighbor["id"]) for neighbor in neighbors]
+                    for neighbor in neighbors:
+                        if neighbor.get("full_name"):
+                            name_by_node[int(neighbor["id"])] = neighbor["full_name"]
+                return expansion
+
+            await run_breadth_first_tree_async(tree, expand)
+
+            def tree_path(target: int) -> List[int]:
+                return tree.path_to(target)
+
+        results: List[Dict[str, Any]] = []
+        for _, target, flipped in members:
+            path_ids = tree_path(target)
+            if flipped:
+                path_ids = path_ids[::-1]
+            path = await _resolve_path_nodes(path_ids, known_names=name_by_node)
+            results.append(
+                {
+                    "player1_id": target if flipped else source,
+                    "player2_id": source if flipped else target,
+                    "distance": len(path) - 1 if path else None,
+                    "path": path,
+                }
+            )
+        yield results
+
+
+def _choose_target_depth(
+    min_hops: int,
+    max_hops: int,
+    exact_hops: Optional[int],
+) -> int:
+    if exact_hops is not None:
+        return max(1, int(exact_hops))
+    low = max(1, int(min_hops))
+    high = max(low, int(max_hops))
+    return random.randint(low, high)
+
+
+def _pick_from_layers(layers: List[List[int]], target_depth: int, min_hops: int, exact: bool) -> Optional[Tuple[int, int]]:
+    """
+    Picks a uniformly random node from the BFS layer at `target_depth`. When that
+    layer is empty and no exact distance was requested, falls back to the deepest
+    non-empty layer that still satisfies `min_hops`. Returns `(node, depth)`.
+    """
+    if target_depth < len(layers) and layers[target_depth]:
+        return random.choice(layers[target_depth]), target_depth
+    if exact:
+        return None
+    for depth in range(min(target_depth, len(layers) - 1), max(1, int(min_hops)) - 1, -1):
+        if layers[depth]:
+            return random.choice(layers[depth]), depth
+    return None
 
 
 async def get_random_connected_player_for_start(
@@ -576,94 +1427,176 @@ async def get_random_connected_player_for_start(
     game_types: Optional[List[str]] = None,
     min_hops: int = 2,
     max_hops: int = 6,
-    sample_limit: int = 300,
+    exact_hops: Optional[int] = None,
 ) -> Optional[Dict[str, Any]]:
     """
-    Returns a random player connected to the given start player within bounded
-    hop distance. Uses APOC path expansion with a hard sample limit to avoid
-    explosive variable-length traversals.
+    Returns a random player whose filtered shortest-path distance from the start
+    player is exactly `exact_hops`, or (when not given) a distance drawn
+    uniformly from `min_hops..max_hops`. Runs one level-by-level BFS from the
+    start player, keeping each BFS layer, and samples the end player uniformly
+    from the chosen layer, so the pair is valid by construction. Uses the
+    in-memory teammate graph when loaded, otherwise one frontier query per level.
     """
     started = time.perf_counter()
-    db = get_graph_db()
-    if game_types:
-        rel_types = await get_existing_relationship_types(game_types)
-    else:
-        rel_types = await get_existing_relationship_types(_DEFAULT_PATH_REL_TYPES)
-
-    if not rel_types:
-        logger.warning("No relationship types available for connected-player lookup")
-        return None
-
-    rel_filter = "|".join(rel_types)
-    relationship_predicates = ["rel.team IS NOT NULL", "rel.season IS NOT NULL"]
-    if teams:
-        relationship_predicates.append("rel.team IN $teams")
-    if start_year is not None:
-        relationship_predicates.append("rel.season >= $start_year")
-    if end_year is not None:
-        relationship_predicates.append("rel.season <= $end_year")
-
-    path_filter = ""
-    if relationship_predicates:
-        path_filter = f" AND all(rel IN relationships(path) WHERE {' AND '.join(relationship_predicates)})"
-
-    query = """
-        MATCH (start:Player {id: $start_player_id})
-        CALL apoc.path.expandConfig(start, {
-            relationshipFilter: $rel_filter,
-            minLevel: $min_hops,
-            maxLevel: $max_hops,
-            bfs: true,
-            uniqueness: 'NODE_GLOBAL',
-            filterStartNode: true,
-            limit: $sample_limit
-        })
-        YIELD path
-        WITH path, last(nodes(path)) AS end
-        WHERE end.fullName IS NOT NULL AND end.id <> $start_player_id
-    """
-    query += path_filter
-    query += """
-        WITH DISTINCT end
-        ORDER BY rand()
-        LIMIT 1
-        RETURN end.id AS id, end.fullName AS full_name
-    """
-
-    params = {
-        "start_player_id": start_player_id,
-        "rel_filter": rel_filter,
-        "min_hops": min_hops,
-        "max_hops": max_hops,
-        "sample_limit": sample_limit,
-    }
-    if teams:
-        params["teams"] = [team.upper() for team in teams]
-    if start_year is not None:
-        params["start_year"] = _year_to_season(start_year)
-    if end_year is not None:
-        params["end_year"] = _year_to_season(end_year)
-
+    target_depth = _choose_target_depth(min_hops, max_hops, exact_hops)
     logger.info(
-        "Connected-player lookup start player=%s hops=%s..%s sample_limit=%s rel_types=%s",
+        "Connected-player lookup start player=%s target_hops=%s exact=%s",
         start_player_id,
-        min_hops,
-        max_hops,
-        sample_limit,
-        rel_types,
+        target_depth,
+        exact_hops is not None,
     )
 
-    result = await db.run_query(query, params)
+    graph = get_teammate_graph()
+    if graph is not None:
+        edge_filter = graph.compile_filter(
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        # A deep layer walk over a dense filter touches most of the graph; keep the event loop free.
+        index_layers = await asyncio.get_running_loop().run_in_executor(
+            None, graph.bfs_layers, int(start_player_id), edge_filter, target_depth
+        )
+        picked = _pick_from_layers(index_layers, target_depth, min_hops, exact=exact_hops is not None)
+        end_player: Optional[Dict[str, Any]] = None
+        if picked is not None:
+            end_id = graph.player_id_at(picked[0])
+            end_name = await get_name_from_playerid(end_id)
+            end_player = {"id": end_id, "full_name": end_name} if end_name else None
+    else:
+        layers, name_by_node = await _bfs_layers_from_db(
+            int(start_player_id),
+            max_depth=target_depth,
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        picked = _pick_from_layers(layers, target_depth, min_hops, exact=exact_hops is not None)
+        end_player = None
+        if picked is not None:
+            end_player = {"id": picked[0], "full_name": name_by_node[picked[0]]}
+
     logger.info(
-        "Connected-player lookup finished player=%s result_count=%s elapsed=%.3fs",
+        "Connected-player lookup finished player=%s found=%s hops=%s elapsed=%.3fs",
         start_player_id,
-        len(result),
+        end_player is not None,
+        picked[1] if picked else None,
         time.perf_counter() - started,
     )
+    return end_player
+
+
+async def _bfs_layers_from_db(
+    start_player_id: int,
+    max_depth: int,
+    teams: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+) -> Tuple[List[List[int]], Dict[int, str]]:
+    """
+    Filtered BFS from one player using one frontier-batched query per level.
+    Returns the BFS layers (layer 0 is the start player) and the names seen.
+    Stops early if a level exceeds the frontier row limit.
+    """
+    layers: List[List[int]] = [[start_player_id]]
+    visited = {start_player_id}
+    name_by_node: Dict[int, str] = {}
+    while len(layers) <= max_depth and layers[-1]:
+        level = await get_teammates_for_frontier(
+            layers[-1],
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        if level is None:
+            break
+        next_layer: List[int] = []
+        for neighbors in level.values():
+            for neighbor in neighbors:
+                neighbor_id = int(neighbor["id"])
+                if neighbor_id in visited:
+                    continue
+                visited.add(neighbor_id)
+                next_layer.append(neighbor_id)
+                name_by_node[neighbor_id] = neighbor["full_name"]
+        if not next_layer:
+            break
+        layers.append(next_layer)
+    return layers, name_by_node
+
+
+def get_player_distance_bounds(player1_id: int, player2_id: int) -> Optional[Dict[str, Optional[int]]]:
+    """
+    Returns landmark-based hop-distance bounds between two players without any
+    traversal, or None when the in-memory graph or its landmark index is not
+    loaded. `lower` holds under every filter (None means the players are not
+    connected at all); `upper` applies to the unfiltered teammate graph.
+    """
+    graph = get_teammate_graph()
+    if graph is None:
+        return None
+    bounds = graph.distance_bounds(player1_id, player2_id)
+    if bounds is None:
+        return None
+    lower, upper = bounds
+    return {"lower": lower if lower < INFINITE_DISTANCE else None, "upper": upper}
+
+
+async def get_player_connectivity(playerid: int) -> Optional[Dict[str, Any]]:
+    """
+    Returns a player's teammate degree (overall, per relationship type, per
+    decade) and approximate closeness/betweenness. Served from the in-memory
+    centrality table, falling back to the stored Player properties for players
+    the table does not cover. None when nothing has been computed for the player.
+    """
+    centrality = get_player_centrality()
+    if centrality is not None:
+        stats = centrality.stats_for(playerid)
+        if stats is not None:
+            return stats
 
+    db = get_graph_db()
+    result = await db.run_query(
+        """
+        MATCH (p:Player {id: $playerid})
+        WHERE p.teammateDegree IS NOT NULL
+        RETURN p.teammateDegree AS degree,
+               p.degreeTypes AS degree_types, p.degreeTypeCounts AS degree_type_counts,
+               p.degreeDecades AS degree_decades, p.degreeDecadeCounts AS degree_decade_counts,
+               p.closeness AS closeness, p.betweenness AS betweenness
+        """,
+        {"playerid": playerid},
+    )
     if not result:
         return None
-    return {"id": result[0]["id"], "full_name": result[0]["full_name"]}
+    record = result[0]
+    return {
+        "degree": int(record["degree"]),
+        "degree_by_type": dict(zip(record["degree_types"] or [], record["degree_type_counts"] or [])),
+        "degree_by_decade": dict(zip(record["degree_decades"] or [], record["degree_decade_counts"] or [])),
+        "closeness": float(record["closeness"] or 0.0),
+        "betweenness": float(record["betweenness"] or 0.0),
+    }
+
+
+async def _resolve_path_nodes(
+    path_ids: List[int],
+    known_names: Optional[Dict[int, str]] = None,
+) -> List[Dict[str, Any]]:
+    """Attaches full names to a list of player IDs, falling back to the ID when a name is missing."""
+    known_names = known_names or {}
+    names = dict(known_names)
+    unknown = [path_id for path_id in path_ids if not names.get(path_id)]
+    if unknown:
+        names.update(await get_names_for_playerids(unknown))
+    return [
+        {"id": path_id, "full_name": names.get(path_id) or str(path_id)}
+        for path_id in path_ids
+    ]
 
 
 async def find_shortest_path_for_game(
@@ -677,15 +1610,40 @@ async def find_shortest_path_for_game(
 ) -> List[Dict[str, Any]]:
     """
     Bounded shortest path for game mode with optional relationship filters.
-    Uses in-process BFS to avoid APOC heap blowups on dense filtered graphs.
+    Uses an in-process bidirectional BFS to avoid APOC heap blowups on dense
+    filtered graphs. When the in-memory teammate graph is loaded the search runs entirely
+    against it and Neo4j is only queried to resolve names on the final path.
     """
     bounded_hops = max(1, int(max_hops))
-    max_visited_nodes = 40000
+    max_visited_nodes = _PATH_MAX_VISITED_NODES
 
     if player1_id == player2_id:
         name = await get_name_from_playerid(player1_id)
         return [{"id": player1_id, "full_name": name}] if name else []
 
+    graph = get_teammate_graph()
+    if graph is not None:
+        edge_filter = graph.compile_filter(
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        # Dense filters can make this a whole-graph BFS; keep the event loop free.
+        loop = asyncio.get_running_loop()
+        path_ids = await loop.run_in_executor(
+            None,
+            functools.partial(
+                graph.shortest_path,
+                player1_id=int(player1_id),
+                player2_id=int(player2_id),
+                edge_filter=edge_filter,
+                max_hops=bounded_hops,
+                max_visited_nodes=max_visited_nodes,
+            ),
+        )
+        return await _resolve_path_nodes(path_ids)
+
     start_name, end_name = await asyncio.gather(
         get_name_from_playerid(player1_id),
         get_name_from_playerid(player2_id),
@@ -693,61 +1651,167 @@ async def find_shortest_path_for_game(
     if not start_name or not end_name:
         return []
 
-    queue = deque([(int(player1_id), 0)])
-    parent_by_node: Dict[int, Optional[int]] = {int(player1_id): None}
     name_by_node: Dict[int, str] = {
         int(player1_id): start_name,
         int(player2_id): end_name,
     }
 
-    while queue:
-        current_id, depth = queue.popleft()
-        if depth >= bounded_hops:
-            continue
+    search = BidirectionalSearch(
+        int(player1_id),
+        int(player2_id),
+        max_hops=bounded_hops,
+        max_visited_nodes=max_visited_nodes,
+    )
+
+    async def expand(frontier: List[int]) -> Dict[int, List[int]]:
+        # One UNWIND query per BFS level instead of one query per player.
+        level = await get_teammates_for_frontier(
+            frontier,
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        if level is None:
+            search.abort("frontier expansion exceeded row limit")
+            return {}
+
+        expansion: Dict[int, List[int]] = {}
+        for current_id, neighbors in level.items():
+            neighbor_ids: List[int] = []
+            for neighbor in neighbors:
+                neighbor_id = int(neighbor["id"])
+                neighbor_ids.append(neighbor_id)
+                neighbor_name = neighbor.get("full_name")
+                if isinstance(neighbor_name, str) and neighbor_name:
+                    name_by_node[neighbor_id] = neighbor_name
+            expansion[current_id] = neighbor_ids
+        return expansion
+
+    path_ids = await run_bidirectional_search_async(search, expand)
+    return await _resolve_path_nodes(path_ids, known_names=name_by_node)
+
+
+async def count_shortest_paths_for_game(
+    player1_id: int,
+    player2_id: int,
+    teams: Optional[List[str]] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    game_types: Optional[List[str]] = None,
+    max_hops: int = 6,
+    max_paths: int = 10,
+) -> Dict[str, Any]:
+    """
+    Counts every distinct shortest path between two players under the game
+    filters and returns up to `max_paths` of them with their step team-seasons.
+    Uses a single counting BFS (in memory when the teammate graph is loaded,
+    otherwise one frontier query per level); the listed paths are read off the
+    shortest-path DAG without further traversal.
+
+    Returns `{"count": int, "length": int, "paths": [{"path": [...], "step_teams": [[...]]}]}`.
+    `count` is 0 when no path exists within `max_hops`.
+    """
+    bounded_hops = max(1, int(max_hops))
+    max_visited_nodes = _PATH_MAX_VISITED_NODES
+    empty: Dict[str, Any] = {"count": 0, "length": 0, "paths": []}
 
-        neighbors = await get_teammates_of_player_with_options(
-            playerid=current_id,
+    graph = get_teammate_graph()
+    if graph is not None:
+        edge_filter = graph.compile_filter(
             teams=teams,
             start_year=start_year,
             end_year=end_year,
             game_types=game_types,
         )
 
-        for neighbor in neighbors:
-            neighbor_id = int(neighbor["id"])
-            if neighbor_id in parent_by_node:
-                continue
-
-            parent_by_node[neighbor_id] = current_id
-            neighbor_name = neighbor.get("full_name")
-            if isinstance(neighbor_name, str) and neighbor_name:
-                name_by_node[neighbor_id] = neighbor_name
-
-            if len(parent_by_node) > max_visited_nodes:
-                logger.warning(
-                    "Aborting shortest-path BFS p1=%s p2=%s visited_nodes>%s",
-                    player1_id,
-                    player2_id,
-                    max_visited_nodes,
-                )
-                return []
-
-            if neighbor_id == int(player2_id):
-                path_ids: List[int] = []
-                cursor: Optional[int] = neighbor_id
-                while cursor is not None:
-                    path_ids.append(cursor)
-                    cursor = parent_by_node[cursor]
-                path_ids.reverse()
-
-                resolved_path: List[Dict[str, Any]] = []
-                for path_id in path_ids:
-                    full_name = name_by_node.get(path_id)
-                    if not full_name:
-                        full_name = await get_name_from_playerid(path_id) or str(path_id)
-                    resolved_path.append({"id": path_id, "full_name": full_name})
-                return resolved_path
-
-            queue.append((neighbor_id, depth + 1))
-
-    return []
+        def count_in_memory() -> Optional[Tuple[ShortestPathCounter, List[Tuple[List[int], List[List[str]]]]]]:
+            counter = graph.count_shortest_paths(
+                int(player1_id),
+                int(player2_id),
+                edge_filter=edge_filter,
+                max_hops=bounded_hops,
+                max_visited_nodes=max_visited_nodes,
+            )
+            if counter is None or not counter.count:
+                return None
+            listed = []
+            for index_path in islice(counter.iter_paths(), max(0, max_paths)):
+                step_teams = [
+                    [
+                        f"{team} {_season_to_label(_year_to_season(season_year))}"
+                        for team, season_year in graph.team_seasons_between(index_path[idx], index_path[idx + 1], edge_filter)
+                    ]
+                    for idx in range(len(index_path) - 1)
+                ]
+                listed.append(([graph.player_id_at(node) for node in index_path], step_teams))
+            return counter, listed
+
+        # The puzzle pool calls this continuously; keep the traversal off the event loop.
+        counted = await asyncio.get_running_loop().run_in_executor(None, count_in_memory)
+        if counted is None:
+            return empty
+
+        counter, listed = counted
+        paths: List[Dict[str, Any]] = []
+        for path_ids, step_teams in listed:
+            paths.append({"path": await _resolve_path_nodes(path_ids), "step_teams": step_teams})
+        return {"count": counter.count, "length": counter.length, "paths": paths}
+
+    name_by_node: Dict[int, str] = {}
+    counter = ShortestPathCounter(
+        int(player1_id),
+        int(player2_id),
+        max_hops=bounded_hops,
+        max_visited_nodes=max_visited_nodes,
+    )
+
+    async def expand(frontier: List[int]) -> Dict[int, List[int]]:
+        level = await get_teammates_for_frontier(
+            frontier,
+            teams=teams,
+            start_year=start_year,
+            end_year=end_year,
+            game_types=game_types,
+        )
+        if level is None:
+            counter.abort("frontier expansion exceeded row limit")
+            return {}
+
+        expansion: Dict[int, List[int]] = {}
+        for current_id, neighbors in level.items():
+            neighbor_ids: List[int] = []
+            for neighbor in neighbors:
+                neighbor_id = int(neighbor["id"])
+                neighbor_ids.append(neighbor_id)
+                neighbor_name = neighbor.get("full_name")
+                if isinstance(neighbor_name, str) and neighbor_name:
+                    name_by_node[neighbor_id] = neighbor_name
+            expansion[current_id] = neighbor_ids
+        return expansion
+
+    await run_path_counter_async(counter, expand)
+    if not counter.count:
+        return empty
+
+    id_paths = list(islice(counter.iter_paths(), max(0, max_paths)))
+    # Paths share most of their steps; look each distinct step up once, in one query.
+    steps = sorted({(path[idx], path[idx + 1]) for path in id_paths for idx in range(len(path) - 1)})
+    step_links = await get_common_team_seasons_for_steps(
+        steps,
+        teams=teams,
+        start_year=start_year,
+        end_year=end_year,
+        game_types=game_types,
+    )
+    links_by_step = dict(zip(steps, step_links))
+
+    paths = []
+    for path_ids in id_paths:
+        paths.append(
+            {
+                "path": await _resolve_path_nodes(path_ids, known_names=name_by_node),
+                "step_teams": [links_by_step[(path_ids[idx], path_ids[idx + 1])] for idx in range(len(path_ids) - 1)],
+            }
+        )
+    return {"count": counter.count, "length": counter.length, "paths": paths}
@@ -0,0 +1,202 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.db.graph_deltas import GRAPH_META_KEY
+
+logger = logging.getLogger("uvicorn.error")
+
+# The `(:Meta {key: "graph"})` node also carries a small catalog of what has
+# been loaded: the team codes, the season range and the newest game ID. The
+# pipeline folds each batch of written games into it next to the graph version
+# bump, so reading it is a single indexed node lookup instead of a scan over
+# every relationship. A run killed before a batch was folded in leaves the
+# catalog behind its games until `--rebuild-catalog`.
+# Processed games themselves are the indexed :Game nodes.
+#
+# Databases loaded before the catalog existed have no `catalogBuilt` flag;
+# readers then fall back to scanning until the pipeline backfills it.
+#
+# `perGameRelationships` records whether any relationship still uses the
+# per-game (gameId) layout, so the pipeline can refuse to mix layouts without
+# scanning every relationship on each run. Per-game writes set it, and the
+# catalog rebuild and the aggregation migration recompute it.
+
+_GAME_BACKFILL_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class GraphCatalog:
+    teams: Tuple[str, ...]
+    min_season: Optional[int]
+    max_season: Optional[int]
+    latest_game_id: Optional[int]
+    # None when the catalog predates the flag.
+    per_game_relationships: Optional[bool] = None
+
+
+def update_graph_catalog(
+    tx,
+    game_ids: Sequence[int],
+    seasons: Sequence[int],
+    teams: Sequence[str],
+    per_game: bool = False,
+) -> None:
+    """
+    Folds a batch of written games into the catalog. Call it after
+    `bump_graph_version` in the same transaction, so the Meta node is already
+    write-locked and concurrent batches cannot lose each other's teams.
+    `per_game` marks the games as written with per-game relationships.
+    """
+    tx.run(
+        """
+        MERGE (m:Meta {key: $key})
+        WITH m, coalesce(m.teams, []) AS known_teams
+        SET m.teams = known_teams + [team IN $teams WHERE NOT team IN known_teams],
+            m.minSeason = CASE WHEN m.minSeason IS NULL OR $min_season < m.minSeason THEN $min_season ELSE m.minSeason END,
+            m.maxSeason = CASE WHEN m.maxSeason IS NULL OR $max_season > m.maxSeason THEN $max_season ELSE m.maxSeason END,
+            m.latestGameId = CASE WHEN m.latestGameId IS NULL OR $game_id > m.latestGameId THEN $game_id ELSE m.latestGameId END,
+            m.perGameRelationships = CASE WHEN $per_game THEN true ELSE m.perGameRelationships END
+        """,
+        key=GRAPH_META_KEY,
+        game_id=max(game_ids),
+        min_season=min(seasons),
+        max_season=max(seasons),
+        teams=sorted(set(teams)),
+        per_game=per_game,
+    )
+
+
+async def read_graph_catalog(db) -> Optional[GraphCatalog]:
+    """Returns the catalog, or None if this database has not had it built yet."""
+    result = await db.run_query(
+        """
+        MATCH (m:Meta {key: $key})
+        WHERE m.catalogBuilt
+        RETURN m.teams AS teams, m.minSeason AS min_season, m.maxSeason AS max_season,
+               m.latestGameId AS latest_game_id, m.perGameRelationships AS per_game_relationships
+        """,
+        {"key": GRAPH_META_KEY},
+    )
+    if not result:
+        return None
+    record = result[0]
+    return GraphCatalog(
+        teams=tuple(sorted(record["teams"] or [])),
+        min_season=record["min_season"],
+        max_season=record["max_season"],
+        latest_game_id=record["latest_game_id"],
+        per_game_relationships=record["per_game_relationships"],
+    )
+
+
+async def _scan_legacy_games(db) -> List[Dict[str, Any]]:
+    query = """
+        MATCH ()-[r]->()
+        WHERE r.gameId IS NOT NULL
+        RETURN r.gameId AS id, min(r.season) AS season, min(type(r)) AS type
+    """
+    return await db.run_query(query)
+
+
+async def scan_per_game_relationships(db) -> bool:
+    """
+    Checks the relationships themselves for the per-game layout and records
+    the answer on the catalog. Stops at the first match, but has to read every
+    relationship when there is none, so callers should prefer the recorded flag.
+    """
+    result = await db.run_query(
+        "MATCH ()-[r]->() WHERE r.gameId IS NOT NULL RETURN r.gameId AS gameId LIMIT 1"
+    )
+    present = bool(result)
+    await db.run_query(
+        "MERGE (m:Meta {key: $key}) SET m.perGameRelationships = $present",
+        {"key": GRAPH_META_KEY, "present": present},
+    )
+    return present
+
+
+async def rebuild_graph_catalog(db) -> GraphCatalog:
+    """
+    Backfills the catalog with one scan of the relationships, including :Game
+    nodes (marked as loaded by the "per-game" graph model) for per-game
+    relationships written before games were tracked. Safe to rerun; the
+    pipeline does it once for databases that predate the catalog.
+    """
+    logger.info("Building the graph catalog from existing relationships...")
+    legacy_games = await _scan_legacy_games(db)
+    for start in range(0, len(legacy_games), _GAME_BACKFILL_BATCH_SIZE):
+        await db.run_query(
+            """
+            UNWIND $games AS game
+            MERGE (g:Game {id: game.id})
+            ON CREATE SET g.season = game.season, g.type = game.type, g.graphModels = ["per-game"]
+            """,
+            {"games": legacy_games[start:start + _GAME_BACKFILL_BATCH_SIZE]},
+        )
+
+    teams_result = await db.run_query(
+        """
+        CALL {
+            MATCH ()-[r]->() WHERE r.team IS NOT NULL RETURN DISTINCT r.team AS team
+            UNION
+            MATCH (ts:TeamSeason) RETURN DISTINCT ts.tricode AS team
+        }
+        RETURN collect(team) AS teams
+        """
+    )
+    bounds_result = await db.run_query(
+        """
+        CALL {
+            MATCH ()-[r]->() WHERE r.season IS NOT NULL RETURN r.season AS season
+            UNION
+            MATCH (ts:TeamSeason) RETURN ts.season AS season
+            UNION
+            MATCH (g:Game) RETURN g.season AS season
+        }
+        RETURN min(season) AS min_season, max(season) AS max_season
+        """
+    )
+    latest_result = await db.run_query(
+        """
+        CALL {
+            MATCH (g:Game) RETURN g.id AS gameId
+            UNION
+            MATCH ()-[r]->() WHERE r.lastGameId IS NOT NULL RETURN r.lastGameId AS gameId
+        }
+        RETURN max(gameId) AS latest_game_id
+        """
+    )
+    await db.run_query(
+        """
+        MERGE (m:Meta {key: $key})
+        SET m.teams = $teams, m.minSeason = $min_season, m.maxSeason = $max_season,
+            m.latestGameId = $latest_game_id, m.perGameRelationships = $per_game,
+            m.catalogBuilt = true
+        """,
+        {
+            "key": GRAPH_META_KEY,
+            "teams": sorted(team for team in teams_result[0]["teams"] if team),
+            "min_season": bounds_result[0]["min_season"],
+            "max_season": bounds_result[0]["max_season"],
+            "latest_game_id": latest_result[0]["latest_game_id"],
+            "per_game": bool(legacy_games),
+        },
+    )
+    catalog = await read_graph_catalog(db)
+    logger.info(
+        "Graph catalog built: %s teams, seasons %s-%s, latest game %s, %s legacy games recorded.",
+        len(catalog.teams),
+        catalog.min_season,
+        catalog.max_season,
+        catalog.latest_game_id,
+        len(legacy_games),
+    )
+    return catalog
+
+
+async def ensure_graph_catalog(db) -> GraphCatalog:
+    catalog = await read_graph_catalog(db)
+    if catalog is None:
+        catalog = await rebuild_graph_catalog(db)
+    return catalog
@@ -0,0 +1,136 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+
+# The graph version lives on a single `(:Meta {key: "graph"})` node. The pipeline
+# bumps it once per batch of committed games, by the number of games in the
+# batch, so it only ever grows, every game still gets a version of its own, and
+# it never runs ahead of the data that has been committed.
+GRAPH_META_KEY = "graph"
+
+# Each line of the delta log is one processed game:
+#
+#   {"version": 42, "gameId": 2024020001, "season": 20242025,
+#    "relType": "TEAMMATE_IN_REGULAR_SEASON",
+#    "rosters": {"BOS": [8470001, ...], "TOR": [...]},
+#    "names": {"8470001": "First Last", ...}}
+#
+# Teammate edges are every pair within a roster. `names` carries the players
+# whose names were written by that game, including players new to the graph.
+
+
+def bump_graph_version(tx, count: int = 1) -> int:
+    """
+    Advances the graph version by `count` inside a write transaction and
+    returns the new value; versions new - count + 1 .. new are the batch's.
+    """
+    record = tx.run(
+        """
+        MERGE (m:Meta {key: $key})
+        SET m.version = coalesce(m.version, 0) + $count
+        RETURN m.version AS version
+        """,
+        key=GRAPH_META_KEY,
+        count=count,
+    ).single()
+    return int(record["version"])
+
+
+async def get_graph_version(db) -> int:
+    """Returns the committed graph version, or 0 before any versioned game was written."""
+    result = await db.run_query(
+        "MATCH (m:Meta {key: $key}) RETURN m.version AS version",
+        {"key": GRAPH_META_KEY},
+    )
+    if not result or result[0]["version"] is None:
+        return 0
+    return int(result[0]["version"])
+
+
+def build_game_delta(
+    version: int,
+    game_id: int,
+    season: int,
+    rel_type: str,
+    rosters: Mapping[str, Sequence[int]],
+    names: Mapping[int, str],
+) -> Dict[str, Any]:
+    return {
+        "version": int(version),
+        "gameId": int(game_id),
+        "season": int(season),
+        "relType": rel_type,
+        "rosters": {team: sorted(int(player_id) for player_id in player_ids) for team, player_ids in rosters.items()},
+        "names": {str(player_id): name for player_id, name in names.items()},
+    }
+
+
+def append_graph_delta(path: str, delta: Mapping[str, Any]) -> None:
+    log_path = Path(path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(delta, separators=(",", ":")) + "\n")
+
+
+def read_graph_deltas(path: str, after_version: int = 0) -> List[Dict[str, Any]]:
+    """
+    Returns the logged deltas newer than `after_version`, ordered by version.
+    Games are written concurrently, so lines are not guaranteed to be in
+    version order on disk; unreadable lines (e.g. a torn final write) are skipped.
+    """
+    log_path = Path(path)
+    if not log_path.is_file():
+        return []
+    deltas: Dict[int, Dict[str, Any]] = {}
+    with open(log_path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                delta = json.loads(line)
+                version = int(delta["version"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if version > after_version:
+                deltas[version] = delta
+    return [deltas[version] for version in sorted(deltas)]
+
+
+def contiguous_deltas(deltas: Iterable[Mapping[str, Any]], after_version: int) -> List[Mapping[str, Any]]:
+    """Returns the prefix of `deltas` whose versions follow `after_version` without gaps."""
+    result: List[Mapping[str, Any]] = []
+    expected = after_version + 1
+    for delta in deltas:
+        if int(delta["version"]) != expected:
+            break
+        result.append(delta)
+        expected += 1
+    return result
+
+
+def compact_graph_deltas(path: str, keep_after_version: int) -> None:
+    """Drops deltas already contained in a snapshot of `keep_after_version`."""
+    log_path = Path(path)
+    if not log_path.is_file():
+        return
+    remaining = read_graph_deltas(path, after_version=keep_after_version)
+    staging = log_path.with_name(f"{log_path.name}.tmp-{os.getpid()}")
+    with open(staging, "w", encoding="utf-8") as handle:
+        for delta in remaining:
+            handle.write(json.dumps(delta, separators=(",", ":")) + "\n")
+    os.replace(staging, log_path)
+
+
+def delta_edge_rows(delta: Mapping[str, Any]) -> Iterable[Tuple[int, int, str, int, str]]:
+    """Expands a delta's rosters into `(player1_id, player2_id, team, season, rel_type)` rows."""
+    season = int(delta["season"])
+    rel_type = delta["relType"]
+    for team, player_ids in delta.get("rosters", {}).items():
+        for i, player1_id in enumerate(player_ids):
+            for player2_id in player_ids[i + 1:]:
+                yield (int(player1_id), int(player2_id), team, season, rel_type)
+
+
+def delta_names(delta: Mapping[str, Any]) -> Dict[int, str]:
+    return {int(player_id): name for player_id, name in delta.get("names", {}).items() if name}
+
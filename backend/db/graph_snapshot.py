@@ -0,0 +1,127 @@
+import ast
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Mapping, Tuple
+
+# On-disk layout of a graph snapshot directory:
+#
+#   manifest.json   format version, counts, code tables, array dtypes
+#   <name>.npy      one flat little-endian array per field, NumPy .npy v1.0
+#
+# Arrays are plain .npy files so they can be inspected with NumPy, but reading
+# and writing only needs the standard library. Readers mmap the files, so every
+# process that opens the same snapshot shares one page-cache copy.
+#
+# Version 2: each player's edges are ordered by season.
+SNAPSHOT_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+_NPY_MAGIC = b"\x93NUMPY"
+_NPY_ALIGNMENT = 64
+_DESCR_BY_TYPECODE = {"q": "<i8", "i": "<i4", "H": "<u2", "B": "|u1"}
+_TYPECODE_BY_DESCR = {descr: typecode for typecode, descr in _DESCR_BY_TYPECODE.items()}
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot directory is missing, incomplete or in an unsupported format."""
+
+
+def _require_little_endian() -> None:
+    if sys.byteorder != "little":
+        raise SnapshotError("Graph snapshots are only supported on little-endian hosts.")
+
+
+def _write_npy(path: Path, values: Any, typecode: str) -> None:
+    descr = _DESCR_BY_TYPECODE[typecode]
+    view = memoryview(values)
+    if view.format != typecode:
+        view = view.cast("B").cast(typecode)
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(view)},), }}"
+    # Pad so the data starts on an aligned offset; the header ends with a newline.
+    preamble_len = len(_NPY_MAGIC) + 2 + 2
+    padding = -(preamble_len + len(header) + 1) % _NPY_ALIGNMENT
+    header_bytes = (header + " " * padding + "\n").encode("latin1")
+    with open(path, "wb") as handle:
+        handle.write(_NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header_bytes)))
+        handle.write(header_bytes)
+        handle.write(view.cast("B"))
+
+
+def _mmap_npy(path: Path) -> memoryview:
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(_NPY_MAGIC)] != _NPY_MAGIC or mapped[6:8] != b"\x01\x00":
+        raise SnapshotError(f"{path.name} is not a version 1.0 .npy file.")
+    (header_len,) = struct.unpack("<H", mapped[8:10])
+    data_offset = 10 + header_len
+    header = ast.literal_eval(mapped[10:data_offset].decode("latin1"))
+
+    typecode = _TYPECODE_BY_DESCR.get(header.get("descr"))
+    shape = header.get("shape")
+    if typecode is None or header.get("fortran_order") or not isinstance(shape, tuple) or len(shape) != 1:
+        raise SnapshotError(f"{path.name} has an unsupported array layout: {header}")
+    # The memoryview keeps the mapping alive for as long as the arrays are in use.
+    view = memoryview(mapped)[data_offset:].cast(typecode)
+    if len(view) != shape[0]:
+        raise SnapshotError(f"{path.name} is truncated.")
+    return view
+
+
+def write_snapshot(
+    directory: str,
+    arrays: Mapping[str, Tuple[Any, str]],
+    metadata: Mapping[str, Any],
+) -> Path:
+    """
+    Writes `arrays` (`name -> (values, typecode)`) and `metadata` as a snapshot
+    directory. Files are written to a sibling temporary directory that then
+    replaces `directory`, so readers never see a half-written snapshot; processes
+    that already mapped the previous files keep reading them until they reload.
+    """
+    _require_little_endian()
+    target = Path(directory)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    for name, (values, typecode) in arrays.items():
+        _write_npy(staging / f"{name}.npy", values, typecode)
+
+    manifest = dict(metadata)
+    manifest["format_version"] = SNAPSHOT_FORMAT_VERSION
+    manifest["created_at"] = datetime.now(timezone.utc).isoformat()
+    manifest["arrays"] = {name: _DESCR_BY_TYPECODE[typecode] for name, (_, typecode) in arrays.items()}
+    # The manifest is written last: a directory without one is never loaded.
+    (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    previous = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        os.replace(target, previous)
+    os.replace(staging, target)
+    shutil.rmtree(previous, ignore_errors=True)
+    return target
+
+
+def read_snapshot(directory: str) -> Tuple[Dict[str, memoryview], Dict[str, Any]]:
+    """Maps every array listed in the snapshot manifest. Returns `(arrays, manifest)`."""
+    _require_little_endian()
+    source = Path(directory)
+    manifest_path = source / MANIFEST_FILE
+    if not manifest_path.is_file():
+        raise SnapshotError(f"No graph snapshot found at {source}.")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"Snapshot format version {manifest.get('format_version')} is not supported "
+            f"(expected {SNAPSHOT_FORMAT_VERSION})."
+        )
+
+    arrays = {name: _mmap_npy(source / f"{name}.npy") for name in manifest.get("arrays", {})}
+    return arrays, manifest
@@ -0,0 +1,184 @@
+import logging
+import time
+from array import array
+from typing import Callable, List, Optional, Sequence
+
+logger = logging.getLogger("uvicorn.error")
+
+# Distances are stored as one unsigned byte per player per landmark. Teammate
+# distances in the NHL graph are single digits, so 254 is effectively "far";
+# 255 marks players the landmark cannot reach at all.
+UNREACHABLE = 255
+_MAX_STORED_DISTANCE = UNREACHABLE - 1
+INFINITE_DISTANCE = 1 << 30
+
+# How many landmarks are consulted per query when pruning a search. Checking
+# every landmark on every visited node would cost more than it saves.
+_ACTIVE_LANDMARKS = 4
+
+
+class LandmarkIndex:
+    """
+    ALT (A*, landmarks, triangle inequality) distance oracle.
+
+    Holds BFS hop distances from a set of hub players to every player in the
+    unfiltered teammate graph, laid out as one `uint8` row per landmark. For
+    any two players `a` and `b` and landmark `L`:
+
+        |d(L, a) - d(L, b)|  <=  d(a, b)  <=  d(L, a) + d(L, b)
+
+    Filtered graphs are subgraphs of the unfiltered one, so the lower bound
+    still holds under any teams/years/game-types filter; the upper bound only
+    holds for the unfiltered graph.
+    """
+
+    def __init__(self, landmark_indexes: Sequence[int], distances: Sequence[int], player_count: int):
+        self.landmark_indexes = list(landmark_indexes)
+        self.distances = distances
+        self.player_count = player_count
+        view = memoryview(distances) if not isinstance(distances, memoryview) else distances
+        self._rows = [view[i * player_count:(i + 1) * player_count] for i in range(len(self.landmark_indexes))]
+
+    @property
+    def landmark_count(self) -> int:
+        return len(self.landmark_indexes)
+
+    def lower_bound(self, idx_a: int, idx_b: int) -> int:
+        """Returns a lower bound on the hop distance, or INFINITE_DISTANCE if the players are disconnected."""
+        best = 0
+        for row in self._rows:
+            dist_a = row[idx_a]
+            dist_b = row[idx_b]
+            if dist_a == UNREACHABLE or dist_b == UNREACHABLE:
+                if dist_a != dist_b:
+                    return INFINITE_DISTANCE
+                continue
+            diff = dist_a - dist_b if dist_a > dist_b else dist_b - dist_a
+            if diff > best:
+                best = diff
+        return best
+
+    def upper_bound(self, idx_a: int, idx_b: int) -> Optional[int]:
+        """Returns an upper bound on the unfiltered hop distance, or None if no landmark reaches both."""
+        best: Optional[int] = None
+        for row in self._rows:
+            dist_a = row[idx_a]
+            dist_b = row[idx_b]
+            if dist_a == UNREACHABLE or dist_b == UNREACHABLE:
+                continue
+            total = dist_a + dist_b
+            if best is None or total < best:
+                best = total
+        return best
+
+    def lower_bound_to(self, goal_idx: int, other_idx: Optional[int] = None) -> Callable[[int], int]:
+        """
+        Returns a fast `node -> lower bound on d(node, goal)` heuristic for A*-style
+        pruning. Only the few landmarks that best separate `goal` from `other_idx`
+        (usually the opposite search endpoint) are consulted.
+        """
+        rows = self._rows
+        if other_idx is not None:
+            def separation(row) -> int:
+                if row[goal_idx] == UNREACHABLE or row[other_idx] == UNREACHABLE:
+                    return -1
+                return abs(row[goal_idx] - row[other_idx])
+            rows = sorted(rows, key=separation, reverse=True)
+        active = [(row, row[goal_idx]) for row in rows[:_ACTIVE_LANDMARKS] if row[goal_idx] != UNREACHABLE]
+
+        def bound(node: int) -> int:
+            best = 0
+            for row, goal_dist in active:
+                dist = row[node]
+                if dist == UNREACHABLE:
+                    return INFINITE_DISTANCE
+                diff = dist - goal_dist if dist > goal_dist else goal_dist - dist
+                if diff > best:
+                    best = diff
+            return best
+
+        return bound
+
+
+def _bfs_distances(offsets: Sequence[int], neighbors: Sequence[int], source: int, player_count: int) -> bytearray:
+    distances = bytearray([UNREACHABLE]) * player_count
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth = min(depth + 1, _MAX_STORED_DISTANCE)
+        next_frontier: List[int] = []
+        for node in frontier:
+            for pos in range(offsets[node], offsets[node + 1]):
+                neighbor = neighbors[pos]
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+def select_landmarks(
+    offsets: Sequence[int],
+    neighbors: Sequence[int],
+    count: int,
+    ranking: Optional[Sequence[float]] = None,
+) -> List[int]:
+    """
+    Picks hub players, highest `ranking` first (degree when not given, e.g.
+    betweenness from the centrality table otherwise), skipping direct
+    teammates of hubs already chosen so the landmarks are spread across the graph.
+    """
+    player_count = len(offsets) - 1
+    def degree(idx: int) -> int:
+        return offsets[idx + 1] - offsets[idx]
+
+    use_ranking = ranking is not None and len(ranking) == player_count
+    by_rank = sorted(range(player_count), key=ranking.__getitem__ if use_ranking else degree, reverse=True)
+    chosen: List[int] = []
+    covered = bytearray(player_count)
+    for idx in by_rank:
+        if len(chosen) >= count or offsets[idx + 1] == offsets[idx]:
+            break
+        if covered[idx]:
+            continue
+        chosen.append(idx)
+        covered[idx] = 1
+        for pos in range(offsets[idx], offsets[idx + 1]):
+            covered[neighbors[pos]] = 1
+    return chosen
+
+
+def build_landmark_index(
+    offsets: Sequence[int],
+    neighbors: Sequence[int],
+    count: int,
+    ranking: Optional[Sequence[float]] = None,
+) -> Optional[LandmarkIndex]:
+    """
+    Builds a LandmarkIndex from a de-duplicated, unfiltered adjacency
+    (see TeammateGraph.unfiltered_adjacency). Returns None for an empty graph.
+    """
+    started = time.perf_counter()
+    player_count = len(offsets) - 1
+    landmark_indexes = select_landmarks(offsets, neighbors, count, ranking)
+    if not landmark_indexes:
+        return None
+
+    distances = array("B")
+    for landmark in landmark_indexes:
+        distances.frombytes(bytes(_bfs_distances(offsets, neighbors, landmark, player_count)))
+
+    logger.info(
+        "Built landmark distance index landmarks=%s players=%s elapsed=%.3fs",
+        len(landmark_indexes),
+        player_count,
+        time.perf_counter() - started,
+    )
+    return LandmarkIndex(landmark_indexes, distances, player_count)
+
+
+def hopeless(index: Optional[LandmarkIndex], idx_a: int, idx_b: int, max_hops: int) -> bool:
+    """True when the landmark lower bound already proves no path fits in `max_hops`."""
+    return index is not None and index.lower_bound(idx_a, idx_b) > max_hops
+
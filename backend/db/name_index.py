@@ -0,0 +1,160 @@
+import bisect
+import heapq
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+# Letters NFKD does not decompose into a base letter plus a combining mark.
+_FOLD_TABLE = str.maketrans({"ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "æ": "ae", "œ": "oe", "ı": "i"})
+
+
+def fold_name(name: str) -> str:
+    """
+    Normalizes a name for matching: case-folded, diacritics removed
+    ("Lindström" -> "lindstrom"), punctuation turned into spaces and runs of
+    whitespace collapsed.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold().translate(_FOLD_TABLE))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join("".join(char if char.isalnum() else " " for char in stripped).split())
+
+
+def trigrams(folded: str) -> Set[str]:
+    """Character trigrams of a folded name, padded so word starts and ends are trigrams too."""
+    padded = f"  {folded} "
+    return {padded[pos:pos + 3] for pos in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Trigram inverted index over distinct player names. Each posting list is
+    the sorted array of name slots containing that trigram; `players_by_slot`
+    holds the player IDs sharing each name.
+    """
+
+    def __init__(self, players: Iterable[Tuple[int, str]]):
+        slot_by_name: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.folded: List[str] = []
+        self.players_by_slot: List[List[int]] = []
+        for player_id, name in players:
+            if not name:
+                continue
+            slot = slot_by_name.get(name)
+            if slot is None:
+                slot = len(self.names)
+                slot_by_name[name] = slot
+                self.names.append(name)
+                self.folded.append(fold_name(name))
+                self.players_by_slot.append([])
+            self.players_by_slot[slot].append(int(player_id))
+
+        postings: Dict[str, List[int]] = {}
+        for slot, folded in enumerate(self.folded):
+            for gram in trigrams(folded):
+                postings.setdefault(gram, []).append(slot)
+        self.postings: Dict[str, array] = {gram: array("i", slots) for gram, slots in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self, folded_query: str, limit: int) -> List[int]:
+        """
+        Returns up to `limit` name slots for a folded query: names containing
+        every query trigram first (postings intersection, rarest list first),
+        then names sharing the most trigrams, so misspellings still match.
+        A large intersection is ranked before it is cut to `limit`: names that
+        contain the query as a substring, then those closest to it in length.
+        """
+        grams = trigrams(folded_query)
+        lists: List[Sequence[int]] = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not lists:
+            return []
+
+        matched: List[int] = []
+        if lists[0]:
+            common = set(lists[0])
+            for posting in lists[1:]:
+                common.intersection_update(posting)
+                if not common:
+                    break
+            if len(common) <= limit:
+                matched = sorted(common)
+            else:
+                folded = self.folded
+                query_length = len(folded_query)
+                matched = heapq.nsmallest(
+                    limit,
+                    common,
+                    key=lambda slot: (folded_query not in folded[slot], abs(len(folded[slot]) - query_length), slot),
+                )
+        if len(matched) >= limit:
+            return matched
+
+        overlap: Counter = Counter()
+        for posting in lists:
+            overlap.update(posting)
+        for slot in matched:
+            del overlap[slot]
+        matched.extend(slot for slot, _ in overlap.most_common(limit - len(matched)))
+        return matched
+
+
+# Prefixes up to this many characters match large key ranges, so their top
+# results are ranked once at build time instead of on every keystroke.
+_PRECOMPUTED_PREFIX_LENGTH = 3
+_PRECOMPUTED_PREFIX_RESULTS = 25
+_PREFIX_END = chr(0x10FFFF)
+
+
+class PrefixIndex:
+    """
+    Typeahead index: a sorted array of folded name keys, one per word start
+    of every name ("nicklas lidstrom" and "lidstrom"), so a prefix of the
+    first name, last name or full name is one binary-searched key range.
+    Matches are ranked by `score` (e.g. teammate degree), then by name.
+    """
+
+    def __init__(self, players: Iterable[Tuple[int, str]], score: Dict[int, float]):
+        entries: List[Tuple[str, int]] = []
+        self.name_by_id: Dict[int, str] = {}
+        for player_id, name in players:
+            if not name:
+                continue
+            player_id = int(player_id)
+            self.name_by_id[player_id] = name
+            words = fold_name(name).split()
+            entries.extend((" ".join(words[pos:]), player_id) for pos in range(len(words)))
+        entries.sort()
+        # Each key stores its player's position in the overall ranking, so
+        # ranking a key range is a min over plain ints.
+        self.ranked_ids = array(
+            "q",
+            sorted(self.name_by_id, key=lambda player_id: (-score.get(player_id, 0), self.name_by_id[player_id])),
+        )
+        rank_by_id = {player_id: rank for rank, player_id in enumerate(self.ranked_ids)}
+        self.keys: List[str] = [key for key, _ in entries]
+        self.key_ranks = array("i", (rank_by_id[player_id] for _, player_id in entries))
+
+        self._top_by_prefix: Dict[str, List[int]] = {}
+        short_prefixes = {key[:length] for key in self.keys for length in range(1, _PRECOMPUTED_PREFIX_LENGTH + 1)}
+        for prefix in short_prefixes:
+            self._top_by_prefix[prefix] = self._rank_range(prefix, _PRECOMPUTED_PREFIX_RESULTS)
+
+    def _rank_range(self, folded_prefix: str, limit: int) -> List[int]:
+        lo = bisect.bisect_left(self.keys, folded_prefix)
+        hi = bisect.bisect_right(self.keys, folded_prefix + _PREFIX_END, lo)
+        return [self.ranked_ids[rank] for rank in heapq.nsmallest(limit, set(self.key_ranks[lo:hi]))]
+
+    def search(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Returns up to `limit` `(player_id, name)` pairs whose first, last or full name starts with `prefix`."""
+        folded_prefix = fold_name(prefix)
+        if not folded_prefix:
+            return []
+        top = self._top_by_prefix.get(folded_prefix) if limit <= _PRECOMPUTED_PREFIX_RESULTS else None
+        if top is None:
+            if len(folded_prefix) <= _PRECOMPUTED_PREFIX_LENGTH and limit <= _PRECOMPUTED_PREFIX_RESULTS:
+                return []
+            top = self._rank_range(folded_prefix, limit)
+        return [(player_id, self.name_by_id[player_id]) for player_id in top[:limit]]
@@ -0,0 +1,556 @@
+import logging
+from typing import Awaitable, Callable, Collection, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+Node = Hashable
+FrontierExpansion = Mapping[Node, Iterable[Node]]
+
+
+class BidirectionalSearch:
+    """
+    Meet-in-the-middle breadth-first search between two nodes of an undirected graph.
+
+    The search only tracks state; callers drive it by asking for the next
+    frontier, expanding it with whatever neighbor source they have (in-memory
+    adjacency, one Cypher query per level, ...) and feeding the result back:
+
+        search = BidirectionalSearch(source, target, max_hops=6)
+        while (step := search.next_frontier()) is not None:
+            forward, frontier = step
+            search.absorb(forward, expand(frontier))
+        path = search.path
+
+    Each step expands a whole BFS level from whichever side currently has the
+    smaller frontier, so the work grows with the branching factor to the power
+    of roughly half the path length instead of the full length.
+    """
+
+    def __init__(
+        self,
+        source: Node,
+        target: Node,
+        max_hops: int,
+        max_visited_nodes: Optional[int] = None,
+        blocked: Optional[Collection[Node]] = None,
+        forward_bound: Optional[Callable[[Node], int]] = None,
+        backward_bound: Optional[Callable[[Node], int]] = None,
+    ):
+        self.source = source
+        self.target = target
+        self.max_hops = max(0, int(max_hops))
+        self.max_visited_nodes = max_visited_nodes
+        self.blocked = blocked or ()
+        self.path: Optional[List[Node]] = None
+        self.aborted = False
+        # Optional admissible heuristics (lower bounds on the remaining distance to
+        # the target / source). Nodes that cannot lie on a path within max_hops
+        # are never added to a frontier.
+        self._bounds = (forward_bound, backward_bound)
+
+        self._parents: Tuple[Dict[Node, Optional[Node]], Dict[Node, Optional[Node]]] = (
+            {source: None},
+            {target: None},
+        )
+        self._depths: Tuple[Dict[Node, int], Dict[Node, int]] = ({source: 0}, {target: 0})
+        self._frontiers: Tuple[List[Node], List[Node]] = ([source], [target])
+        self._levels = [0, 0]
+
+        if source == target:
+            self.path = [source]
+
+    @property
+    def finished(self) -> bool:
+        return self.path is not None or self.aborted
+
+    @property
+    def visited_count(self) -> int:
+        return len(self._parents[0]) + len(self._parents[1])
+
+    def next_frontier(self) -> Optional[Tuple[bool, List[Node]]]:
+        """
+        Returns `(forward, frontier)` for the next level to expand, or None when
+        the search is over (path found, frontier exhausted, hop budget spent or aborted).
+        """
+        if self.finished:
+            return None
+        if self._levels[0] + self._levels[1] >= self.max_hops:
+            return None
+        forward_frontier, backward_frontier = self._frontiers
+        if not forward_frontier or not backward_frontier:
+            return None
+        forward = len(forward_frontier) <= len(backward_frontier)
+        return forward, list(forward_frontier if forward else backward_frontier)
+
+    def absorb(self, forward: bool, expansion: FrontierExpansion) -> None:
+        """Records the neighbors discovered while expanding the frontier returned by `next_frontier`."""
+        side = 0 if forward else 1
+        parents = self._parents[side]
+        depths = self._depths[side]
+        other_depths = self._depths[1 - side]
+        next_depth = self._levels[side] + 1
+        bound = self._bounds[side]
+
+        best_meeting: Optional[Tuple[int, Node, Node]] = None
+        next_frontier: List[Node] = []
+        for node in self._frontiers[side]:
+            for neighbor in expansion.get(node, ()):
+                if neighbor in parents or neighbor in self.blocked:
+                    continue
+                if bound is not None and next_depth + bound(neighbor) > self.max_hops:
+                    continue
+                parents[neighbor] = node
+                depths[neighbor] = next_depth
+                next_frontier.append(neighbor)
+
+                other_depth = other_depths.get(neighbor)
+                if other_depth is not None:
+                    total = next_depth + other_depth
+                    if total <= self.max_hops and (best_meeting is None or total < best_meeting[0]):
+                        best_meeting = (total, neighbor, node)
+
+        self._frontiers[side][:] = next_frontier
+        self._levels[side] = next_depth
+
+        if best_meeting is not None:
+            self.path = self._build_path(best_meeting[1])
+            return
+
+        if self.max_visited_nodes is not None and self.visited_count > self.max_visited_nodes:
+            logger.warning(
+                "Aborting bidirectional BFS source=%s target=%s visited_nodes>%s",
+                self.source,
+                self.target,
+                self.max_visited_nodes,
+            )
+            self.aborted = True
+
+    def abort(self, reason: str) -> None:
+        """Stops the search without a path, e.g. when a frontier expansion exceeded its limits."""
+        logger.warning(
+            "Aborting bidirectional BFS source=%s target=%s: %s",
+            self.source,
+            self.target,
+            reason,
+        )
+        self.aborted = True
+
+    def _build_path(self, meeting: Node) -> List[Node]:
+        forward_parents, backward_parents = self._parents
+        path: List[Node] = []
+        cursor: Optional[Node] = meeting
+        while cursor is not None:
+            path.append(cursor)
+            cursor = forward_parents[cursor]
+        path.reverse()
+
+        cursor = backward_parents[meeting]
+        while cursor is not None:
+            path.append(cursor)
+            cursor = backward_parents[cursor]
+        return path
+
+
+def run_bidirectional_search(
+    search: BidirectionalSearch,
+    expand: Callable[[List[Node]], FrontierExpansion],
+) -> List[Node]:
+    """Drives a search with a synchronous frontier expander. Returns the path or an empty list."""
+    while (step := search.next_frontier()) is not None:
+        forward, frontier = step
+        search.absorb(forward, expand(frontier))
+    return search.path or []
+
+
+async def run_bidirectional_search_async(
+    search: BidirectionalSearch,
+    expand: Callable[[List[Node]], Awaitable[FrontierExpansion]],
+) -> List[Node]:
+    """Drives a search with an async frontier expander (e.g. one backed by Neo4j)."""
+    while (step := search.next_frontier()) is not None:
+        forward, frontier = step
+        expansion = await expand(frontier)
+        if search.aborted:
+            break
+        search.absorb(forward, expansion)
+    return search.path or []
+
+
+class ShortestPathCounter:
+    """
+    Single-source BFS that accumulates shortest-path counts over the
+    shortest-path DAG (every node's count is the sum of its predecessors'
+    counts) and stops after the level that reaches the target.
+
+    Driven like BidirectionalSearch: call `next_frontier()`, expand the returned
+    frontier, and pass the expansion to `absorb()` until `next_frontier()`
+    returns None. Afterwards `count` holds the number of distinct shortest paths
+    and `iter_paths()` lazily enumerates them.
+    """
+
+    def __init__(
+        self,
+        source: Node,
+        target: Node,
+        max_hops: int,
+        max_visited_nodes: Optional[int] = None,
+    ):
+        self.source = source
+        self.target = target
+        self.max_hops = max(0, int(max_hops))
+        self.max_visited_nodes = max_visited_nodes
+        self.aborted = False
+
+        self._depths: Dict[Node, int] = {source: 0}
+        self._counts: Dict[Node, int] = {source: 1}
+        self._predecessors: Dict[Node, List[Node]] = {source: []}
+        self._frontier: List[Node] = [source]
+        self._level = 0
+
+    @property
+    def found(self) -> bool:
+        return self.target in self._depths
+
+    @property
+    def count(self) -> int:
+        return self._counts.get(self.target, 0) if not self.aborted else 0
+
+    @property
+    def length(self) -> Optional[int]:
+        return self._depths.get(self.target) if self.count else None
+
+    def next_frontier(self) -> Optional[List[Node]]:
+        if self.aborted or self.found or not self._frontier or self._level >= self.max_hops:
+            return None
+        return list(self._frontier)
+
+    def absorb(self, expansion: FrontierExpansion) -> None:
+        depths = self._depths
+        counts = self._counts
+        predecessors = self._predecessors
+        next_depth = self._level + 1
+
+        next_frontier: List[Node] = []
+        for node in self._frontier:
+            node_count = counts[node]
+            for neighbor in expansion.get(node, ()):
+                neighbor_depth = depths.get(neighbor)
+                if neighbor_depth is None:
+                    depths[neighbor] = next_depth
+                    counts[neighbor] = 0
+                    predecessors[neighbor] = []
+                    next_frontier.append(neighbor)
+                elif neighbor_depth != next_depth:
+                    continue
+                counts[neighbor] += node_count
+                predecessors[neighbor].append(node)
+
+        self._frontier = next_frontier
+        self._level = next_depth
+
+        if self.max_visited_nodes is not None and len(depths) > self.max_visited_nodes and not self.found:
+            logger.warning(
+                "Aborting shortest-path counting BFS source=%s target=%s visited_nodes>%s",
+                self.source,
+                self.target,
+                self.max_visited_nodes,
+            )
+            self.aborted = True
+
+    def abort(self, reason: str) -> None:
+        logger.warning(
+            "Aborting shortest-path counting BFS source=%s target=%s: %s",
+            self.source,
+            self.target,
+            reason,
+        )
+        self.aborted = True
+
+    def iter_paths(self) -> Iterator[List[Node]]:
+        """Lazily yields every shortest path (source first) by walking the DAG back from the target."""
+        if not self.count:
+            return
+        predecessors = self._predecessors
+        stack: List[Tuple[Node, int]] = [(self.target, 0)]
+        suffix: List[Node] = []
+        while stack:
+            node, depth = stack.pop()
+            del suffix[depth:]
+            suffix.append(node)
+            if node == self.source:
+                yield list(reversed(suffix))
+                continue
+            for predecessor in reversed(predecessors[node]):
+                stack.append((predecessor, depth + 1))
+
+
+def run_path_counter(
+    counter: ShortestPathCounter,
+    expand: Callable[[List[Node]], FrontierExpansion],
+) -> ShortestPathCounter:
+    """Drives a path counter with a synchronous frontier expander."""
+    while (frontier := counter.next_frontier()) is not None:
+        counter.absorb(expand(frontier))
+    return counter
+
+
+async def run_path_counter_async(
+    counter: ShortestPathCounter,
+    expand: Callable[[List[Node]], Awaitable[FrontierExpansion]],
+) -> ShortestPathCounter:
+    """Drives a path counter with an async frontier expander (e.g. one backed by Neo4j)."""
+    while (frontier := counter.next_frontier()) is not None:
+        expansion = await expand(frontier)
+        if counter.aborted:
+            break
+        counter.absorb(expansion)
+    return counter
+
+
+class BreadthFirstTree:
+    """
+    Single-source BFS that records a parent per visited node, stopping as soon
+    as every node in `targets` has been reached (or at `max_depth`). Used to
+    answer several distance/path questions from one source with one traversal,
+    e.g. every segment of a waypoint path that starts at the same player.
+    """
+
+    def __init__(
+        self,
+        source: Node,
+        targets: Iterable[Node],
+        max_depth: int,
+        blocked: Optional[Collection[Node]] = None,
+        max_visited_nodes: Optional[int] = None,
+    ):
+        self.source = source
+        self.max_depth = max(0, int(max_depth))
+        self.blocked = blocked or ()
+        self.max_visited_nodes = max_visited_nodes
+        self.aborted = False
+
+        self._parents: Dict[Node, Optional[Node]] = {source: None}
+        self._depths: Dict[Node, int] = {source: 0}
+        self._pending = {target for target in targets if target != source}
+        self._frontier: List[Node] = [source]
+        self._level = 0
+
+    def next_frontier(self) -> Optional[List[Node]]:
+        if self.aborted or not self._pending or not self._frontier or self._level >= self.max_depth:
+            return None
+        return list(self._frontier)
+
+    def absorb(self, expansion: FrontierExpansion) -> None:
+        parents = self._parents
+        depths = self._depths
+        next_depth = self._level + 1
+        next_frontier: List[Node] = []
+        for node in self._frontier:
+            for neighbor in expansion.get(node, ()):
+                if neighbor in parents or neighbor in self.blocked:
+                    continue
+                parents[neighbor] = node
+                depths[neighbor] = next_depth
+                next_frontier.append(neighbor)
+                self._pending.discard(neighbor)
+        self._frontier = next_frontier
+        self._level = next_depth
+
+        if self.max_visited_nodes is not None and self._pending and len(parents) > self.max_visited_nodes:
+            self.abort(f"visited_nodes>{self.max_visited_nodes}")
+
+    def abort(self, reason: str) -> None:
+        logger.warning("Aborting BFS tree source=%s: %s", self.source, reason)
+        self.aborted = True
+
+    def distance(self, node: Node) -> Optional[int]:
+        return None if self.aborted else self._depths.get(node)
+
+    def path_to(self, node: Node) -> List[Node]:
+        """Returns the tree path from the source to `node` (inclusive), or an empty list if unreached."""
+        if self.distance(node) is None:
+            return []
+        path: List[Node] = []
+        cursor: Optional[Node] = node
+        while cursor is not None:
+            path.append(cursor)
+            cursor = self._parents[cursor]
+        path.reverse()
+        return path
+
+
+def run_breadth_first_tree(
+    tree: BreadthFirstTree,
+    expand: Callable[[List[Node]], FrontierExpansion],
+) -> BreadthFirstTree:
+    """Drives a BFS tree with a synchronous frontier expander."""
+    while (frontier := tree.next_frontier()) is not None:
+        tree.absorb(expand(frontier))
+    return tree
+
+
+async def run_breadth_first_tree_async(
+    tree: BreadthFirstTree,
+    expand: Callable[[List[Node]], Awaitable[FrontierExpansion]],
+) -> BreadthFirstTree:
+    """Drives a BFS tree with an async frontier expander (e.g. one backed by Neo4j)."""
+    while (frontier := tree.next_frontier()) is not None:
+        expansion = await expand(frontier)
+        if tree.aborted:
+            break
+        tree.absorb(expansion)
+    return tree
+
+
+def order_waypoints(
+    start: Node,
+    end: Node,
+    waypoints: List[Node],
+    distance: Callable[[Node, Node], Optional[int]],
+) -> Optional[Tuple[int, List[Node]]]:
+    """
+    Finds the visiting order of `waypoints` minimising the total distance of
+    start -> waypoints -> end (Held-Karp dynamic programming over subsets).
+    `distance` returns None for unreachable pairs. Returns `(total, order)`,
+    or None when no order connects every stop.
+    """
+    count = len(waypoints)
+    if count == 0:
+        total = distance(start, end)
+        return (total, []) if total is not None else None
+
+    full = (1 << count) - 1
+    # best[mask][last] = (cost, previous waypoint) for paths from `start` that
+    # visit exactly the waypoints in `mask` and end at waypoint `last`.
+    best: List[Dict[int, Tuple[int, int]]] = [dict() for _ in range(full + 1)]
+    for idx, waypoint in enumerate(waypoints):
+        cost = distance(start, waypoint)
+        if cost is not None:
+            best[1 << idx][idx] = (cost, -1)
+
+    for mask in range(1, full + 1):
+        for last, (cost, _) in best[mask].items():
+            for nxt in range(count):
+                if mask & (1 << nxt):
+                    continue
+                step = distance(waypoints[last], waypoints[nxt])
+                if step is None:
+                    continue
+                candidate = cost + step
+                next_mask = mask | (1 << nxt)
+                current = best[next_mask].get(nxt)
+                if current is None or candidate < current[0]:
+                    best[next_mask][nxt] = (candidate, last)
+
+    finish: Optional[Tuple[int, int]] = None
+    for last, (cost, _) in best[full].items():
+        step = distance(waypoints[last], end)
+        if step is not None and (finish is None or cost + step < finish[0]):
+            finish = (cost + step, last)
+    if finish is None:
+        return None
+
+    order: List[Node] = []
+    mask, last = full, finish[1]
+    while last != -1:
+        order.append(waypoints[last])
+        previous = best[mask][last][1]
+        mask &= ~(1 << last)
+        last = previous
+    order.reverse()
+    return finish[0], order
+
+
+class _BlockedUnion:
+    """Membership test over two blocked collections, so neither has to be copied."""
+
+    __slots__ = ("first", "second")
+
+    def __init__(self, first: Collection[Node], second: Collection[Node]):
+        self.first = first
+        self.second = second
+
+    def __contains__(self, node: object) -> bool:
+        return node in self.first or node in self.second
+
+
+class WaypointPathBuilder:
+    """
+    Joins the segments of a waypoint route (see order_waypoints) into a path
+    that visits no player twice. Each segment is read from the BFS tree grown
+    from its start; a tree path through a player already on the path, or
+    through a stop still to come, is searched again with those players
+    blocked. Driven like the searches:
+
+        builder = WaypointPathBuilder(route, trees, max_hops)
+        while (search := builder.next_search()) is not None:
+            run_bidirectional_search(search, expand)
+            builder.absorb(search)
+        path = builder.path
+
+    `path` is empty when a segment cannot be re-routed within the hop budget.
+    """
+
+    def __init__(
+        self,
+        route: List[Node],
+        trees: Mapping[Node, BreadthFirstTree],
+        max_hops: int,
+        blocked: Optional[Collection[Node]] = None,
+        max_visited_nodes: Optional[int] = None,
+    ):
+        self.route = route
+        self.trees = trees
+        self.max_hops = max(0, int(max_hops))
+        self.blocked = blocked or ()
+        self.max_visited_nodes = max_visited_nodes
+        self.failed = False
+        self._path: List[Node] = [route[0]]
+        self._used = {route[0]}
+        self._segment = 0
+
+    @property
+    def path(self) -> List[Node]:
+        return [] if self.failed or self._segment < len(self.route) - 1 else list(self._path)
+
+    def next_search(self) -> Optional[BidirectionalSearch]:
+        """Returns the search that re-routes the next clashing segment, or None when the path is done."""
+        route = self.route
+        while not self.failed and self._segment < len(route) - 1:
+            start, end = route[self._segment], route[self._segment + 1]
+            avoid = self._used.union(route[self._segment + 2:])
+            segment = self.trees[start].path_to(end)
+            if segment and avoid.isdisjoint(segment[1:]):
+                self._extend(segment)
+                continue
+            # Later segments can only get longer, so their tree distances are reserved.
+            reserved = 0
+            for later_start, later_end in zip(route[self._segment + 1:], route[self._segment + 2:]):
+                reserved += self.trees[later_start].distance(later_end) or 0
+            budget = self.max_hops - (len(self._path) - 1) - reserved
+            if budget <= 0:
+                self.failed = True
+                return None
+            avoid.discard(start)
+            return BidirectionalSearch(
+                start,
+                end,
+                max_hops=budget,
+                max_visited_nodes=self.max_visited_nodes,
+                blocked=_BlockedUnion(self.blocked, avoid),
+            )
+        return None
+
+    def absorb(self, search: BidirectionalSearch) -> None:
+        """Records the re-routed segment found by the search returned from `next_search`."""
+        if not search.path:
+            self.failed = True
+            return
+        self._extend(search.path)
+
+    def _extend(self, segment: List[Node]) -> None:
+        self._path.extend(segment[1:])
+        self._used.update(segment[1:])
+        self._segment += 1
+        if len(self._path) - 1 > self.max_hops:
+            self.failed = True
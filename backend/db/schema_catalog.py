@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from backend.db.graph_catalog import read_graph_catalog
+from backend.db.graph_deltas import get_graph_version
+from backend.db.session import GraphDB, get_graph_db
+
+logger = logging.getLogger("uvicorn.error")
+
+# Indexes can be created without a graph version bump, so the catalog is also
+# reloaded once it is this old.
+_CATALOG_MAX_AGE_SECONDS = 60 * 10
+# Schema introspection can occasionally stall; a reload gives up after this long.
+_CATALOG_LOAD_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class SchemaCatalog:
+    """
+    What the database currently holds, as far as request validation and the
+    settings screens care: relationship types, index names, the season range
+    and the team codes. `graph_version` is the version it was read at.
+    """
+    relationship_types: Tuple[str, ...]
+    indexes: Tuple[str, ...]
+    season_bounds: Optional[Dict[str, int]]
+    teams: Tuple[str, ...]
+    graph_version: int
+    loaded_at: float
+
+
+async def fetch_relationship_types(db: GraphDB) -> List[str]:
+    result = await db.run_query("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType")
+    return [record["relationshipType"] for record in result]
+
+
+async def fetch_indexes(db: GraphDB) -> List[str]:
+    result = await db.run_query("SHOW INDEXES YIELD name RETURN name ORDER BY name")
+    return [record["name"] for record in result]
+
+
+async def fetch_season_year_bounds(db: GraphDB) -> Optional[Dict[str, int]]:
+    """
+    Returns the min/max available season start years, read from the graph
+    catalog when it has been built and from relationship data otherwise.
+    Example: season 20232024 returns year 2023.
+    """
+    catalog = await read_graph_catalog(db)
+    if catalog is not None:
+        min_season, max_season = catalog.min_season, catalog.max_season
+    else:
+        query = """
+            MATCH ()-[r]-()
+            WHERE r.season IS NOT NULL
+            RETURN min(r.season) AS min_season, max(r.season) AS max_season
+        """
+        result = await db.run_query(query)
+        if not result:
+            return None
+        min_season = result[0].get("min_season")
+        max_season = result[0].get("max_season")
+
+    if min_season is None or max_season is None:
+        return None
+
+    return {
+        "min_year": int(min_season) // 10000,
+        "max_year": int(max_season) // 10000,
+    }
+
+
+async def fetch_teams(db: GraphDB) -> List[str]:
+    catalog = await read_graph_catalog(db)
+    if catalog is not None:
+        return list(catalog.teams)
+    query = "MATCH ()-[r]->() WHERE r.team IS NOT NULL RETURN DISTINCT r.team AS teamid ORDER BY teamid"
+    result = await db.run_query(query)
+    return [record["teamid"] for record in result]
+
+
+_schema_catalog: Optional[SchemaCatalog] = None
+_load_task: Optional["asyncio.Task[Optional[SchemaCatalog]]"] = None
+
+
+def get_schema_catalog() -> Optional[SchemaCatalog]:
+    """Returns the loaded catalog without waiting, or None if it has not been loaded yet."""
+    return _schema_catalog
+
+
+async def load_schema_catalog() -> SchemaCatalog:
+    """Reads the catalog from Neo4j and installs it."""
+    global _schema_catalog
+    started = time.perf_counter()
+    db = get_graph_db()
+    version = await get_graph_version(db)
+    relationship_types, indexes, season_bounds, teams = await asyncio.wait_for(
+        asyncio.gather(
+            fetch_relationship_types(db),
+            fetch_indexes(db),
+            fetch_season_year_bounds(db),
+            fetch_teams(db),
+        ),
+        timeout=_CATALOG_LOAD_TIMEOUT_SECONDS,
+    )
+    _schema_catalog = SchemaCatalog(
+        relationship_types=tuple(relationship_types),
+        indexes=tuple(indexes),
+        season_bounds=season_bounds,
+        teams=tuple(teams),
+        graph_version=version,
+        loaded_at=time.monotonic(),
+    )
+    logger.info(
+        "Loaded schema catalog version=%s relationship_types=%s indexes=%s teams=%s elapsed=%.3fs",
+        version,
+        len(relationship_types),
+        len(indexes),
+        len(teams),
+        time.perf_counter() - started,
+    )
+    return _schema_catalog
+
+
+async def _load_quietly() -> Optional[SchemaCatalog]:
+    try:
+        return await load_schema_catalog()
+    except Exception:
+        logger.exception("Failed loading schema catalog")
+        return None
+
+
+def request_schema_catalog_load() -> None:
+    """Starts a background load unless one is already running; callers never wait for it."""
+    global _load_task
+    if _load_task is None or _load_task.done():
+        _load_task = asyncio.get_running_loop().create_task(_load_quietly())
+
+
+async def refresh_schema_catalog() -> bool:
+    """Reloads the catalog when the graph version moved or it aged out. Returns True when it was reloaded."""
+    catalog = _schema_catalog
+    if catalog is not None and time.monotonic() - catalog.loaded_at < _CATALOG_MAX_AGE_SECONDS:
+        if await get_graph_version(get_graph_db()) == catalog.graph_version:
+            return False
+    return await _load_quietly() is not None
+
+
+async def watch_schema_catalog(interval_seconds: float) -> None:
+    """Background task: keeps the catalog current with the pipeline's graph version."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await refresh_schema_catalog()
+        except Exception:
+            logger.exception("Failed refreshing schema catalog")
@@ -0,0 +1,1137 @@
+import asyncio
+import bisect
+import logging
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from backend.core.config import settings
+from backend.db.graph_deltas import (
+    contiguous_deltas,
+    delta_edge_rows,
+    delta_names,
+    get_graph_version,
+    read_graph_deltas,
+)
+from backend.db.graph_snapshot import SnapshotError, read_snapshot, write_snapshot
+from backend.db.landmarks import LandmarkIndex, build_landmark_index, hopeless
+from backend.db.path_search import (
+    BidirectionalSearch,
+    BreadthFirstTree,
+    ShortestPathCounter,
+    WaypointPathBuilder,
+    order_waypoints,
+    run_breadth_first_tree,
+    run_bidirectional_search,
+    run_path_counter,
+)
+from backend.db.session import get_graph_db
+
+logger = logging.getLogger("uvicorn.error")
+
+# Number of source players fetched per Cypher round trip while loading edges.
+# Keeps each result set bounded instead of streaming every relationship at once.
+_LOAD_BATCH_SIZE = 250
+
+# Connected-component labellings kept per graph, keyed by compiled filter.
+# Each one is an int per player, so a handful of distinct settings is plenty.
+_COMPONENT_CACHE_SIZE = 16
+# Candidate player pools (random start selection) kept per graph, keyed the same way.
+_CANDIDATE_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class EdgeFilter:
+    """
+    Compiled form of the teams/years/game-types filters, expressed in the
+    graph's integer codes so edges can be checked without string compares.
+    A `None` mask means "no restriction" for that attribute.
+    """
+    team_mask: Optional[bytes]
+    type_mask: Optional[int]
+    min_year: Optional[int]
+    max_year: Optional[int]
+
+    @property
+    def unrestricted(self) -> bool:
+        return self.team_mask is None and self.type_mask is None and self.min_year is None and self.max_year is None
+
+    def matches(self, team_code: int, season_year: int, type_code: int) -> bool:
+        # Teams first seen in a delta after the filter was compiled are outside the mask.
+        if self.team_mask is not None and (team_code >= len(self.team_mask) or not self.team_mask[team_code]):
+            return False
+        if self.type_mask is not None and not (self.type_mask >> type_code) & 1:
+            return False
+        if self.min_year is not None and season_year < self.min_year:
+            return False
+        if self.max_year is not None and season_year > self.max_year:
+            return False
+        return True
+
+
+class IndexBitset:
+    """Set of player indexes stored as one byte per player, for O(1) blocked-node checks during expansion."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, size: int, indexes: Iterable[int] = ()):
+        self.bits = bytearray(size)
+        for idx in indexes:
+            self.bits[idx] = 1
+
+    def __contains__(self, idx: int) -> bool:
+        return idx < len(self.bits) and self.bits[idx] == 1
+
+    def __len__(self) -> int:
+        return self.bits.count(1)
+
+
+class NameTable:
+    """
+    Player names packed into one UTF-8 buffer: the name of the player at index
+    `i` is `data[offsets[i]:offsets[i + 1]]`. Lets names live in the same
+    mmap-able snapshot as the adjacency arrays.
+    """
+
+    def __init__(self, offsets: Sequence[int], data: Sequence[int]):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "NameTable":
+        offsets = array("q", [0])
+        data = bytearray()
+        for name in names:
+            data.extend(name.encode("utf-8"))
+            offsets.append(len(data))
+        return cls(offsets, bytes(data))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return bytes(self.data[self.offsets[idx]:self.offsets[idx + 1]]).decode("utf-8")
+
+
+class ComponentIndex:
+    """
+    Connected-component labelling of a filtered teammate graph. `labels[i]` is
+    the component of the player at index `i` and `sizes[label]` its player
+    count; players without a matching edge form singleton components.
+    """
+
+    def __init__(self, labels: Sequence[int], sizes: Sequence[int]):
+        self.labels = labels
+        self.sizes = sizes
+        self._members_by_min_size: Dict[int, array] = {}
+
+    @property
+    def component_count(self) -> int:
+        return len(self.sizes)
+
+    def component_size(self, idx: int) -> int:
+        return self.sizes[self.labels[idx]]
+
+    def members_of_large_components(self, min_size: int) -> array:
+        """Indexes of every player whose component has at least `min_size` players (cached per size)."""
+        members = self._members_by_min_size.get(min_size)
+        if members is None:
+            sizes = self.sizes
+            members = array("i", (idx for idx, label in enumerate(self.labels) if sizes[label] >= min_size))
+            self._members_by_min_size[min_size] = members
+        return members
+
+    def sample(self, min_size: int) -> Optional[int]:
+        """Uniformly picks a player index from components of at least `min_size` players."""
+        members = self.members_of_large_components(min_size)
+        return members[random.randrange(len(members))] if members else None
+
+
+class RosterIndex:
+    """
+    Sorted player indexes per `(team_code, season_year, type_code)`: every
+    player with at least one teammate edge of that team, season and game type.
+    """
+
+    def __init__(self, rosters: Dict[Tuple[int, int, int], array]):
+        self.rosters = rosters
+
+    def union(self, edge_filter: EdgeFilter) -> array:
+        """Returns the sorted indexes of players with at least one edge matching the filter."""
+        members = set()
+        for (team_code, season_year, type_code), indexes in self.rosters.items():
+            if edge_filter.matches(team_code, season_year, type_code):
+                members.update(indexes)
+        return array("i", sorted(members))
+
+
+class TeammateGraph:
+    """
+    Compact, array-backed teammate adjacency (CSR layout).
+
+    Players are addressed by a dense index into `player_ids`. The edges of the
+    player at index `i` live in `offsets[i]:offsets[i + 1]` of the parallel
+    edge arrays: `neighbors` holds the teammate's index, while `edge_team`,
+    `edge_season` and `edge_type` hold integer codes for the team tricode,
+    season start year and relationship type. Each (pair, team, season, type)
+    combination is stored once per direction, and each player's edges are
+    ordered by season so a year window is a binary search, not a scan.
+
+    Games added after the arrays were built are applied as deltas: new players
+    get indexes after the CSR ones and their edges live in a small per-player
+    overlay that every traversal reads alongside the arrays. `version` is the
+    graph version (see graph_deltas) the structure reflects.
+    """
+
+    def __init__(
+        self,
+        player_ids: Sequence[int],
+        offsets: Sequence[int],
+        neighbors: Sequence[int],
+        edge_team: Sequence[int],
+        edge_season: Sequence[int],
+        edge_type: Sequence[int],
+        team_codes: List[str],
+        type_codes: List[str],
+    ):
+        self.player_ids = player_ids
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.edge_team = edge_team
+        self.edge_season = edge_season
+        self.edge_type = edge_type
+        self.team_codes = team_codes
+        self.type_codes = type_codes
+        self._index_by_id: Dict[int, int] = {int(player_id): idx for idx, player_id in enumerate(player_ids)}
+        self._team_index = {team: code for code, team in enumerate(team_codes)}
+        self._type_index = {rel_type: code for code, rel_type in enumerate(type_codes)}
+        self._unfiltered_adjacency: Optional[Tuple[int, Tuple[array, array]]] = None
+        self._components: "OrderedDict[Tuple[EdgeFilter, int], ComponentIndex]" = OrderedDict()
+        self._candidates: "OrderedDict[Tuple[EdgeFilter, int], array]" = OrderedDict()
+        self._roster_index: Optional[Tuple[int, RosterIndex]] = None
+        self._cache_lock = threading.Lock()
+        self.landmarks: Optional[LandmarkIndex] = None
+        self.names: Optional[NameTable] = None
+        self.version = 0
+        self._base_count = len(player_ids)
+        self._extra_ids: List[int] = []
+        self._extra_names: Dict[int, str] = {}
+        self._overlay: Dict[int, List[Tuple[int, int, int, int]]] = {}
+        self._overlay_edge_count = 0
+        # (lower index, higher index, team, season, type) of every overlay edge.
+        self._overlay_keys: Set[Tuple[int, int, int, int, int]] = set()
+
+    @property
+    def player_count(self) -> int:
+        return self._base_count + len(self._extra_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.neighbors) + self._overlay_edge_count
+
+    def index_of(self, player_id: int) -> Optional[int]:
+        return self._index_by_id.get(int(player_id))
+
+    @property
+    def has_deltas(self) -> bool:
+        return bool(self._extra_ids or self._overlay or self._extra_names)
+
+    def player_id_at(self, idx: int) -> int:
+        if idx < self._base_count:
+            return int(self.player_ids[idx])
+        return self._extra_ids[idx - self._base_count]
+
+    def name_of(self, player_id: int) -> Optional[str]:
+        """Returns the player's full name when the graph carries a name table or a delta named them."""
+        idx = self.index_of(player_id)
+        if idx is None:
+            return None
+        name = self._extra_names.get(idx)
+        if name is None and self.names is not None and idx < self._base_count:
+            name = self.names[idx]
+        return name
+
+    def apply_deltas(self, deltas: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Applies logged games (see graph_deltas) on top of the arrays and returns
+        how many were applied. Edges to players without a known name are
+        skipped, matching the full load. Derived structures (landmarks, component
+        labellings, candidate pools, the unfiltered adjacency) no longer describe the
+        graph afterwards and are dropped; callers rebuild landmarks if needed.
+
+        Whole-graph passes run in executor threads while deltas are applied on
+        the event loop, so the overlay is copy-on-write: edges go into fresh
+        lists that are published in one assignment, and `version` moves only
+        after that. A pass that reads `version`, `_overlay` and then
+        `player_count` sees one consistent graph.
+        """
+        applied = 0
+        version = self.version
+        overlay = dict(self._overlay)
+        copied: Set[int] = set()
+
+        def edges_of(idx: int) -> List[Tuple[int, int, int, int]]:
+            if idx not in copied:
+                overlay[idx] = list(overlay.get(idx, ()))
+                copied.add(idx)
+            return overlay[idx]
+
+        for delta in deltas:
+            for player_id, name in delta_names(delta).items():
+                idx = self.index_of(player_id)
+                if idx is None:
+                    idx = self.player_count
+                    self._extra_ids.append(player_id)
+                    self._index_by_id[player_id] = idx
+                self._extra_names[idx] = name
+
+            for player1_id, player2_id, team, season, rel_type in delta_edge_rows(delta):
+                idx1 = self.index_of(player1_id)
+                idx2 = self.index_of(player2_id)
+                if idx1 is None or idx2 is None or idx1 == idx2:
+                    continue
+                team_code = self._team_index.get(team.upper())
+                if team_code is None:
+                    team_code = len(self.team_codes)
+                    self.team_codes.append(team.upper())
+                    self._team_index[team.upper()] = team_code
+                type_code = self._type_index.get(rel_type)
+                if type_code is None:
+                    type_code = len(self.type_codes)
+                    self.type_codes.append(rel_type)
+                    self._type_index[rel_type] = type_code
+                season_year = season // 10000
+                # Later games of a (pair, team, season, type) already in the graph add no edge.
+                edge_key = (min(idx1, idx2), max(idx1, idx2), team_code, season_year, type_code)
+                if edge_key in self._overlay_keys or self._has_base_edge(idx1, idx2, team_code, season_year, type_code):
+                    continue
+                self._overlay_keys.add(edge_key)
+                edges_of(idx1).append((idx2, team_code, season_year, type_code))
+                edges_of(idx2).append((idx1, team_code, season_year, type_code))
+                self._overlay_edge_count += 2
+
+            version = max(version, int(delta["version"]))
+            applied += 1
+
+        if applied:
+            self._overlay = overlay
+            self.version = version
+            self.landmarks = None
+            self._unfiltered_adjacency = None
+            self._roster_index = None
+            with self._cache_lock:
+                self._components.clear()
+                self._candidates.clear()
+        return applied
+
+    def _has_base_edge(self, idx1: int, idx2: int, team_code: int, season_year: int, type_code: int) -> bool:
+        """True if the CSR arrays already hold this (pair, team, season, type) edge."""
+        if idx1 >= self._base_count or idx2 >= self._base_count:
+            return False
+        start = bisect.bisect_left(self.edge_season, season_year, self.offsets[idx1], self.offsets[idx1 + 1])
+        end = bisect.bisect_right(self.edge_season, season_year, start, self.offsets[idx1 + 1])
+        for pos in range(start, end):
+            if self.neighbors[pos] == idx2 and self.edge_team[pos] == team_code and self.edge_type[pos] == type_code:
+                return True
+        return False
+
+    def unfiltered_adjacency(self) -> Tuple[array, array]:
+        """
+        Returns `(offsets, neighbors)` of a CSR holding each player's distinct
+        teammates regardless of team, season or type. Built once per graph
+        version and cached; used by whole-graph passes such as landmark BFS.
+        """
+        version = self.version
+        cached = self._unfiltered_adjacency
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        overlay = self._overlay
+        offsets = array("q", [0])
+        neighbors = array("i")
+        for idx in range(self.player_count):
+            distinct = set(self.neighbors[self.offsets[idx]:self.offsets[idx + 1]]) if idx < self._base_count else set()
+            distinct.update(edge[0] for edge in overlay.get(idx, ()))
+            neighbors.extend(sorted(distinct))
+            offsets.append(len(neighbors))
+        self._unfiltered_adjacency = (version, (offsets, neighbors))
+        return offsets, neighbors
+
+    def distance_bounds(self, player1_id: int, player2_id: int) -> Optional[Tuple[int, Optional[int]]]:
+        """
+        Returns `(lower, upper)` hop-distance bounds from the landmark index, or
+        None when either player is unknown or no index is loaded. `lower` holds
+        under any filter and is INFINITE_DISTANCE for disconnected players;
+        `upper` only applies to the unfiltered graph and may be None.
+        """
+        idx1 = self.index_of(player1_id)
+        idx2 = self.index_of(player2_id)
+        if idx1 is None or idx2 is None or self.landmarks is None:
+            return None
+        return self.landmarks.lower_bound(idx1, idx2), self.landmarks.upper_bound(idx1, idx2)
+
+    def compile_filter(
+        self,
+        teams: Optional[Iterable[str]] = None,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        game_types: Optional[Iterable[str]] = None,
+    ) -> EdgeFilter:
+        """Translates getter-style filter arguments into an EdgeFilter."""
+        team_mask: Optional[bytes] = None
+        if teams:
+            mask = bytearray(len(self.team_codes))
+            for team in teams:
+                code = self._team_index.get(team.upper())
+                if code is not None:
+                    mask[code] = 1
+            team_mask = bytes(mask)
+
+        type_mask: Optional[int] = None
+        if game_types:
+            type_mask = 0
+            for rel_type in game_types:
+                code = self._type_index.get(rel_type)
+                if code is not None:
+                    type_mask |= 1 << code
+
+        return EdgeFilter(
+            team_mask=team_mask,
+            type_mask=type_mask,
+            min_year=int(start_year) if start_year is not None else None,
+            max_year=int(end_year) if end_year is not None else None,
+        )
+
+    def neighbor_indexes(
+        self,
+        idx: int,
+        edge_filter: EdgeFilter,
+        overlay: Optional[Mapping[int, Sequence[Tuple[int, int, int, int]]]] = None,
+    ) -> List[int]:
+        """
+        Returns distinct teammate indexes of `idx` reachable through edges matching the filter.
+        The filter is applied while expanding: the season window narrows the edge range by
+        binary search, and only edges inside it are checked against the team and type masks.
+        Whole-graph passes pass the overlay they snapshotted (see apply_deltas).
+        """
+        result: List[int] = []
+        seen = set()
+        if idx < self._base_count:
+            start = self.offsets[idx]
+            end = self.offsets[idx + 1]
+            if edge_filter.unrestricted:
+                unfiltered_offsets, unfiltered_neighbors = self.unfiltered_adjacency()
+                result.extend(unfiltered_neighbors[unfiltered_offsets[idx]:unfiltered_offsets[idx + 1]])
+                seen.update(result)
+                start = end
+            else:
+                edge_season = self.edge_season
+                if edge_filter.min_year is not None:
+                    start = bisect.bisect_left(edge_season, edge_filter.min_year, start, end)
+                if edge_filter.max_year is not None:
+                    end = bisect.bisect_right(edge_season, edge_filter.max_year, start, end)
+
+            neighbors = self.neighbors
+            edge_team = self.edge_team
+            edge_type = self.edge_type
+            team_mask = edge_filter.team_mask
+            type_mask = edge_filter.type_mask
+            team_limit = len(team_mask) if team_mask is not None else 0
+            for pos in range(start, end):
+                neighbor = neighbors[pos]
+                if neighbor in seen:
+                    continue
+                if team_mask is not None:
+                    team_code = edge_team[pos]
+                    if team_code >= team_limit or not team_mask[team_code]:
+                        continue
+                if type_mask is not None and not (type_mask >> edge_type[pos]) & 1:
+                    continue
+                seen.add(neighbor)
+                result.append(neighbor)
+
+        matches = edge_filter.matches
+        for neighbor, team_code, season_year, type_code in (self._overlay if overlay is None else overlay).get(idx, ()):
+            if neighbor not in seen and matches(team_code, season_year, type_code):
+                seen.add(neighbor)
+                result.append(neighbor)
+        return result
+
+    def expand_frontier(
+        self,
+        frontier: Iterable[int],
+        edge_filter: EdgeFilter,
+        overlay: Optional[Mapping[int, Sequence[Tuple[int, int, int, int]]]] = None,
+        player_count: Optional[int] = None,
+    ) -> Dict[int, List[int]]:
+        """
+        Expands a whole BFS level at once, mapping each frontier index to its filtered teammates.
+        Searches pass the overlay and player count they snapshotted (see frontier_expander).
+        """
+        if player_count is None:
+            return {idx: self.neighbor_indexes(idx, edge_filter, overlay) for idx in frontier}
+        return {
+            # The cached unfiltered adjacency may already include newer players.
+            idx: [neighbor for neighbor in self.neighbor_indexes(idx, edge_filter, overlay) if neighbor < player_count]
+            for idx in frontier
+        }
+
+    def frontier_expander(self, edge_filter: EdgeFilter) -> Callable[[Iterable[int]], Dict[int, List[int]]]:
+        """
+        Returns an `expand_frontier` bound to the overlay and player count as of
+        this call, so every level of one search reads the same graph even when
+        deltas are applied between levels (see apply_deltas).
+        """
+        overlay = self._overlay
+        player_count = self.player_count
+        return lambda frontier: self.expand_frontier(frontier, edge_filter, overlay, player_count)
+
+    def bfs_layers(self, player_id: int, edge_filter: EdgeFilter, max_depth: int) -> List[List[int]]:
+        """
+        Filtered BFS from one player, returning the layers as lists of indexes
+        (layer 0 holds the player itself, layer d the players exactly d hops away).
+        Stops at `max_depth` or when a layer comes back empty.
+        """
+        source = self.index_of(player_id)
+        overlay = self._overlay
+        count = self.player_count
+        if source is None or source >= count:
+            return []
+        visited = bytearray(count)
+        visited[source] = 1
+        layers = [[source]]
+        while len(layers) <= max_depth:
+            next_layer: List[int] = []
+            for node in layers[-1]:
+                for neighbor in self.neighbor_indexes(node, edge_filter, overlay):
+                    # The cached unfiltered adjacency may already include newer players.
+                    if neighbor < count and not visited[neighbor]:
+                        visited[neighbor] = 1
+                        next_layer.append(neighbor)
+            if not next_layer:
+                break
+            layers.append(next_layer)
+        return layers
+
+    def components(self, edge_filter: EdgeFilter) -> ComponentIndex:
+        """
+        Returns the connected components of the graph restricted to edges
+        matching the filter. Labellings are computed with one BFS sweep and
+        kept in a small LRU cache, so repeated games with the same settings
+        reuse them.
+        """
+        # Runs in executor threads: the version, overlay and player count are read
+        # once, in that order (see apply_deltas), and the labelling is cached
+        # under that version so it is never served for a later one.
+        version = self.version
+        overlay = self._overlay
+        count = self.player_count
+        cache_key = (edge_filter, version)
+        with self._cache_lock:
+            cached = self._components.get(cache_key)
+            if cached is not None:
+                self._components.move_to_end(cache_key)
+                return cached
+
+        started = time.perf_counter()
+        labels = array("i", [-1]) * count
+        sizes = array("i")
+        for root in range(count):
+            if labels[root] != -1:
+                continue
+            label = len(sizes)
+            labels[root] = label
+            frontier = [root]
+            size = 1
+            while frontier:
+                next_frontier: List[int] = []
+                for node in frontier:
+                    for neighbor in self.neighbor_indexes(node, edge_filter, overlay):
+                        if neighbor < count and labels[neighbor] == -1:
+                            labels[neighbor] = label
+                            next_frontier.append(neighbor)
+                size += len(next_frontier)
+                frontier = next_frontier
+            sizes.append(size)
+        index = ComponentIndex(labels, sizes)
+        logger.info(
+            "Labelled teammate graph components components=%s largest=%s elapsed=%.3fs",
+            index.component_count,
+            max(sizes, default=0),
+            time.perf_counter() - started,
+        )
+
+        with self._cache_lock:
+            self._components[cache_key] = index
+            self._components.move_to_end(cache_key)
+            while len(self._components) > _COMPONENT_CACHE_SIZE:
+                self._components.popitem(last=False)
+        return index
+
+    def roster_index(self) -> RosterIndex:
+        """Returns the per-(team, season, game type) player index, built once per graph version."""
+        version = self.version
+        cached = self._roster_index
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        started = time.perf_counter()
+        overlay = self._overlay
+        rosters: Dict[Tuple[int, int, int], List[int]] = {}
+        for idx in range(self.player_count):
+            keys = set()
+            if idx < self._base_count:
+                start, end = self.offsets[idx], self.offsets[idx + 1]
+                keys.update(zip(self.edge_team[start:end], self.edge_season[start:end], self.edge_type[start:end]))
+            keys.update(edge[1:] for edge in overlay.get(idx, ()))
+            # Indexes are visited in order, so every roster list stays sorted.
+            for key in keys:
+                rosters.setdefault(key, []).append(idx)
+        index = RosterIndex({key: array("i", indexes) for key, indexes in rosters.items()})
+        self._roster_index = (version, index)
+        logger.info(
+            "Built teammate graph roster index rosters=%s elapsed=%.3fs",
+            len(rosters),
+            time.perf_counter() - started,
+        )
+        return index
+
+    def candidate_players(self, edge_filter: EdgeFilter) -> array:
+        """
+        Returns the sorted indexes of players with at least one edge matching
+        the filter. Unions are kept in a small LRU cache per filter, so picking
+        a random player for known settings is a single `random.choice`.
+        """
+        cache_key = (edge_filter, self.version)
+        with self._cache_lock:
+            cached = self._candidates.get(cache_key)
+            if cached is not None:
+                self._candidates.move_to_end(cache_key)
+                return cached
+
+        candidates = self.roster_index().union(edge_filter)
+        with self._cache_lock:
+            self._candidates[cache_key] = candidates
+            self._candidates.move_to_end(cache_key)
+            while len(self._candidates) > _CANDIDATE_CACHE_SIZE:
+                self._candidates.popitem(last=False)
+        return candidates
+
+    def shortest_path(
+        self,
+        player1_id: int,
+        player2_id: int,
+        edge_filter: EdgeFilter,
+        max_hops: int,
+        max_visited_nodes: Optional[int] = None,
+        blocked_ids: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        """
+        Bidirectional breadth-first search over the in-memory adjacency. Returns
+        the player IDs on the shortest path (inclusive), or an empty list when no
+        path exists within `max_hops`. Players in `blocked_ids` are never visited.
+        When a landmark index is attached, requests whose lower bound already
+        exceeds `max_hops` are rejected without traversal and the bounds prune
+        both frontiers as an A* heuristic.
+        """
+        expand = self.frontier_expander(edge_filter)
+        source = self.index_of(player1_id)
+        target = self.index_of(player2_id)
+        if source is None or target is None:
+            return []
+
+        blocked = self._blocked_bitset(blocked_ids, (source, target))
+        forward_bound = backward_bound = None
+        if self.landmarks is not None and source != target:
+            if hopeless(self.landmarks, source, target, max_hops):
+                return []
+            forward_bound = self.landmarks.lower_bound_to(target, other_idx=source)
+            backward_bound = self.landmarks.lower_bound_to(source, other_idx=target)
+
+        search = BidirectionalSearch(
+            source,
+            target,
+            max_hops=max_hops,
+            max_visited_nodes=max_visited_nodes,
+            blocked=blocked,
+            forward_bound=forward_bound,
+            backward_bound=backward_bound,
+        )
+        path = run_bidirectional_search(search, expand)
+        return [self.player_id_at(idx) for idx in path]
+
+    def waypoint_path(
+        self,
+        player1_id: int,
+        player2_id: int,
+        waypoint_ids: Sequence[int],
+        edge_filter: EdgeFilter,
+        max_hops: int,
+        blocked_ids: Optional[Iterable[int]] = None,
+        max_visited_nodes: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Shortest path from `player1_id` to `player2_id` that passes through every
+        player in `waypoint_ids`, in whichever order is shortest. One BFS tree is
+        grown from the start and from each waypoint (stopping once it has reached
+        all other stops); every segment distance and segment path is read from
+        those trees, and the best order is chosen by dynamic programming.
+        Segments that would revisit a player are searched again around the
+        players already used (see WaypointPathBuilder), so no player appears
+        twice. Returns an empty list when no such path of at most `max_hops` exists.
+        """
+        expand = self.frontier_expander(edge_filter)
+        source = self.index_of(player1_id)
+        target = self.index_of(player2_id)
+        waypoints = [self.index_of(player_id) for player_id in waypoint_ids]
+        if source is None or target is None or any(idx is None for idx in waypoints):
+            return []
+        waypoints = [idx for idx in dict.fromkeys(waypoints) if idx not in (source, target)]
+        stops = [source, *waypoints, target]
+        blocked = self._blocked_bitset(blocked_ids, stops)
+
+        trees: Dict[int, BreadthFirstTree] = {}
+        for stop in [source, *waypoints]:
+            tree = BreadthFirstTree(
+                stop,
+                [other for other in stops if other != stop],
+                max_depth=max_hops,
+                blocked=blocked,
+                max_visited_nodes=max_visited_nodes,
+            )
+            trees[stop] = run_breadth_first_tree(tree, expand)
+
+        def distance(a: int, b: int) -> Optional[int]:
+            tree = trees.get(a)
+            return tree.distance(b) if tree is not None else trees[b].distance(a)
+
+        ordered = order_waypoints(source, target, waypoints, distance)
+        if ordered is None or ordered[0] > max_hops:
+            return []
+
+        builder = WaypointPathBuilder(
+            [source, *ordered[1], target],
+            trees,
+            max_hops=max_hops,
+            blocked=blocked,
+            max_visited_nodes=max_visited_nodes,
+        )
+        while (search := builder.next_search()) is not None:
+            run_bidirectional_search(search, expand)
+            builder.absorb(search)
+        return [self.player_id_at(idx) for idx in builder.path]
+
+    def _blocked_bitset(self, blocked_ids: Optional[Iterable[int]], allowed: Iterable[int]) -> IndexBitset:
+        allowed_set = set(allowed)
+        return IndexBitset(
+            self.player_count,
+            (
+                idx
+                for idx in (self.index_of(player_id) for player_id in blocked_ids or ())
+                if idx is not None and idx not in allowed_set
+            ),
+        )
+
+    def count_shortest_paths(
+        self,
+        player1_id: int,
+        player2_id: int,
+        edge_filter: EdgeFilter,
+        max_hops: int,
+        max_visited_nodes: Optional[int] = None,
+    ) -> Optional[ShortestPathCounter]:
+        """
+        Single BFS from `player1_id` that counts every distinct shortest path to
+        `player2_id`. The returned counter works in graph indexes (map them back
+        through `player_ids`); None means one of the players is unknown.
+        """
+        expand = self.frontier_expander(edge_filter)
+        source = self.index_of(player1_id)
+        target = self.index_of(player2_id)
+        if source is None or target is None:
+            return None
+        counter = ShortestPathCounter(source, target, max_hops=max_hops, max_visited_nodes=max_visited_nodes)
+        if source != target and hopeless(self.landmarks, source, target, max_hops):
+            return counter
+        return run_path_counter(counter, expand)
+
+    def iter_edges(self, idx: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Yields every `(neighbor, team_code, season_year, type_code)` edge of a player, overlay included."""
+        if idx < self._base_count:
+            for pos in range(self.offsets[idx], self.offsets[idx + 1]):
+                yield (
+                    int(self.neighbors[pos]),
+                    int(self.edge_team[pos]),
+                    int(self.edge_season[pos]),
+                    int(self.edge_type[pos]),
+                )
+        yield from self._overlay.get(idx, ())
+
+    def team_seasons_between(self, idx_a: int, idx_b: int, edge_filter: EdgeFilter) -> List[Tuple[str, int]]:
+        """
+        Returns the distinct `(team, season start year)` pairs linking two
+        players through edges matching the filter, newest season first.
+        """
+        links = set()
+        for neighbor, team_code, season_year, type_code in self.iter_edges(idx_a):
+            if neighbor == idx_b and edge_filter.matches(team_code, season_year, type_code):
+                links.add((self.team_codes[team_code], season_year))
+        return sorted(links, key=lambda link: (-link[1], link[0]))
+
+
+def build_teammate_graph(player_ids: Iterable[int], edge_rows: Iterable[Sequence[Any]]) -> TeammateGraph:
+    """
+    Builds a TeammateGraph from player IDs and `(player1_id, player2_id, team,
+    season, rel_type)` rows. Each row is treated as undirected and stored in
+    both directions. Rows referencing unknown players are skipped.
+    """
+    ids = array("q", sorted({int(player_id) for player_id in player_ids}))
+    index_by_id = {player_id: idx for idx, player_id in enumerate(ids)}
+
+    team_index: Dict[str, int] = {}
+    type_index: Dict[str, int] = {}
+    sources = array("i")
+    targets = array("i")
+    teams = array("H")
+    seasons = array("H")
+    types = array("B")
+
+    for player1_id, player2_id, team, season, rel_type in edge_rows:
+        idx1 = index_by_id.get(int(player1_id))
+        idx2 = index_by_id.get(int(player2_id))
+        if idx1 is None or idx2 is None or idx1 == idx2:
+            continue
+        team_code = team_index.setdefault(str(team).upper(), len(team_index))
+        type_code = type_index.setdefault(str(rel_type), len(type_index))
+        season_year = int(season) // 10000
+
+        sources.append(idx1)
+        targets.append(idx2)
+        sources.append(idx2)
+        targets.append(idx1)
+        teams.extend((team_code, team_code))
+        seasons.extend((season_year, season_year))
+        types.extend((type_code, type_code))
+
+    # Counting sort on the source index produces the CSR layout in two passes.
+    offsets = array("q", [0]) * (len(ids) + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for idx in range(len(ids)):
+        offsets[idx + 1] += offsets[idx]
+
+    edge_total = len(sources)
+    neighbors = array("i", [0]) * edge_total
+    edge_team = array("H", [0]) * edge_total
+    edge_season = array("H", [0]) * edge_total
+    edge_type = array("B", [0]) * edge_total
+    # Placing edges in season order keeps every player's slice sorted by season
+    # (the counting sort is stable), which neighbor_indexes relies on.
+    cursor = array("q", offsets[:-1])
+    for pos in sorted(range(edge_total), key=seasons.__getitem__):
+        source = sources[pos]
+        slot = cursor[source]
+        cursor[source] = slot + 1
+        neighbors[slot] = targets[pos]
+        edge_team[slot] = teams[pos]
+        edge_season[slot] = seasons[pos]
+        edge_type[slot] = types[pos]
+
+    team_codes = sorted(team_index, key=team_index.__getitem__)
+    type_codes = sorted(type_index, key=type_index.__getitem__)
+    return TeammateGraph(ids, offsets, neighbors, edge_team, edge_season, edge_type, team_codes, type_codes)
+
+
+def _pair_rows_from_rosters(roster_records: Iterable[Any]) -> Iterable[tuple]:
+    """
+    Expands bipartite TeamSeason rosters into teammate rows: two players are
+    teammates in a game type when both list it for that team-season.
+    """
+    for record in roster_records:
+        team = record["team"]
+        season = record["season"]
+        members = [(int(player_id), set(types or ())) for player_id, types in record["members"]]
+        for i, (player1_id, types1) in enumerate(members):
+            for player2_id, types2 in members[i + 1:]:
+                for rel_type in types1 & types2:
+                    yield (player1_id, player2_id, team, season, rel_type)
+
+
+async def _fetch_teammate_graph_rows(graph_model: Optional[str] = None) -> tuple[List[int], Dict[int, str], List[tuple]]:
+    db = get_graph_db()
+    player_result = await db.run_query(
+        """
+        MATCH (p:Player)
+        WHERE p.id IS NOT NULL AND p.fullName IS NOT NULL
+        RETURN p.id AS playerid, p.fullName AS fullName
+        ORDER BY playerid
+        """
+    )
+    player_ids = [int(record["playerid"]) for record in player_result]
+    names = {int(record["playerid"]): str(record["fullName"]) for record in player_result}
+
+    if (graph_model or settings.GRAPH_MODEL) == "bipartite":
+        roster_result = await db.run_query(
+            """
+            MATCH (p:Player)-[r:PLAYED_IN]->(ts:TeamSeason)
+            WHERE p.fullName IS NOT NULL
+            RETURN ts.tricode AS team, ts.season AS season, collect([p.id, r.types]) AS members
+            """
+        )
+        return player_ids, names, list(_pair_rows_from_rosters(roster_result))
+
+    # Relationships are read in their stored direction so every edge is seen once,
+    # and de-duplicated per (pair, team, season, type) on the database side.
+    edge_query = """
+        UNWIND $player_ids AS pid
+        MATCH (p1:Player {id: pid})-[r]->(p2:Player)
+        WHERE r.team IS NOT NULL AND r.season IS NOT NULL AND p2.fullName IS NOT NULL
+        RETURN DISTINCT p1.id AS p1_id, p2.id AS p2_id, r.team AS team, r.season AS season, type(r) AS rel_type
+    """
+    edge_rows: List[tuple] = []
+    for start in range(0, len(player_ids), _LOAD_BATCH_SIZE):
+        batch = player_ids[start:start + _LOAD_BATCH_SIZE]
+        result = await db.run_query(edge_query, {"player_ids": batch})
+        edge_rows.extend(
+            (record["p1_id"], record["p2_id"], record["team"], record["season"], record["rel_type"])
+            for record in result
+        )
+    return player_ids, names, edge_rows
+
+
+def _build_graph_landmarks(graph: TeammateGraph, count: int) -> Optional[LandmarkIndex]:
+    offsets, neighbors = graph.unfiltered_adjacency()
+    return build_landmark_index(offsets, neighbors, count)
+
+
+async def build_teammate_graph_from_db(graph_model: Optional[str] = None) -> TeammateGraph:
+    """Reads players and teammate edges from Neo4j and builds a TeammateGraph with names attached."""
+    # Read the version first: games committed while the edges are read are
+    # replayed from the delta log later, and replaying an edge is harmless.
+    version = await get_graph_version(get_graph_db())
+    player_ids, names, edge_rows = await _fetch_teammate_graph_rows(graph_model)
+    loop = asyncio.get_running_loop()
+    graph = await loop.run_in_executor(None, build_teammate_graph, player_ids, edge_rows)
+    graph.names = NameTable.from_names(names[int(player_id)] for player_id in graph.player_ids)
+    graph.version = version
+    return graph
+
+
+def save_teammate_graph_snapshot(graph: TeammateGraph, directory: str, graph_model: Optional[str] = None) -> None:
+    """Writes the graph (adjacency, names and landmark distances when present) as an mmap-able snapshot."""
+    if graph.has_deltas:
+        raise ValueError("Cannot snapshot a graph with applied deltas; rebuild it from the database first.")
+    arrays: Dict[str, Tuple[Any, str]] = {
+        "player_ids": (graph.player_ids, "q"),
+        "offsets": (graph.offsets, "q"),
+        "neighbors": (graph.neighbors, "i"),
+        "edge_team": (graph.edge_team, "H"),
+        "edge_season": (graph.edge_season, "H"),
+        "edge_type": (graph.edge_type, "B"),
+    }
+    if graph.names is not None:
+        arrays["name_offsets"] = (graph.names.offsets, "q")
+        arrays["name_data"] = (graph.names.data, "B")
+    if graph.landmarks is not None:
+        arrays["landmark_indexes"] = (array("i", graph.landmarks.landmark_indexes), "i")
+        arrays["landmark_distances"] = (graph.landmarks.distances, "B")
+
+    write_snapshot(
+        directory,
+        arrays,
+        {
+            "graph_model": graph_model or settings.GRAPH_MODEL,
+            "graph_version": graph.version,
+            "player_count": graph.player_count,
+            "edge_count": graph.edge_count,
+            "team_codes": graph.team_codes,
+            "type_codes": graph.type_codes,
+        },
+    )
+    logger.info(
+        "Wrote teammate graph snapshot path=%s players=%s edges=%s",
+        directory,
+        graph.player_count,
+        graph.edge_count,
+    )
+
+
+def load_teammate_graph_snapshot(directory: str) -> TeammateGraph:
+    """Maps a snapshot written by `save_teammate_graph_snapshot`. Raises SnapshotError if it is unusable."""
+    arrays, manifest = read_snapshot(directory)
+    missing = {"player_ids", "offsets", "neighbors", "edge_team", "edge_season", "edge_type"} - set(arrays)
+    if missing:
+        raise SnapshotError(f"Snapshot at {directory} is missing arrays: {', '.join(sorted(missing))}")
+
+    graph = TeammateGraph(
+        arrays["player_ids"],
+        arrays["offsets"],
+        arrays["neighbors"],
+        arrays["edge_team"],
+        arrays["edge_season"],
+        arrays["edge_type"],
+        list(manifest["team_codes"]),
+        list(manifest["type_codes"]),
+    )
+    graph.version = int(manifest.get("graph_version") or 0)
+    if "name_offsets" in arrays and "name_data" in arrays:
+        graph.names = NameTable(arrays["name_offsets"], arrays["name_data"])
+    if "landmark_indexes" in arrays and "landmark_distances" in arrays:
+        graph.landmarks = LandmarkIndex(arrays["landmark_indexes"], arrays["landmark_distances"], graph.player_count)
+    logger.info(
+        "Mapped teammate graph snapshot path=%s version=%s created_at=%s players=%s edges=%s",
+        directory,
+        graph.version,
+        manifest.get("created_at"),
+        graph.player_count,
+        graph.edge_count,
+    )
+    return graph
+
+
+_teammate_graph: Optional[TeammateGraph] = None
+
+
+def get_teammate_graph() -> Optional[TeammateGraph]:
+    """Returns the loaded in-memory teammate graph, or None if it has not been loaded."""
+    return _teammate_graph
+
+
+def _apply_logged_deltas(graph: TeammateGraph, target_version: Optional[int] = None) -> bool:
+    """
+    Applies delta-log entries newer than the graph, up to `target_version` when
+    given. Entries before the first gap in the versions are applied even when
+    the target is not reached. Returns False when the graph did not end up at
+    the target (missing log, a gap, or a graph newer than the target).
+    """
+    if not settings.GRAPH_DELTA_LOG_PATH:
+        return target_version is None or target_version == graph.version
+    deltas = contiguous_deltas(read_graph_deltas(settings.GRAPH_DELTA_LOG_PATH, graph.version), graph.version)
+    if target_version is not None:
+        deltas = [delta for delta in deltas if int(delta["version"]) <= target_version]
+    if deltas:
+        started = time.perf_counter()
+        applied = graph.apply_deltas(deltas)
+        logger.info(
+            "Applied teammate graph deltas count=%s version=%s elapsed=%.3fs",
+            applied,
+            graph.version,
+            time.perf_counter() - started,
+        )
+    return target_version is None or graph.version == target_version
+
+
+async def _rebuild_landmarks(graph: TeammateGraph) -> None:
+    if settings.LANDMARK_COUNT <= 0:
+        return
+    version = graph.version
+    loop = asyncio.get_running_loop()
+    landmarks = await loop.run_in_executor(None, _build_graph_landmarks, graph, settings.LANDMARK_COUNT)
+    # Deltas applied while building would make these distances stale.
+    if graph.version == version:
+        graph.landmarks = landmarks
+
+
+async def load_teammate_graph(target_version: Optional[int] = None) -> TeammateGraph:
+    """
+    Installs the process-wide teammate graph. Maps the on-disk snapshot when
+    one exists (shared between workers through the page cache), otherwise
+    reads the adjacency from Neo4j. With a `target_version`, a snapshot that
+    the delta log cannot bring to exactly that version is not used either.
+    """
+    global _teammate_graph
+    started = time.perf_counter()
+
+    graph: Optional[TeammateGraph] = None
+    if settings.GRAPH_SNAPSHOT_PATH:
+        try:
+            graph = load_teammate_graph_snapshot(settings.GRAPH_SNAPSHOT_PATH)
+        except SnapshotError as exc:
+            logger.warning("Not using teammate graph snapshot: %s", exc)
+    if graph is not None and not _apply_logged_deltas(graph, target_version):
+        logger.info(
+            "Teammate graph snapshot and delta log reach version %s, not %s; reading Neo4j",
+            graph.version,
+            target_version,
+        )
+        graph = None
+    if graph is None:
+        graph = await build_teammate_graph_from_db()
+        _apply_logged_deltas(graph)
+
+    if graph.landmarks is None:
+        await _rebuild_landmarks(graph)
+    _teammate_graph = graph
+    logger.info(
+        "Loaded teammate graph version=%s players=%s edges=%s elapsed=%.3fs",
+        graph.version,
+        graph.player_count,
+        graph.edge_count,
+        time.perf_counter() - started,
+    )
+    return graph
+
+
+# Graph version a refresh last stopped at because of a gap in the delta log.
+_delta_gap_version: Optional[int] = None
+
+
+async def refresh_teammate_graph() -> bool:
+    """
+    Brings the loaded graph up to the database's graph version. Applies the
+    delta log in place; the pipeline writes games concurrently, so a version
+    missing from the log is usually a game still being appended, and the
+    entries before it are applied and the rest retried on the next poll. A gap
+    that is still there on the next poll, or a lower database version, reloads
+    the graph. Returns True when the graph changed.
+    """
+    global _delta_gap_version
+    graph = _teammate_graph
+    if graph is None:
+        return False
+    target_version = await get_graph_version(get_graph_db())
+    if target_version == graph.version:
+        _delta_gap_version = None
+        return False
+
+    # A lower version means the database was cleared and repopulated.
+    if target_version > graph.version:
+        version = graph.version
+        if _apply_logged_deltas(graph, target_version):
+            _delta_gap_version = None
+            await _rebuild_landmarks(graph)
+            return True
+        if graph.version != _delta_gap_version:
+            _delta_gap_version = graph.version
+            logger.info(
+                "Teammate graph delta log has no version %s yet (database at %s); retrying on the next poll",
+                graph.version + 1,
+                target_version,
+            )
+            if graph.version == version:
+                return False
+            await _rebuild_landmarks(graph)
+            return True
+
+    logger.info(
+        "Teammate graph delta log does not cover versions %s..%s; reloading",
+        graph.version,
+        target_version,
+    )
+    _delta_gap_version = None
+    await load_teammate_graph(target_version)
+    return True
+
+
+async def watch_graph_version(interval_seconds: float) -> None:
+    """Background task: polls the graph version and refreshes the in-memory graph when it moves."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await refresh_teammate_graph()
+        except Exception:
+            logger.exception("Failed refreshing in-memory teammate graph")
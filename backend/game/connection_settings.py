@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import asyncio
-import copy
+import json
+import logging
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+from functools import cached_property
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 from backend.db import getters
+from backend.db.cache import current_graph_version
 
+logger = logging.getLogger("uvicorn.error")
+
+# Options are served from memory indefinitely; once they are this old, or the
+# graph version moved, the next request triggers a background rebuild and
+# keeps getting the previous options until it lands.
 _OPTIONS_CACHE_TTL_SECONDS = 60 * 10
-_OPTIONS_CACHE: Dict[tuple[str, ...], tuple[float, Dict[str, Any]]] = {}
+_OPTIONS_REFRESH_AHEAD_SECONDS = 60
+_OPTIONS_CACHE: Dict[Tuple[str, ...], Tuple[float, Optional[int], ConnectionOptions]] = {}
 _OPTIONS_CACHE_LOCK = asyncio.Lock()
+_OPTIONS_REFRESHES: Dict[Tuple[str, ...], asyncio.Task] = {}
 
 _RELATIONSHIP_TYPE_LABELS = {
     "TEAMMATE_IN_PRE_SEASON": "Preseason",
@@ -32,6 +42,59 @@ _RELATIONSHIP_TYPE_LABELS = {
 DEFAULT_RELATIONSHIP_TYPES = ["TEAMMATE_IN_REGULAR_SEASON"]
 
 
+@dataclass(frozen=True)
+class GameTypeOption:
+    id: str
+    label: str
+
+
+@dataclass(frozen=True)
+class ConnectionOptions:
+    """
+    The selectable connection settings and their defaults. Immutable, so one
+    instance is shared by every caller; `response_json` is the `/settings`
+    response body, serialized once.
+    """
+    game_types: Tuple[GameTypeOption, ...]
+    teams: Tuple[str, ...]
+    min_year: int
+    max_year: int
+    default_game_types: Tuple[str, ...]
+    default_teams: Tuple[str, ...]
+    default_start_year: int
+    default_end_year: int
+
+    @cached_property
+    def game_type_ids(self) -> Tuple[str, ...]:
+        return tuple(option.id for option in self.game_types)
+
+    @cached_property
+    def game_type_id_set(self) -> FrozenSet[str]:
+        return frozenset(self.game_type_ids)
+
+    @cached_property
+    def team_set(self) -> FrozenSet[str]:
+        return frozenset(self.teams)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "game_types": [{"id": option.id, "label": option.label} for option in self.game_types],
+            "teams": list(self.teams),
+            "min_year": self.min_year,
+            "max_year": self.max_year,
+            "defaults": {
+                "game_types": list(self.default_game_types),
+                "teams": list(self.default_teams),
+                "start_year": self.default_start_year,
+                "end_year": self.default_end_year,
+            },
+        }
+
+    @cached_property
+    def response_json(self) -> bytes:
+        return json.dumps({"options": self.to_dict()}, separators=(",", ":")).encode()
+
+
 @dataclass
 class ResolvedConnectionSettings:
     game_types: List[str]
@@ -75,30 +138,57 @@ def _coerce_year(raw_year: Any, fallback: int) -> int:
         return int(fallback)
 
 
+def _options_cache_key(default_relationship_types: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    cache_key = tuple(_normalize_items(default_relationship_types or DEFAULT_RELATIONSHIP_TYPES))
+    return cache_key or tuple(DEFAULT_RELATIONSHIP_TYPES)
+
+
+async def _load_options(cache_key: Tuple[str, ...]) -> ConnectionOptions:
+    version = current_graph_version()
+    options = await _build_connection_settings_options(default_relationship_types=list(cache_key))
+    options.response_json  # serialize outside the request path
+    _OPTIONS_CACHE[cache_key] = (time.monotonic() + _OPTIONS_CACHE_TTL_SECONDS, version, options)
+    return options
+
+
+async def _refresh_options(cache_key: Tuple[str, ...]) -> None:
+    try:
+        await _load_options(cache_key)
+    except Exception:
+        logger.exception("Failed refreshing connection settings options; serving the previous ones")
+    finally:
+        _OPTIONS_REFRESHES.pop(cache_key, None)
+
+
+def _schedule_refresh(cache_key: Tuple[str, ...]) -> None:
+    if cache_key not in _OPTIONS_REFRESHES:
+        _OPTIONS_REFRESHES[cache_key] = asyncio.get_running_loop().create_task(_refresh_options(cache_key))
+
+
 async def get_connection_settings_options(
     default_relationship_types: Optional[Sequence[str]] = None,
-) -> Dict[str, Any]:
-    cache_key = tuple(_normalize_items(default_relationship_types or DEFAULT_RELATIONSHIP_TYPES))
-    if not cache_key:
-        cache_key = tuple(DEFAULT_RELATIONSHIP_TYPES)
-    now = time.monotonic()
+) -> ConnectionOptions:
+    """
+    Returns the shared options object. Only the very first call waits for a
+    build; afterwards options are served stale-while-revalidate.
+    """
+    cache_key = _options_cache_key(default_relationship_types)
     cached = _OPTIONS_CACHE.get(cache_key)
-    if cached and cached[0] > now:
-        return copy.deepcopy(cached[1])
-
-    async with _OPTIONS_CACHE_LOCK:
-        refreshed_cached = _OPTIONS_CACHE.get(cache_key)
-        if refreshed_cached and refreshed_cached[0] > time.monotonic():
-            return copy.deepcopy(refreshed_cached[1])
+    if cached is None:
+        async with _OPTIONS_CACHE_LOCK:
+            cached = _OPTIONS_CACHE.get(cache_key)
+            if cached is None:
+                return await _load_options(cache_key)
 
-        options = await _build_connection_settings_options(default_relationship_types=list(cache_key))
-        _OPTIONS_CACHE[cache_key] = (time.monotonic() + _OPTIONS_CACHE_TTL_SECONDS, options)
-        return copy.deepcopy(options)
+    expires_at, version, options = cached
+    if time.monotonic() >= expires_at - _OPTIONS_REFRESH_AHEAD_SECONDS or version != current_graph_version():
+        _schedule_refresh(cache_key)
+    return options
 
 
 async def _build_connection_settings_options(
     default_relationship_types: Optional[Sequence[str]] = None,
-) -> Dict[str, Any]:
+) -> ConnectionOptions:
     relationship_types = await getters.get_existing_relationship_types()
     relationship_types = sorted(
         {
@@ -132,24 +222,19 @@ async def _build_connection_settings_options(
     if not default_game_types:
         default_game_types = list(relationship_types)
 
-    return {
-        "game_types": [
-            {
-                "id": rel_type,
-                "label": _to_relationship_label(rel_type),
-            }
+    return ConnectionOptions(
+        game_types=tuple(
+            GameTypeOption(id=rel_type, label=_to_relationship_label(rel_type))
             for rel_type in relationship_types
-        ],
-        "teams": teams,
-        "min_year": min_year,
-        "max_year": max_year,
-        "defaults": {
-            "game_types": default_game_types,
-            "teams": list(teams),
-            "start_year": min_year,
-            "end_year": max_year,
-        },
-    }
+        ),
+        teams=tuple(teams),
+        min_year=min_year,
+        max_year=max_year,
+        default_game_types=tuple(default_game_types),
+        default_teams=tuple(teams),
+        default_start_year=min_year,
+        default_end_year=max_year,
+    )
 
 
 def serialize_resolved_connection_settings(settings: ResolvedConnectionSettings) -> Dict[str, Any]:
@@ -161,48 +246,59 @@ def serialize_resolved_connection_settings(settings: ResolvedConnectionSettings)
     }
 
 
+def connection_settings_fingerprint(settings: ResolvedConnectionSettings) -> tuple:
+    """Hashable key identifying a resolved setting combination (lists are already in canonical order)."""
+    return (
+        tuple(settings.game_types),
+        tuple(settings.teams),
+        int(settings.start_year),
+        int(settings.end_year),
+    )
+
+
 async def resolve_connection_settings(
     requested_settings: Optional[Dict[str, Any]],
     default_relationship_types: Optional[Sequence[str]] = None,
 ) -> ResolvedConnectionSettings:
     options = await get_connection_settings_options(default_relationship_types=default_relationship_types)
-    allowed_game_types = [entry["id"] for entry in options["game_types"]]
-    allowed_game_type_set = set(allowed_game_types)
-    allowed_teams = list(options["teams"])
-    allowed_team_set = set(allowed_teams)
-    defaults = options["defaults"]
+    allowed_game_types = options.game_type_ids
+    allowed_game_type_set = options.game_type_id_set
+    allowed_teams = options.teams
+    allowed_team_set = options.team_set
 
     requested_game_types = _normalize_items(
         (requested_settings or {}).get("game_types"),
     )
     if not requested_game_types:
-        requested_game_types = list(defaults["game_types"])
+        requested_game_types = list(options.default_game_types)
     if not requested_game_types:
         raise ValueError("At least one game type must be selected.")
     invalid_game_types = [rel_type for rel_type in requested_game_types if rel_type not in allowed_game_type_set]
     if invalid_game_types:
         raise ValueError(f"Unknown game type(s): {', '.join(invalid_game_types)}")
 
-    ordered_game_types = [rel_type for rel_type in allowed_game_types if rel_type in set(requested_game_types)]
+    requested_game_type_set = set(requested_game_types)
+    ordered_game_types = [rel_type for rel_type in allowed_game_types if rel_type in requested_game_type_set]
 
     requested_teams = _normalize_items(
         (requested_settings or {}).get("teams"),
         uppercase=True,
     )
     if not requested_teams:
-        requested_teams = list(defaults["teams"])
+        requested_teams = list(options.default_teams)
     if not requested_teams:
         raise ValueError("At least one team must be selected.")
     invalid_teams = [team for team in requested_teams if team not in allowed_team_set]
     if invalid_teams:
         raise ValueError(f"Unknown team code(s): {', '.join(invalid_teams)}")
 
-    ordered_teams = [team for team in allowed_teams if team in set(requested_teams)]
+    requested_team_set = set(requested_teams)
+    ordered_teams = [team for team in allowed_teams if team in requested_team_set]
 
-    min_year = int(options["min_year"])
-    max_year = int(options["max_year"])
-    requested_start_year = _coerce_year((requested_settings or {}).get("start_year"), int(defaults["start_year"]))
-    requested_end_year = _coerce_year((requested_settings or {}).get("end_year"), int(defaults["end_year"]))
+    min_year = options.min_year
+    max_year = options.max_year
+    requested_start_year = _coerce_year((requested_settings or {}).get("start_year"), options.default_start_year)
+    requested_end_year = _coerce_year((requested_settings or {}).get("end_year"), options.default_end_year)
 
     start_year = max(min(requested_start_year, max_year), min_year)
     end_year = max(min(requested_end_year, max_year), min_year)
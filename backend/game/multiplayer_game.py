@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional, Set
 from backend.db import getters
 from backend.game.connection_settings import (
     DEFAULT_RELATIONSHIP_TYPES,
+    ConnectionOptions,
     ResolvedConnectionSettings,
     get_connection_settings_options,
     resolve_connection_settings,
@@ -85,7 +86,7 @@ class MultiplayerGameService:
         alphabet = string.ascii_uppercase + string.digits
         return "".join(secrets.choice(alphabet) for _ in range(LOBBY_CODE_LENGTH))
 
-    async def get_settings_options(self) -> Dict[str, Any]:
+    async def get_settings_options(self) -> ConnectionOptions:
         return await get_connection_settings_options(default_relationship_types=DEFAULT_RELATIONSHIP_TYPES)
 
     async def _get_lobby_default_settings(self) -> ResolvedConnectionSettings:
@@ -108,37 +109,12 @@ class MultiplayerGameService:
             logger.exception("Failed loading multiplayer settings options during lobby creation; using fallback defaults")
             return fallback
 
-        game_type_ids = [
-            entry["id"]
-            for entry in options.get("game_types", [])
-            if isinstance(entry, dict) and isinstance(entry.get("id"), str) and entry["id"]
-        ]
-        if not game_type_ids:
+        if not options.game_types:
             return fallback
 
-        allowed_teams = [team for team in options.get("teams", []) if isinstance(team, str) and team.strip()]
-        defaults = options.get("defaults", {})
-
-        game_type_set = set(game_type_ids)
-        selected_game_types = [
-            game_type
-            for game_type in defaults.get("game_types", [])
-            if isinstance(game_type, str) and game_type in game_type_set
-        ]
-        if not selected_game_types:
-            selected_game_types = list(game_type_ids)
-
-        team_set = set(allowed_teams)
-        selected_teams = [
-            team
-            for team in defaults.get("teams", [])
-            if isinstance(team, str) and team in team_set
-        ]
-        if not selected_teams:
-            selected_teams = list(allowed_teams)
-
-        min_year = int(options.get("min_year", fallback.start_year))
-        max_year = int(options.get("max_year", fallback.end_year))
+        selected_game_types = list(options.default_game_types) or list(options.game_type_ids)
+        selected_teams = list(options.default_teams) or list(options.teams)
+        min_year, max_year = options.min_year, options.max_year
         if min_year > max_year:
             min_year, max_year = max_year, min_year
 
@@ -151,11 +127,13 @@ class MultiplayerGameService:
 
     async def _pick_random_start_player(self, lobby: MultiplayerLobby) -> Dict[str, Any]:
         settings = lobby.connection_settings
-        start_player_record = await getters.get_random_player_with_filters(
+        # The first guess must be a teammate of the start player, so isolated players are skipped.
+        start_player_record = await getters.get_random_player_in_component(
             teams=settings.teams,
             start_year=settings.start_year,
             end_year=settings.end_year,
             game_types=settings.game_types,
+            min_component_size=2,
         )
         random_player = start_player_record.get("random_player") if start_player_record else None
         if random_player is None:
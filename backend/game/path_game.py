@@ -1,13 +1,21 @@
+import asyncio
 import logging
 import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+from backend.core.config import settings
 from backend.db import getters
+from backend.db.graph_deltas import get_graph_version
+from backend.db.session import get_graph_db
+from backend.db.teammate_graph import get_teammate_graph
 from backend.game.connection_settings import (
     DEFAULT_RELATIONSHIP_TYPES,
+    ConnectionOptions,
     ResolvedConnectionSettings,
+    connection_settings_fingerprint,
     get_connection_settings_options,
     resolve_connection_settings,
     serialize_resolved_connection_settings,
@@ -15,6 +23,19 @@ from backend.game.connection_settings import (
 
 logger = logging.getLogger("uvicorn.error")
 
+# Upper bound on how many alternative optimal paths the solution endpoint lists.
+# The total number of optimal paths is always reported in full.
+MAX_OPTIMAL_PATHS = 10
+
+
+@dataclass
+class PathGamePuzzle:
+    start_player: Dict[str, Any]
+    end_player: Dict[str, Any]
+    graph_version: int
+    # Precomputed get_optimal_solution payload; None when generated on demand.
+    solution: Optional[Dict[str, Any]] = None
+
 
 @dataclass
 class PathGameSession:
@@ -24,6 +45,19 @@ class PathGameSession:
     current_path: List[Dict[str, Any]]
     connection_settings: ResolvedConnectionSettings
     completed: bool = False
+    solution: Optional[Dict[str, Any]] = None
+
+
+def _known_graph_version(fallback: int) -> int:
+    graph = get_teammate_graph()
+    return graph.version if graph is not None else fallback
+
+
+async def _current_graph_version() -> int:
+    graph = get_teammate_graph()
+    if graph is not None:
+        return graph.version
+    return await get_graph_version(get_graph_db())
 
 
 class PathGameService:
@@ -31,32 +65,92 @@ class PathGameService:
 
     def __init__(self):
         self._sessions: Dict[str, PathGameSession] = {}
-
-    async def get_settings_options(self) -> Dict[str, Any]:
+        # Ready puzzles per (settings fingerprint, target_hops), and the setting
+        # combinations to keep filled, most recently requested last.
+        self._puzzle_pool: Dict[Tuple, Deque[PathGamePuzzle]] = {}
+        self._pool_requests: "OrderedDict[Tuple, Tuple[ResolvedConnectionSettings, Optional[int]]]" = OrderedDict()
+        self._pool_default_key: Optional[Tuple] = None
+        self._pool_version = 0
+        self._pool_wakeup = asyncio.Event()
+
+    async def get_settings_options(self) -> ConnectionOptions:
         return await get_connection_settings_options(default_relationship_types=DEFAULT_RELATIONSHIP_TYPES)
 
     async def start_game(
         self,
         requested_settings: Optional[Dict[str, Any]] = None,
         max_attempts: int = 25,
+        target_hops: Optional[int] = None,
     ) -> PathGameSession:
+        """
+        Creates a new path game. When `target_hops` is given, the end player is
+        exactly that many teammate hops from the start player under the
+        selected settings; otherwise the distance is drawn at random. Served
+        from the puzzle pool when it holds one for these settings.
+        """
         start_time = time.perf_counter()
-        logger.info("Starting new path game generation (max_attempts=%s)", max_attempts)
-
         connection_settings = await resolve_connection_settings(
             requested_settings=requested_settings,
             default_relationship_types=DEFAULT_RELATIONSHIP_TYPES,
         )
+        pool_key = self._remember_pool_request(connection_settings, target_hops)
+
+        puzzle = self._pop_puzzle(pool_key)
+        source = "pool"
+        if puzzle is None:
+            source = "generated"
+            logger.info(
+                "Starting new path game generation (max_attempts=%s target_hops=%s)",
+                max_attempts,
+                target_hops,
+            )
+            puzzle = await self._generate_puzzle(connection_settings, target_hops, max_attempts)
+        if puzzle is None:
+            logger.error(
+                "Unable to generate valid path game after %s attempts (elapsed=%.3fs)",
+                max_attempts,
+                time.perf_counter() - start_time,
+            )
+            raise ValueError("Unable to generate a valid game session with the selected settings.")
+
+        session_id = str(uuid4())
+        session = PathGameSession(
+            session_id=session_id,
+            start_player=puzzle.start_player,
+            end_player=puzzle.end_player,
+            current_path=[puzzle.start_player],
+            connection_settings=connection_settings,
+            solution=puzzle.solution,
+        )
+        self._sessions[session_id] = session
+        logger.info(
+            "Path game created successfully session_id=%s source=%s elapsed=%.3fs settings=%s",
+            session_id,
+            source,
+            time.perf_counter() - start_time,
+            serialize_resolved_connection_settings(connection_settings),
+        )
+        return session
 
+    async def _generate_puzzle(
+        self,
+        connection_settings: ResolvedConnectionSettings,
+        target_hops: Optional[int],
+        max_attempts: int,
+    ) -> Optional[PathGamePuzzle]:
+        graph_version = _known_graph_version(self._pool_version)
         for attempt in range(1, max_attempts + 1):
             attempt_start = time.perf_counter()
             logger.info("Path game attempt %s/%s: selecting filtered start player", attempt, max_attempts)
 
-            start_player_record = await getters.get_random_player_with_filters(
+            # Only players whose component can hold a puzzle of the requested
+            # length are sampled, so retries are only needed without the in-memory graph.
+            start_player_record = await getters.get_random_player_in_component(
                 teams=connection_settings.teams,
                 start_year=connection_settings.start_year,
                 end_year=connection_settings.end_year,
                 game_types=connection_settings.game_types,
+                min_component_size=(target_hops or 2) + 1,
             )
 
             random_player = start_player_record.get("random_player") if start_player_record else None
@@ -78,6 +172,7 @@ class PathGameService:
                 start_year=connection_settings.start_year,
                 end_year=connection_settings.end_year,
                 game_types=connection_settings.game_types,
+                exact_hops=target_hops,
             )
             logger.info(
                 "Path game attempt %s: end-player lookup elapsed=%.3fs",
@@ -98,30 +193,115 @@ class PathGameService:
                 )
                 continue
 
-            session_id = str(uuid4())
-            session = PathGameSession(
-                session_id=session_id,
-                start_player=start_player,
-                end_player=end_player,
-                current_path=[start_player],
-                connection_settings=connection_settings,
-            )
-            self._sessions[session_id] = session
-            logger.info(
-                "Path game created successfully session_id=%s attempts=%s elapsed=%.3fs settings=%s",
-                session_id,
-                attempt,
-                time.perf_counter() - start_time,
-                serialize_resolved_connection_settings(connection_settings),
-            )
-            return session
+            return PathGamePuzzle(start_player=start_player, end_player=end_player, graph_version=graph_version)
+        return None
 
-        logger.error(
-            "Unable to generate valid path game after %s attempts (elapsed=%.3fs)",
-            max_attempts,
-            time.perf_counter() - start_time,
+    def _remember_pool_request(
+        self,
+        connection_settings: ResolvedConnectionSettings,
+        target_hops: Optional[int],
+    ) -> Tuple:
+        """Marks a setting combination as recently requested so the pool keeps puzzles for it."""
+        key = (connection_settings_fingerprint(connection_settings), target_hops)
+        self._pool_requests[key] = (connection_settings, target_hops)
+        self._pool_requests.move_to_end(key)
+        # The default combination is kept on top of the recent ones.
+        for stale_key in list(self._pool_requests):
+            if len(self._pool_requests) <= settings.PATH_GAME_POOL_SETTINGS + 1:
+                break
+            if stale_key in (key, self._pool_default_key):
+                continue
+            del self._pool_requests[stale_key]
+            self._puzzle_pool.pop(stale_key, None)
+        if key not in self._puzzle_pool or len(self._puzzle_pool[key]) < settings.PATH_GAME_POOL_SIZE:
+            self._pool_wakeup.set()
+        return key
+
+    def _pop_puzzle(self, key: Tuple) -> Optional[PathGamePuzzle]:
+        pool = self._puzzle_pool.get(key)
+        version = _known_graph_version(self._pool_version)
+        while pool:
+            puzzle = pool.popleft()
+            # Puzzles built before a graph change may no longer be solvable as stored.
+            if puzzle.graph_version == version:
+                return puzzle
+        return None
+
+    async def _refill_puzzle_pool(self, pool_size: int, max_attempts: int, budget_seconds: float) -> bool:
+        """
+        Adds puzzles until every kept combination is full or `budget_seconds`
+        have passed. Returns False when the budget ran out first.
+        """
+        deadline = time.monotonic() + budget_seconds
+        version = await _current_graph_version()
+        if version != self._pool_version:
+            if self._puzzle_pool:
+                logger.info("Graph version %s -> %s; evicting pooled path game puzzles", self._pool_version, version)
+            self._puzzle_pool.clear()
+            self._pool_version = version
+
+        default_settings = await resolve_connection_settings(
+            requested_settings=None,
+            default_relationship_types=DEFAULT_RELATIONSHIP_TYPES,
         )
-        raise ValueError("Unable to generate a valid game session with the selected settings.")
+        default_key = (connection_settings_fingerprint(default_settings), None)
+        if default_key not in self._pool_requests:
+            self._pool_requests[default_key] = (default_settings, None)
+            self._pool_requests.move_to_end(default_key, last=False)
+        self._pool_default_key = default_key
+
+        # Round-robin, one puzzle per setting combination per pass, so a hard
+        # combination does not starve the others.
+        pending = list(self._pool_requests.items())
+        while pending:
+            still_pending = []
+            for key, (connection_settings, target_hops) in pending:
+                if time.monotonic() >= deadline:
+                    return False
+                if key not in self._pool_requests:
+                    continue
+                pool = self._puzzle_pool.setdefault(key, deque())
+                if len(pool) >= pool_size:
+                    continue
+                puzzle = await self._generate_puzzle(connection_settings, target_hops, max_attempts)
+                if puzzle is None or puzzle.graph_version != self._pool_version:
+                    continue
+                puzzle.solution = await self._solve(puzzle.start_player, puzzle.end_player, connection_settings)
+                pool.append(puzzle)
+                if len(pool) < pool_size:
+                    still_pending.append((key, (connection_settings, target_hops)))
+            pending = still_pending
+        return True
+
+    async def run_puzzle_pool(
+        self,
+        pool_size: int,
+        idle_seconds: float = 5.0,
+        max_attempts: int = 5,
+        refill_budget_seconds: float = 1.0,
+    ) -> None:
+        """
+        Background task: keeps up to `pool_size` puzzles (with their optimal
+        solutions) ready for the default settings and recently requested ones,
+        and drops every pooled puzzle when the graph version changes. Each
+        refill pass stops after `refill_budget_seconds` and yields to the
+        event loop before the next one, so a long refill after a graph change
+        does not hold up requests between its searches.
+        """
+        while True:
+            try:
+                filled = await self._refill_puzzle_pool(pool_size, max_attempts, refill_budget_seconds)
+            except Exception:
+                logger.exception("Failed refilling path game puzzle pool")
+                filled = True
+            if not filled:
+                await asyncio.sleep(0)
+                continue
+            self._pool_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._pool_wakeup.wait(), timeout=idle_seconds)
+            except asyncio.TimeoutError:
+                pass
 
     def get_session(self, session_id: str) -> Optional[PathGameSession]:
         return self._sessions.get(session_id)
@@ -210,35 +390,39 @@ class PathGameService:
         session = self.get_session(session_id)
         if not session:
             return None
+        if session.solution is None:
+            session.solution = await self._solve(
+                session.start_player,
+                session.end_player,
+                session.connection_settings,
+            )
+        return session.solution
 
-        shortest_path = await getters.find_shortest_path_for_game(
-            player1_id=session.start_player["id"],
-            player2_id=session.end_player["id"],
-            teams=session.connection_settings.teams,
-            start_year=session.connection_settings.start_year,
-            end_year=session.connection_settings.end_year,
-            game_types=session.connection_settings.game_types,
+    async def _solve(
+        self,
+        start_player: Dict[str, Any],
+        end_player: Dict[str, Any],
+        connection_settings: ResolvedConnectionSettings,
+    ) -> Dict[str, Any]:
+        solutions = await getters.count_shortest_paths_for_game(
+            player1_id=start_player["id"],
+            player2_id=end_player["id"],
+            teams=connection_settings.teams,
+            start_year=connection_settings.start_year,
+            end_year=connection_settings.end_year,
+            game_types=connection_settings.game_types,
             max_hops=6,
+            max_paths=MAX_OPTIMAL_PATHS,
         )
 
-        optimal_step_teams: List[List[str]] = []
-        if len(shortest_path) >= 2:
-            for idx in range(len(shortest_path) - 1):
-                step_links = await getters.get_common_team_seasons(
-                    player1_id=shortest_path[idx]["id"],
-                    player2_id=shortest_path[idx + 1]["id"],
-                    teams=session.connection_settings.teams,
-                    start_year=session.connection_settings.start_year,
-                    end_year=session.connection_settings.end_year,
-                    game_types=session.connection_settings.game_types,
-                )
-                optimal_step_teams.append(step_links)
-
+        optimal_paths = solutions["paths"]
+        best = optimal_paths[0] if optimal_paths else {"path": [], "step_teams": []}
         return {
-            "shortest_path": shortest_path,
-            "shortest_path_length": max(len(shortest_path) - 1, 0),
-            "optimal_step_teams": optimal_step_teams,
+            "shortest_path": best["path"],
+            "shortest_path_length": max(len(best["path"]) - 1, 0),
+            "optimal_step_teams": best["step_teams"],
+            "optimal_path_count": solutions["count"],
+            "optimal_paths": optimal_paths,
         }
 
-
 path_game_service = PathGameService()
@@ -1,6 +1,10 @@
-from pydantic import BaseModel, Field
+from collections import Counter
+from pydantic import BaseModel, Field, model_validator
 from typing import Dict, List, Literal, Optional
 
+# Each distinct source of a path batch is one BFS tree, so cap them per request.
+MAX_PATH_BATCH_SOURCES = 50
+
 
 class PlayerBase(BaseModel):
     id: int
@@ -12,6 +16,52 @@ class Player(PlayerBase):
         orm_mode = True  # Allows Pydantic to read data from ORM models
 
 
+class PlayerConnectivity(BaseModel):
+    degree: int
+    degree_by_type: Dict[str, int] = {}
+    degree_by_decade: Dict[int, int] = {}
+    closeness: float = 0.0
+    betweenness: float = 0.0
+
+
+class PlayerPair(BaseModel):
+    player1_id: int
+    player2_id: int
+
+
+class PlayerPathBatchRequest(BaseModel):
+    pairs: List[PlayerPair] = Field(min_length=1, max_length=1000)
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    game_types: Optional[List[str]] = None
+    max_hops: Optional[int] = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def limit_sources(self) -> "PlayerPathBatchRequest":
+        # Pairs are searched from whichever endpoint appears in more pairs
+        # (see getters.iter_shortest_paths_by_source).
+        appearances = Counter()
+        for pair in self.pairs:
+            appearances[pair.player1_id] += 1
+            appearances[pair.player2_id] += 1
+        sources = {
+            pair.player2_id if appearances[pair.player2_id] > appearances[pair.player1_id] else pair.player1_id
+            for pair in self.pairs
+        }
+        if len(sources) > MAX_PATH_BATCH_SOURCES:
+            raise ValueError(
+                f"At most {MAX_PATH_BATCH_SOURCES} distinct source players are supported per batch; got {len(sources)}."
+            )
+        return self
+
+
+class PlayerPathResult(BaseModel):
+    player1_id: int
+    player2_id: int
+    distance: Optional[int] = None
+    path: List[Player] = []
+
+
 class ConnectionSettings(BaseModel):
     game_types: List[str] = Field(default_factory=list)
     teams: List[str] = Field(default_factory=list)
@@ -38,6 +88,8 @@ class ConnectionSettingsOptionsResponse(BaseModel):
 
 class PathGameStartRequest(BaseModel):
     settings: Optional[ConnectionSettings] = None
+    # Difficulty: exact teammate-hop distance between the start and end players.
+    target_hops: Optional[int] = Field(default=None, ge=1, le=6)
 
 
 class PathGameStartResponse(BaseModel):
@@ -62,10 +114,18 @@ class PathGameGuessResponse(BaseModel):
     last_step_teams: List[str] = []
 
 
+class PathGameOptimalPath(BaseModel):
+    path: List[Player]
+    step_teams: List[List[str]] = []
+
+
 class PathGameOptimalResponse(BaseModel):
     shortest_path: List[Player]
     shortest_path_length: int
     optimal_step_teams: List[List[str]] = []
+    # Number of distinct shortest paths; `optimal_paths` lists at most a few of them.
+    optimal_path_count: int = 0
+    optimal_paths: List[PathGameOptimalPath] = []
 
 
 class MultiplayerCreateLobbyResponse(BaseModel):
@@ -0,0 +1,152 @@
+import asyncio
+
+from backend.db import cache as cache_module
+from backend.db.cache import async_batch_cached, async_cached
+
+
+def _counting_getter(scope, ttl_seconds=300.0, maxsize=8, delay=0.0, fail=False):
+    calls = []
+
+    @async_cached(maxsize=maxsize, ttl_seconds=ttl_seconds, scope=lambda: scope[0])
+    async def getter(value):
+        calls.append(value)
+        if delay:
+            await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("boom")
+        return value * 2
+
+    return getter, calls
+
+
+def test_hits_and_scope_invalidation():
+    scope = [1]
+    getter, calls = _counting_getter(scope)
+
+    async def scenario():
+        assert await getter(3) == 6
+        assert await getter(3) == 6
+        scope[0] = 2
+        assert await getter(3) == 6
+
+    asyncio.run(scenario())
+    assert calls == [3, 3]
+    assert getter.cache.stats.hits == 1
+    assert getter.cache.stats.misses == 2
+
+
+def test_identical_calls_in_flight_share_one_query():
+    getter, calls = _counting_getter([1], delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(getter(4), getter(4), getter(4))
+
+    assert asyncio.run(scenario()) == [8, 8, 8]
+    assert calls == [4]
+    assert getter.cache.stats.coalesced == 2
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    getter, calls = _counting_getter([1], ttl_seconds=10.0)
+
+    async def scenario():
+        await getter(1)
+        now[0] += 5
+        await getter(1)
+        now[0] += 10
+        await getter(1)
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+    assert getter.cache.stats.expirations == 1
+
+
+def test_lru_eviction_and_clear():
+    getter, calls = _counting_getter([1], maxsize=2)
+
+    async def scenario():
+        await getter(1)
+        await getter(2)
+        await getter(1)
+        await getter(3)
+        await getter(1)
+        await getter(2)
+
+    asyncio.run(scenario())
+    # 2 was least recently used when 3 arrived, so only it was fetched again.
+    assert calls == [1, 2, 3, 2]
+    assert getter.cache.stats.evictions == 2
+
+    getter.cache_clear()
+    asyncio.run(getter(1))
+    assert calls[-1] == 1
+
+
+def test_failures_are_not_cached():
+    getter, calls = _counting_getter([1], fail=True)
+
+    async def scenario():
+        for _ in range(2):
+            try:
+                await getter(5)
+            except RuntimeError:
+                pass
+
+    asyncio.run(scenario())
+    assert calls == [5, 5]
+    assert getter.cache.info()["size"] == 0
+    assert getter.cache.info()["in_flight"] == 0
+
+
+def test_zero_ttl_disables_caching():
+    getter, calls = _counting_getter([1], ttl_seconds=0)
+
+    async def scenario():
+        await getter(1)
+        await getter(1)
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+
+
+def test_batch_getter_loads_only_items_not_cached_or_in_flight():
+    calls = []
+
+    @async_batch_cached(maxsize=8, ttl_seconds=300.0, scope=lambda: 1)
+    async def getter(items, offset):
+        calls.append(list(items))
+        await asyncio.sleep(0.01)
+        return {item: item + offset for item in items}
+
+    async def scenario():
+        first, second = await asyncio.gather(getter([1, 2], 10), getter([2, 3], 10))
+        assert first == {1: 11, 2: 12} and second == {2: 12, 3: 13}
+        assert await getter([3, 1, 4], 10) == {3: 13, 1: 11, 4: 14}
+        assert await getter([1], 20) == {1: 21}
+
+    asyncio.run(scenario())
+    assert calls == [[1, 2], [3], [4], [1]]
+    assert getter.cache.stats.coalesced == 1
+    assert getter.cache.stats.hits == 2
+    assert getter.cache.info()["in_flight"] == 0
+
+
+def test_cached_results_are_read_only():
+    @async_cached(maxsize=4, ttl_seconds=300.0, scope=lambda: 1)
+    async def getter():
+        return [{"id": 1, "teams": ["DET"]}]
+
+    async def scenario():
+        return await getter(), await getter()
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+    assert first == ({"id": 1, "teams": ("DET",)},)
+    try:
+        first[0]["id"] = 2
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("expected a read-only mapping")
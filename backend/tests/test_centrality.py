@@ -0,0 +1,30 @@
+from backend.db.centrality import compute_player_centrality
+from backend.db.teammate_graph import build_teammate_graph
+
+REGULAR = "TEAMMATE_IN_REGULAR_SEASON"
+PLAYOFFS = "TEAMMATE_IN_PLAYOFFS"
+
+
+def test_degrees_and_exact_centrality_when_every_player_is_a_pivot():
+    # A path 1 - 2 - 3, with 1 and 2 also playoff teammates in the 1990s.
+    graph = build_teammate_graph(
+        [1, 2, 3],
+        [
+            (1, 2, "DET", 19971998, REGULAR),
+            (1, 2, "DET", 19971998, PLAYOFFS),
+            (2, 3, "DET", 20012002, REGULAR),
+        ],
+    )
+    centrality = compute_player_centrality(graph, samples=3)
+
+    middle = centrality.stats_for(2)
+    assert middle["degree"] == 2
+    assert middle["degree_by_type"] == {PLAYOFFS: 1, REGULAR: 2}
+    assert middle["degree_by_decade"] == {1990: 1, 2000: 1}
+    assert middle["betweenness"] == 1.0
+
+    end = centrality.stats_for(1)
+    assert end["degree"] == 1
+    assert end["betweenness"] == 0.0
+    assert middle["closeness"] > end["closeness"] > 0
+    assert centrality.stats_for(99) is None
@@ -0,0 +1,31 @@
+from backend.db.name_index import NameIndex, PrefixIndex, fold_name
+
+PLAYERS = [
+    (1, "Nicklas Lidström"),
+    (2, "Nicklas Bäckström"),
+    (3, "Steve Yzerman"),
+    (4, "Sergei Fedorov"),
+    (5, "Nick Lidstrom Jr"),
+]
+
+
+def test_fold_name_strips_accents_and_case():
+    assert fold_name("Nicklas Lidström") == "nicklas lidstrom"
+    assert fold_name("Marián Hossa") == "marian hossa"
+
+
+def test_candidates_rank_substring_matches_first():
+    index = NameIndex(PLAYERS)
+    slots = index.candidates(fold_name("lidstrom"), limit=2)
+    assert {index.names[slot] for slot in slots} == {"Nicklas Lidström", "Nick Lidstrom Jr"}
+
+    # Misspellings fall back to the names sharing the most trigrams.
+    slots = index.candidates(fold_name("yzermann"), limit=1)
+    assert index.names[slots[0]] == "Steve Yzerman"
+
+
+def test_prefix_search_matches_any_word_start_by_score():
+    index = PrefixIndex(PLAYERS, score={2: 10.0, 1: 5.0})
+    assert [player_id for player_id, _ in index.search("nick", limit=3)] == [2, 1, 5]
+    assert index.search("fedo") == [(4, "Sergei Fedorov")]
+    assert index.search("") == []
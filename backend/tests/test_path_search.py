@@ -0,0 +1,113 @@
+from backend.db.path_search import (
+    BidirectionalSearch,
+    BreadthFirstTree,
+    ShortestPathCounter,
+    WaypointPathBuilder,
+    order_waypoints,
+    run_bidirectional_search,
+    run_breadth_first_tree,
+    run_path_counter,
+)
+
+# 1 - 2 - 3 - 4 - 5, with a detour 1 - 6 - 7 - 5 and a diamond 2 - 8 - 4.
+EDGES = [(1, 2), (2, 3), (3, 4), (4, 5), (1, 6), (6, 7), (7, 5), (2, 8), (8, 4)]
+
+
+def _adjacency(edges):
+    adjacency = {}
+    for a, b in edges:
+        adjacency.setdefault(a, []).append(b)
+        adjacency.setdefault(b, []).append(a)
+    return adjacency
+
+
+ADJACENCY = _adjacency(EDGES)
+
+
+def expand(frontier):
+    return {node: ADJACENCY.get(node, []) for node in frontier}
+
+
+def test_bidirectional_search_finds_a_shortest_path():
+    path = run_bidirectional_search(BidirectionalSearch(1, 4, max_hops=6), expand)
+    assert path[0] == 1 and path[-1] == 4
+    assert len(path) == 4
+    assert all(b in ADJACENCY[a] for a, b in zip(path, path[1:]))
+
+
+def test_bidirectional_search_same_node_and_hop_limit():
+    assert run_bidirectional_search(BidirectionalSearch(3, 3, max_hops=0), expand) == [3]
+    assert run_bidirectional_search(BidirectionalSearch(1, 4, max_hops=2), expand) == []
+
+
+def test_bidirectional_search_respects_blocked_nodes():
+    path = run_bidirectional_search(BidirectionalSearch(1, 5, max_hops=6, blocked={6}), expand)
+    assert path == [1, 2, 3, 4, 5] or path == [1, 2, 8, 4, 5]
+
+
+def test_bidirectional_search_aborts_past_visit_budget():
+    search = BidirectionalSearch(3, 7, max_hops=6, max_visited_nodes=2)
+    assert run_bidirectional_search(search, expand) == []
+    assert search.aborted
+
+
+def test_path_counter_counts_and_enumerates_every_shortest_path():
+    counter = run_path_counter(ShortestPathCounter(1, 4, max_hops=6), expand)
+    assert counter.count == 2
+    assert counter.length == 3
+    assert sorted(counter.iter_paths()) == [[1, 2, 3, 4], [1, 2, 8, 4]]
+
+
+def test_path_counter_unreachable_and_aborted():
+    counter = run_path_counter(ShortestPathCounter(1, 99, max_hops=6), expand)
+    assert counter.count == 0 and counter.length is None
+    assert list(counter.iter_paths()) == []
+
+    counter = run_path_counter(ShortestPathCounter(1, 5, max_hops=6, max_visited_nodes=2), expand)
+    assert counter.aborted and counter.count == 0
+
+
+def test_breadth_first_tree_reaches_every_target():
+    tree = run_breadth_first_tree(BreadthFirstTree(1, targets=[4, 7], max_depth=6), expand)
+    assert tree.distance(4) == 3
+    assert tree.distance(7) == 2
+    assert tree.path_to(7) == [1, 6, 7]
+    assert tree.path_to(99) == []
+
+
+def test_breadth_first_tree_stops_at_max_depth():
+    tree = run_breadth_first_tree(BreadthFirstTree(1, targets=[4], max_depth=2), expand)
+    assert tree.distance(4) is None
+
+
+def test_order_waypoints_picks_the_cheapest_order():
+    positions = {"a": 0, "b": 5, "c": 2, "d": 9}
+
+    def distance(x, y):
+        return abs(positions[x] - positions[y])
+
+    assert order_waypoints("a", "d", ["b", "c"], distance) == (9, ["c", "b"])
+    assert order_waypoints("a", "d", [], distance) == (9, [])
+    assert order_waypoints("a", "d", ["b"], lambda x, y: None) is None
+
+
+def test_waypoint_path_builder_reroutes_segments_that_revisit_players():
+    # 1 -> 3 goes through 2, and the shortest 3 -> 5 goes back through 2.
+    adjacency = _adjacency([(1, 2), (2, 3), (2, 5), (3, 4), (4, 6), (6, 5)])
+
+    def expand_detour(frontier):
+        return {node: adjacency.get(node, []) for node in frontier}
+
+    def build(max_hops):
+        trees = {
+            stop: run_breadth_first_tree(BreadthFirstTree(stop, targets=[1, 3, 5], max_depth=max_hops), expand_detour)
+            for stop in (1, 3)
+        }
+        builder = WaypointPathBuilder([1, 3, 5], trees, max_hops=max_hops)
+        while (search := builder.next_search()) is not None:
+            run_bidirectional_search(search, expand_detour)
+            builder.absorb(search)
+        return builder.path
+
+    assert build(max_hops=6) == [1, 2, 3, 4, 6, 5]
+    assert build(max_hops=4) == []
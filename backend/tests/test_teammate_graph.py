@@ -0,0 +1,179 @@
+import asyncio
+
+from backend.db import teammate_graph as teammate_graph_module
+from backend.db.graph_deltas import append_graph_delta, build_game_delta
+from backend.db.teammate_graph import (
+    NameTable,
+    build_teammate_graph,
+    load_teammate_graph_snapshot,
+    save_teammate_graph_snapshot,
+)
+
+REGULAR = "TEAMMATE_IN_REGULAR_SEASON"
+PLAYOFFS = "TEAMMATE_IN_PLAYOFFS"
+
+# 1 - 2 - 3 - 4 over two seasons, plus 5 only linked to 1 in the playoffs.
+ROWS = [
+    (1, 2, "DET", 20012002, REGULAR),
+    (2, 3, "DET", 20012002, REGULAR),
+    (3, 4, "COL", 20032004, REGULAR),
+    (1, 5, "DET", 20012002, PLAYOFFS),
+]
+
+
+def _graph():
+    return build_teammate_graph([1, 2, 3, 4, 5, 6], ROWS)
+
+
+def test_shortest_path_and_filters():
+    graph = _graph()
+    unrestricted = graph.compile_filter()
+    assert graph.shortest_path(1, 4, unrestricted, max_hops=6) == [1, 2, 3, 4]
+    assert graph.shortest_path(1, 6, unrestricted, max_hops=6) == []
+
+    # 3 - 4 is a 2003 COL edge, so a DET-only or pre-2003 filter cuts it.
+    assert graph.shortest_path(1, 4, graph.compile_filter(teams=["det"]), max_hops=6) == []
+    assert graph.shortest_path(1, 4, graph.compile_filter(end_year=2002), max_hops=6) == []
+    assert graph.shortest_path(1, 5, graph.compile_filter(game_types=[REGULAR]), max_hops=6) == []
+    assert graph.shortest_path(1, 5, graph.compile_filter(game_types=[PLAYOFFS]), max_hops=6) == [1, 5]
+
+
+def test_count_shortest_paths_and_layers():
+    graph = build_teammate_graph(
+        [1, 2, 3, 4],
+        [(1, 2, "DET", 20012002, REGULAR), (1, 3, "DET", 20012002, REGULAR),
+         (2, 4, "DET", 20012002, REGULAR), (3, 4, "DET", 20012002, REGULAR)],
+    )
+    edge_filter = graph.compile_filter()
+    counter = graph.count_shortest_paths(1, 4, edge_filter, max_hops=6)
+    assert counter.count == 2 and counter.length == 2
+    assert graph.count_shortest_paths(1, 99, edge_filter, max_hops=6) is None
+
+    layers = graph.bfs_layers(1, edge_filter, max_depth=5)
+    assert [sorted(graph.player_ids[idx] for idx in layer) for layer in layers] == [[1], [2, 3], [4]]
+
+
+def test_waypoint_path_never_revisits_a_player():
+    # 2 is both the way from 1 to 3 and the shortest way from 3 to 6.
+    graph = build_teammate_graph(
+        [1, 2, 3, 4, 5, 6],
+        [(a, b, "DET", 20012002, REGULAR) for a, b in [(1, 2), (2, 3), (2, 6), (3, 4), (4, 5), (5, 6)]],
+    )
+    edge_filter = graph.compile_filter()
+    assert graph.waypoint_path(1, 6, [3], edge_filter, max_hops=6) == [1, 2, 3, 4, 5, 6]
+    assert graph.waypoint_path(1, 6, [3], edge_filter, max_hops=4) == []
+
+
+def test_apply_deltas_adds_players_and_edges():
+    graph = _graph()
+    edge_filter = graph.compile_filter()
+    delta = build_game_delta(
+        version=3,
+        game_id=2004020001,
+        season=20042005,
+        rel_type=REGULAR,
+        rosters={"NYR": [4, 7]},
+        names={4: "Four", 7: "Seven"},
+    )
+    assert graph.apply_deltas([delta]) == 1
+    assert graph.version == 3
+    assert graph.has_deltas
+    assert graph.name_of(7) == "Seven"
+    assert graph.shortest_path(1, 7, edge_filter, max_hops=6) == [1, 2, 3, 4, 7]
+    assert graph.shortest_path(1, 7, graph.compile_filter(teams=["NYR", "DET", "COL"]), max_hops=6) == [1, 2, 3, 4, 7]
+    assert graph.team_seasons_between(graph.index_of(4), graph.index_of(7), edge_filter) == [("NYR", 2004)]
+
+
+def test_apply_deltas_skips_edges_already_in_the_graph():
+    graph = _graph()
+    names = {1: "One", 2: "Two", 8: "Eight"}
+    base_edges = graph.edge_count
+    # 1 - 2 is already a base edge for DET 2001 regular season; the second game repeats 1 - 8.
+    first = build_game_delta(1, 2001020001, 20012002, REGULAR, {"DET": [1, 2, 8]}, names)
+    second = build_game_delta(2, 2001020002, 20012002, REGULAR, {"DET": [1, 8]}, names)
+    assert graph.apply_deltas([first, second]) == 2
+    # Only 1 - 8 and 2 - 8 are new, stored in both directions.
+    assert graph.edge_count == base_edges + 4
+    assert graph.version == 2
+
+
+def test_components_follow_deltas():
+    graph = _graph()
+    edge_filter = graph.compile_filter()
+    before = graph.components(edge_filter)
+    assert before.component_size(graph.index_of(6)) == 1
+
+    graph.apply_deltas([build_game_delta(1, 2001020001, 20012002, REGULAR, {"DET": [1, 6]}, {1: "One", 6: "Six"})])
+    after = graph.components(edge_filter)
+    assert after.component_size(graph.index_of(6)) == 6
+
+
+def test_frontier_expander_ignores_deltas_applied_mid_search():
+    graph = _graph()
+    edge_filter = graph.compile_filter()
+    expand = graph.frontier_expander(edge_filter)
+    graph.apply_deltas([build_game_delta(1, 2004020001, 20042005, REGULAR, {"NYR": [4, 7]}, {4: "Four", 7: "Seven"})])
+    four = graph.index_of(4)
+    assert expand([four]) == {four: [graph.index_of(3)]}
+    assert sorted(graph.frontier_expander(edge_filter)([four])[four]) == [graph.index_of(3), graph.index_of(7)]
+
+
+def test_snapshot_round_trip(tmp_path):
+    graph = _graph()
+    graph.names = NameTable.from_names(["One", "Two", "Three", "Four", "Five", "Six"])
+    graph.version = 5
+    save_teammate_graph_snapshot(graph, str(tmp_path / "snapshot"), graph_model="teammate")
+
+    loaded = load_teammate_graph_snapshot(str(tmp_path / "snapshot"))
+    assert loaded.version == 5
+    assert loaded.player_count == graph.player_count
+    assert loaded.edge_count == graph.edge_count
+    assert loaded.name_of(3) == "Three"
+    assert loaded.shortest_path(1, 4, loaded.compile_filter(), max_hops=6) == [1, 2, 3, 4]
+    assert loaded.shortest_path(1, 4, loaded.compile_filter(teams=["DET"]), max_hops=6) == []
+
+
+def test_snapshot_refuses_graph_with_deltas(tmp_path):
+    graph = _graph()
+    graph.apply_deltas([build_game_delta(1, 2001020001, 20012002, REGULAR, {"DET": [1, 6]}, {1: "One", 6: "Six"})])
+    try:
+        save_teammate_graph_snapshot(graph, str(tmp_path / "snapshot"))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError for a graph with deltas")
+
+
+def test_refresh_applies_deltas_before_a_gap_and_reloads_if_it_stays(tmp_path, monkeypatch):
+    graph = _graph()
+    log_path = str(tmp_path / "deltas.jsonl")
+    names = {1: "One", 6: "Six", 7: "Seven"}
+    # Version 2 is still being written when the first poll reads the log.
+    append_graph_delta(log_path, build_game_delta(1, 2001020001, 20012002, REGULAR, {"DET": [1, 6]}, names))
+    append_graph_delta(log_path, build_game_delta(3, 2001020003, 20012002, REGULAR, {"DET": [6, 7]}, names))
+    reloads = []
+
+    async def graph_version(db):
+        return 3
+
+    async def reload(target_version=None):
+        reloads.append(target_version)
+
+    monkeypatch.setattr(teammate_graph_module.settings, "GRAPH_DELTA_LOG_PATH", log_path)
+    monkeypatch.setattr(teammate_graph_module.settings, "LANDMARK_COUNT", 0)
+    monkeypatch.setattr(teammate_graph_module, "get_graph_version", graph_version)
+    monkeypatch.setattr(teammate_graph_module, "get_graph_db", lambda: None)
+    monkeypatch.setattr(teammate_graph_module, "load_teammate_graph", reload)
+    monkeypatch.setattr(teammate_graph_module, "_teammate_graph", graph)
+    monkeypatch.setattr(teammate_graph_module, "_delta_gap_version", None)
+
+    assert asyncio.run(teammate_graph_module.refresh_teammate_graph())
+    assert graph.version == 1 and reloads == []
+
+    # Nothing new arrives before the next poll: fall back to a reload at the target.
+    assert asyncio.run(teammate_graph_module.refresh_teammate_graph())
+    assert graph.version == 1 and reloads == [3]
+
+    append_graph_delta(log_path, build_game_delta(2, 2001020002, 20012002, REGULAR, {"DET": [1, 7]}, names))
+    assert asyncio.run(teammate_graph_module.refresh_teammate_graph())
+    assert graph.version == 3 and reloads == [3]